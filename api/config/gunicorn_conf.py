@@ -0,0 +1,28 @@
+"""
+Gunicorn hooks, used with `gunicorn -c api/config/gunicorn_conf.py`. Every web
+worker is given a slot, the lowest one no live worker holds, and dumps
+its metrics to METRICS_DIR/web-<slot>.json so that /metrics/ includes the
+requests handled by every worker. A worker that replaces a dead one takes
+over its slot and carries on from its counters.
+"""
+import os
+
+
+def on_starting(server):
+    directory = os.environ.get('METRICS_DIR')
+    if directory:
+        from api.core import metrics
+        # the dumps of the workers of an earlier run are stale
+        metrics.clear_dumps(directory, 'web')
+
+
+def pre_fork(server, worker):
+    taken = {getattr(w, 'metrics_slot', None) for w in server.WORKERS.values()}
+    worker.metrics_slot = min(set(range(len(taken) + 1)) - taken)
+
+
+def post_fork(server, worker):
+    directory = os.environ.get('METRICS_DIR')
+    if directory:
+        from api.core import metrics
+        metrics.registry.claim(os.path.join(directory, 'web-{}.json'.format(worker.metrics_slot)))
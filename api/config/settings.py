@@ -37,6 +37,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.core.middleware.MetricsMiddleware',
+    'api.core.middleware.TrafficRecorderMiddleware',
+    'api.core.middleware.CompressionMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -122,9 +125,77 @@ STATIC_URL = '/static/'
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'api.config.admin.AnonymousExceptDelete'
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.core.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 
 # Cross Origin Resource Sharing https://github.com/ottoyiu/django-cors-headers
 CORS_ORIGIN_ALLOW_ALL = True
+
+# Contest workers started with `manage.py runworker`
+WORKER_PROCESSES = int(os.environ.get('WORKER_PROCESSES', 2))
+WORKER_POLL_INTERVAL = float(os.environ.get('WORKER_POLL_INTERVAL', 1))
+# seconds between the heartbeats of a running contest and seconds without
+# one after which its worker is presumed dead and the contest requeued
+WORKER_HEARTBEAT_INTERVAL = float(os.environ.get('WORKER_HEARTBEAT_INTERVAL', 30))
+WORKER_STALE_AFTER = float(os.environ.get('WORKER_STALE_AFTER', 5 * 60))
+
+# Upper bound on the size of serialized results kept in the result cache
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+# Seconds clients may cache strategies and finished contests for
+STRATEGY_MAX_AGE = int(os.environ.get('STRATEGY_MAX_AGE', 60 * 60))
+CONTEST_MAX_AGE = int(os.environ.get('CONTEST_MAX_AGE', 24 * 60 * 60))
+
+# Number of contests returned per page by the contest list endpoints
+CONTEST_PAGE_SIZE = int(os.environ.get('CONTEST_PAGE_SIZE', 100))
+
+# Cores shared by all contests running on a worker machine and the most
+# processes a single contest may ask for
+WORKER_CORES = int(os.environ.get('WORKER_CORES', os.cpu_count()))
+MAX_CONTEST_PROCESSES = int(os.environ.get('MAX_CONTEST_PROCESSES', os.cpu_count()))
+
+# Tournament progress: seconds between progress writes by the workers,
+# number of recently played pairs whose interactions are kept, seconds
+# between checks for new progress to send to stream subscribers, seconds
+# a stream stays open, kept below gunicorn's worker timeout, and seconds
+# after which clients reconnect to a closed stream
+PROGRESS_WRITE_INTERVAL = float(os.environ.get('PROGRESS_WRITE_INTERVAL', 1))
+PROGRESS_RECENT_PAIRS = int(os.environ.get('PROGRESS_RECENT_PAIRS', 10))
+PROGRESS_STREAM_INTERVAL = float(os.environ.get('PROGRESS_STREAM_INTERVAL', 1))
+PROGRESS_STREAM_DURATION = float(os.environ.get('PROGRESS_STREAM_DURATION', 20))
+PROGRESS_STREAM_RETRY = float(os.environ.get('PROGRESS_STREAM_RETRY', 1))
+
+# Most contests that can be submitted in a single batch
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 1000))
+
+# Moran process history: generations stored per population row, most
+# generations kept in the results and population rows per page
+MORAN_HISTORY_CHUNK_SIZE = int(os.environ.get('MORAN_HISTORY_CHUNK_SIZE', 100))
+MORAN_INLINE_GENERATIONS = int(os.environ.get('MORAN_INLINE_GENERATIONS', 100))
+MORAN_HISTORY_PAGE_SIZE = int(os.environ.get('MORAN_HISTORY_PAGE_SIZE', 10))
+
+# Fixation estimates: most replicates a single estimate may play and
+# replicates played between checks of the requested precision
+FIXATION_MAX_REPLICATES = int(os.environ.get('FIXATION_MAX_REPLICATES', 100000))
+FIXATION_BATCH_SIZE = int(os.environ.get('FIXATION_BATCH_SIZE', 100))
+
+# Directory the web and worker processes dump their metrics to so that
+# /metrics/ can include them, or None to only report the metrics of the
+# process answering it, and seconds between the web processes' dumps
+METRICS_DIR = os.environ.get('METRICS_DIR')
+METRICS_DUMP_INTERVAL = float(os.environ.get('METRICS_DUMP_INTERVAL', 5))
+
+# File every request is appended to for replay by `manage.py loadgen`,
+# or None to not record traffic
+TRAFFIC_RECORD_FILE = os.environ.get('TRAFFIC_RECORD_FILE')
+
+# Response bodies of at least COMPRESS_MIN_BYTES are compressed with
+# brotli, when it is installed, or gzip if the client accepts them
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 5))
@@ -8,7 +8,7 @@ import sys
 from api.config.settings import *
 
 
-if 'test' in sys.argv or 'test_coverage' in sys.argv:
+if 'test' in sys.argv or 'test_coverage' in sys.argv or 'benchmark' in sys.argv:
 
     # use an in memory sqlite3 backend for performance
     DATABASES = {
@@ -2,15 +2,20 @@ from django.conf import settings
 from django.conf.urls import url, include
 from rest_framework.routers import DefaultRouter
 from api.core.views import (
+    BatchViewSet,
+    LeaderboardViewSet,
     MatchViewSet,
+    MoranFixationViewSet,
     MoranViewSet,
     StrategyViewSet,
     TournamentViewSet,
+    prometheus_metrics,
 )
 
 
 urlpatterns = [
     url(r'^api-auth/', include('rest_framework.urls')),
+    url(r'^metrics/$', prometheus_metrics),
 ]
 
 if settings.DEBUG:
@@ -21,14 +26,20 @@ if settings.DEBUG:
 
 router = DefaultRouter()
 
-routes = {
-    'matches': MatchViewSet,
-    'moran': MoranViewSet,
-    'strategies': StrategyViewSet,
-    'tournaments': TournamentViewSet,
-}
+# a list rather than a dictionary so the registration order is kept on
+# every Python version
+routes = [
+    ('batches', BatchViewSet),
+    ('leaderboard', LeaderboardViewSet),
+    ('matches', MatchViewSet),
+    # registered before moran so that its urls are not read as moran ids
+    ('moran/fixation', MoranFixationViewSet),
+    ('moran', MoranViewSet),
+    ('strategies', StrategyViewSet),
+    ('tournaments', TournamentViewSet),
+]
 
-for route, viewset in routes.items():
-    router.register(route, viewset, base_name=route)
+for route, viewset in routes:
+    router.register(route, viewset, base_name=route.replace('/', '-'))
 
 urlpatterns += router.urls
@@ -12,3 +12,8 @@ from whitenoise.django import DjangoWhiteNoise
 
 application = get_wsgi_application()
 application = DjangoWhiteNoise(application)
+
+# load the url configuration, and with it the views and the strategy
+# modules, at import so that with gunicorn's --preload the workers fork
+# with them imported
+import api.config.urls  # noqa: E402,F401
@@ -0,0 +1,94 @@
+"""
+Queries answered from the stored results of a tournament, such as the
+payoff between two players or the top of the ranking, without sending
+the full results. Players are named by strategy id and indexed in the
+order of the tournament's player list.
+"""
+import numpy as np
+
+# pairwise results that can be sliced by row and column player
+PAIRWISE_KEYS = (
+    'payoff_matrix',
+    'payoff_stddevs',
+    'payoff_diffs_means',
+    'cooperation',
+    'normalised_cooperation',
+    'vengeful_cooperation',
+    'good_partner_matrix',
+)
+
+
+def player_indices(player_ids, ids):
+    """
+    Return the index of every id in the tournament's player ids and the
+    ids that are not among them. A strategy that plays more than once is
+    found at its first place in the player list.
+    """
+    index = {}
+    for i, _id in enumerate(player_ids):
+        index.setdefault(_id, i)
+    missing = [_id for _id in ids if _id not in index]
+    return [index[_id] for _id in ids if _id in index], missing
+
+
+def submatrix(matrix, rows, cols):
+    """the values of a pairwise matrix at the given row and column indices"""
+    return np.asarray(matrix)[np.ix_(rows, cols)]
+
+
+def ranking(ranking, normalised_scores, top=None, players=None):
+    """
+    Return the rank, starting at 1, the player index and the median
+    normalised score of the ranked players, best first.
+
+    Parameters
+    ----------
+        ranking: list of int
+            player indices in the order of the tournament's ranking
+        normalised_scores: array
+            normalised score of every player in every repetition
+        top: int
+            number of best ranked players to include, or None for all
+        players: list of int
+            indices of the players to include, if they are in the
+            top, or None for all
+    """
+    order = np.asarray(ranking, dtype=np.intp)
+    ranks = np.arange(1, len(order) + 1)
+    if top is not None:
+        order, ranks = order[:top], ranks[:top]
+    if players is not None:
+        keep = np.in1d(order, players)
+        order, ranks = order[keep], ranks[keep]
+    if not len(order):
+        return [], [], []
+    medians = np.median(np.asarray(normalised_scores)[order], axis=1)
+    return ranks.tolist(), order.tolist(), medians.tolist()
+
+
+def strategy_totals(player_ids, normalised_scores, wins):
+    """
+    Sum the results of a tournament by strategy, for the leaderboard.
+    Return, for every strategy id, the number of times it played, the
+    sum of its mean normalised score over the repetitions, the matches
+    it won and the matches it played, each player meeting every other
+    player once per repetition.
+
+    Parameters
+    ----------
+        player_ids: list of str
+            strategy ids in the order of the tournament's player list
+        normalised_scores: array
+            normalised score of every player in every repetition
+        wins: array
+            matches won by every player in every repetition
+    """
+    scores = np.asarray(normalised_scores, dtype=float).mean(axis=1)
+    wins = np.asarray(wins).sum(axis=1)
+    repetitions = np.asarray(normalised_scores).shape[1]
+    matches = repetitions * (len(player_ids) - 1)
+    totals = {}
+    for _id, score, won in zip(player_ids, scores.tolist(), wins.tolist()):
+        count, score_total, wins_total, matches_total = totals.get(_id, (0, 0., 0, 0))
+        totals[_id] = (count + 1, score_total + score, wins_total + won, matches_total + matches)
+    return totals
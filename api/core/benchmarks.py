@@ -0,0 +1,274 @@
+"""
+Benchmarks of the API hot paths run by `manage.py benchmark`. Every case
+times an operation a fixed number of times against a throwaway database
+and reports its throughput and latency percentiles, which can be
+compared with a stored baseline, along with the peak resident memory of
+the process and how much the case raised it.
+"""
+import json
+import platform
+import random
+import resource
+import time
+
+from django.db import connection
+from rest_framework.test import APIClient
+import axelrod as axl
+
+from api.core import models, worker
+
+# players of the contest benchmarks, mixing deterministic and stochastic
+# strategies. Deterministic pairs would be served from the pairwise
+# interaction table after the first call, so the play cases clear it
+# before every call.
+PLAYERS = ['titfortat', 'grudger', 'random', 'gtft', 'defector', 'alternator',
+           'cooperator', 'win-staylose-shift', 'suspicioustitfortat', 'joss',
+           'forgiver', 'hardtitfortat', 'titfor2tats', 'prober', 'calculator', 'cyclercccd']
+
+
+def percentile(samples, q):
+    """the q-th percentile of samples, interpolating between ranks"""
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def peak_rss():
+    """
+    peak resident memory of this process in megabytes, the high water
+    mark over its whole lifetime rather than of any one case
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Case:
+    """
+    A benchmarked operation.
+
+    Parameters
+    ----------
+        name: str
+            unique name of the case, used to match it with the baseline
+        operation: callable
+            called with no arguments once per iteration
+        iterations: int
+            number of timed calls of operation
+        setup: callable
+            called once before the case is timed, if given
+        needs_json: bool
+            whether the case stores JSON during the timed calls and so
+            only runs on PostgreSQL
+        warmup: int
+            untimed calls of operation before the timed ones
+        reset: callable
+            called with no arguments, untimed, before every call of
+            operation, if given
+    """
+
+    def __init__(self, name, operation, iterations, setup=None, needs_json=False, warmup=1,
+                 reset=None):
+        self.name = name
+        self.operation = operation
+        self.iterations = iterations
+        self.setup = setup
+        self.needs_json = needs_json
+        self.warmup = warmup
+        self.reset = reset
+
+    def measure(self):
+        # seeded so every run plays the same matches
+        axl.seed(0)
+        rss_before = peak_rss()
+        if self.setup is not None:
+            self.setup()
+        for _ in range(self.warmup):
+            if self.reset is not None:
+                self.reset()
+            self.operation()
+        durations = []
+        for _ in range(self.iterations):
+            if self.reset is not None:
+                self.reset()
+            operation_start = time.perf_counter()
+            self.operation()
+            durations.append(time.perf_counter() - operation_start)
+        process_peak = peak_rss()
+        return {
+            'iterations': self.iterations,
+            'ops_per_sec': self.iterations / sum(durations),
+            'p50': percentile(durations, 50),
+            'p95': percentile(durations, 95),
+            'p99': percentile(durations, 99),
+            'process_peak_rss_mb': process_peak,
+            'rss_growth_mb': process_peak - rss_before,
+        }
+
+
+def environment():
+    """versions the results of a run depend on"""
+    return {
+        'python': platform.python_version(),
+        'axelrod': axl.__version__,
+        'database': connection.vendor,
+        'machine': platform.machine(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Return a message for every case that is slower than its baseline by
+    more than tolerance, a fraction, in throughput or 95th percentile
+    latency. Cases missing from either side are ignored.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]
+        if result['ops_per_sec'] < expected['ops_per_sec'] * (1 - tolerance):
+            regressions.append('{}: {:.1f} ops/sec, baseline {:.1f}'.format(
+                name, result['ops_per_sec'], expected['ops_per_sec']))
+        if result['p95'] > expected['p95'] * (1 + tolerance):
+            regressions.append('{}: p95 {:.2f} ms, baseline {:.2f} ms'.format(
+                name, result['p95'] * 1000, expected['p95'] * 1000))
+    return regressions
+
+
+def post(client, route, data):
+    response = client.post(route, data, format='json')
+    if response.status_code not in (201, 202):
+        raise RuntimeError('POST {} returned {}: {}'.format(
+            route, response.status_code, response.data))
+    return response
+
+
+def play_pending(model):
+    """
+    Play the oldest PENDING contest of model the way a worker does. The
+    results are only written on PostgreSQL since other databases cannot
+    store them.
+    """
+    contest = worker.claim_contest(model)
+    players = [worker.strategies_index[s]() for s in contest.definition.strategy_ids]
+    result, metadata = worker.play(contest, players, 1)
+    results = worker.results_serializers[model](result).data
+    if connection.vendor == 'postgresql':
+        contest.store_results(results)
+        contest.metadata = metadata
+        contest.status = contest.SUCCESS
+        contest.save()
+
+
+def clear_memo():
+    """forget the stored interactions of deterministic pairs"""
+    models.PairInteractions.objects.all().delete()
+
+
+def create_contests(count, players=4):
+    """add count finished tournaments to the database in bulk"""
+    player_ids = PLAYERS[:players]
+    for s in player_ids:
+        models.InternalStrategy.objects.get_or_create(id=s)
+    models.TournamentDefinition.objects.bulk_create([
+        models.TournamentDefinition(turns=200, noise=0, repetitions=10, with_morality=False,
+                                    player_ids=json.dumps(player_ids))
+        for _ in range(count)])
+    # not every database returns the ids of bulk created rows
+    ids = (models.TournamentDefinition.objects
+           .order_by('-id').values_list('id', flat=True)[:count])
+    through = models.TournamentDefinition.player_list.through
+    through.objects.bulk_create([
+        through(tournamentdefinition_id=definition, internalstrategy_id=s)
+        for definition in ids for s in player_ids])
+    models.Tournament.objects.bulk_create([
+        models.Tournament(definition_id=definition, status=models.Tournament.SUCCESS)
+        for definition in ids])
+
+
+def cases(contests=5000):
+    """
+    The default benchmark cases.
+
+    Parameters
+    ----------
+        contests: int
+            number of tournaments in the table the listing cases page
+            through
+    """
+    client = APIClient()
+
+    def get(route):
+        def operation():
+            response = client.get(route)
+            if response.status_code != 200:
+                raise RuntimeError('GET {} returned {}'.format(route, response.status_code))
+            # consume streamed bodies so they are timed too
+            b''.join(response)
+        return operation
+
+    def create_and_play(route, model, data):
+        def operation():
+            post(client, route, data)
+            play_pending(model)
+        return operation
+
+    benchmarks = [
+        Case('strategies.list', get('/strategies/'), 50),
+        Case('strategies.filter', get('/strategies/?stochastic=false&memory_depth=1'), 50),
+        Case('strategies.retrieve', get('/strategies/titfortat/'), 200),
+    ]
+    for turns in (10, 200, 1000):
+        benchmarks.append(Case(
+            'matches.create[turns={}]'.format(turns),
+            create_and_play('/matches/', models.Match, {
+                'player_list': ['grudger', 'random'], 'turns': turns, 'noise': 0}),
+            50, reset=clear_memo))
+    for players in (4, 8, 16):
+        benchmarks.append(Case(
+            'tournaments.create[players={}]'.format(players),
+            lambda players=players: post(client, '/tournaments/', {
+                'player_list': PLAYERS[:players], 'turns': 200, 'repetitions': 10,
+                'noise': 0, 'with_morality': False}),
+            50))
+        for repetitions in (1, 5):
+            benchmarks.append(Case(
+                'tournaments.play[players={},repetitions={}]'.format(players, repetitions),
+                create_and_play('/tournaments/', models.Tournament, {
+                    'player_list': PLAYERS[:players], 'turns': 50,
+                    'repetitions': repetitions, 'noise': 0, 'with_morality': False}),
+                max(1, 40 // players), needs_json=True, reset=clear_memo))
+    for players in (4, 8):
+        benchmarks.append(Case(
+            'moran.run[players={}]'.format(players),
+            create_and_play('/moran/', models.MoranProcess, {
+                'player_list': PLAYERS[:players], 'turns': 20, 'noise': 0, 'mode': 'bd'}),
+            10))
+    benchmarks += [
+        Case('contests.list', get('/tournaments/'), 20,
+             setup=lambda: create_contests(contests)),
+        Case('contests.list[fields=id,status]', get('/tournaments/?fields=id,status'), 20),
+        Case('leaderboard.list', get('/leaderboard/'), 50),
+        Case('leaderboard.filter', get('/leaderboard/?turns=200&repetitions=10'), 50),
+    ]
+    return benchmarks
+
+
+def run(benchmarks, report=None):
+    """
+    Measure every case whose requirements the database meets and return
+    the results by case name. report is called with the name and results
+    of each case as it finishes, or with None results if it was skipped.
+    """
+    random.seed(0)
+    results = {}
+    for case in benchmarks:
+        if case.needs_json and connection.vendor != 'postgresql':
+            if report is not None:
+                report(case.name, None)
+            continue
+        results[case.name] = case.measure()
+        if report is not None:
+            report(case.name, results[case.name])
+    return results
@@ -0,0 +1,114 @@
+"""
+Content addressed cache for the results of deterministic contests.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+import axelrod as axl
+
+from api.core.models import CachedResult
+
+# definition fields that do not change the outcome of a contest
+_ignored_fields = ('id', 'created', 'last_updated', 'player_ids', 'processes')
+
+
+def is_deterministic(definition, strategies):
+    """
+    check whether a contest will always produce the same results
+
+    Parameters
+    ----------
+        definition: ContestDefinition
+            definition class that contains all contest parameters
+        strategies: list of axelrod.Strategy
+            strategy classes playing the contest
+    """
+    return definition.noise == 0 and not any(
+        s.classifier['stochastic'] for s in strategies)
+
+
+def is_reproducible(definition, strategies):
+    """
+    check whether a contest will produce the same results every time it
+    is played, either because it is deterministic or because it is seeded
+
+    Parameters
+    ----------
+        definition: ContestDefinition
+            definition class that contains all contest parameters
+        strategies: list of axelrod.Strategy
+            strategy classes playing the contest
+    """
+    return definition.seed is not None or is_deterministic(definition, strategies)
+
+
+def cache_key(model, definition):
+    """
+    hash the contest type, the normalized definition fields, the player
+    ids and the axelrod version. Results are indexed by player position
+    so the players are hashed in the order they were submitted. An unset
+    seed is left out so unseeded contests keep the keys they had before
+    definitions could be seeded.
+
+    Parameters
+    ----------
+        model: Contest
+            contest model class
+        definition: ContestDefinition
+            definition class that contains all contest parameters
+    """
+    fields = {
+        field.attname: getattr(definition, field.attname)
+        for field in definition._meta.concrete_fields
+        if field.attname not in _ignored_fields and
+        not (field.attname == 'seed' and definition.seed is None)
+    }
+    canonical = json.dumps({
+        'contest': model._meta.label_lower,
+        'definition': fields,
+        'players': definition.strategy_ids,
+        'axelrod': axl.__version__,
+    }, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def get(key):
+    """return the cached results for key or None"""
+    try:
+        entry = CachedResult.objects.get(key=key)
+    except CachedResult.DoesNotExist:
+        return None
+    CachedResult.objects.filter(key=key).update(last_used=timezone.now())
+    return entry.results
+
+
+def put(key, results):
+    """store results under key and evict old entries if necessary"""
+    CachedResult.objects.update_or_create(key=key, defaults={
+        'results': results,
+        'size': len(json.dumps(results)),
+        'last_used': timezone.now(),
+    })
+    evict(settings.RESULT_CACHE_MAX_BYTES)
+
+
+def evict(max_bytes):
+    """
+    delete the least recently used entries until the cache holds at most
+    max_bytes. The entries are only scanned when it is over budget, and
+    then only the oldest ones that have to go.
+    """
+    total = CachedResult.objects.aggregate(total=Sum('size'))['total'] or 0
+    if total <= max_bytes:
+        return
+    expired = []
+    entries = CachedResult.objects.order_by('last_used').values_list('key', 'size')
+    for key, size in entries.iterator():
+        if total <= max_bytes:
+            break
+        expired.append(key)
+        total -= size
+    CachedResult.objects.filter(key__in=expired).delete()
@@ -0,0 +1,123 @@
+"""
+Precomputed index of the axelrod strategies served by /strategies/.
+The strategy list only changes with the axelrod version so the
+classifier indexes are built once at import and the serialized
+strategies are encoded once per host, for the few most recent hosts.
+"""
+from collections import OrderedDict, defaultdict
+import operator
+
+from rest_framework.renderers import JSONRenderer
+
+from api.core import metrics
+from api.core.serializers import StrategySerializer
+from api.core.utils import strategy_id
+
+
+class StrategyCatalogue:
+    """
+    Inverted indexes from classifier values to strategy ids so that
+    filtering is a set intersection rather than a scan over every
+    strategy class.
+
+    Parameters
+    ----------
+        strategies: list of axelrod.Strategy
+            strategy classes in the order they should be listed
+        max_hosts: int
+            number of hosts whose encoded strategies are kept. Links
+            are absolute and the host comes from the request, so the
+            least recently used host is dropped to bound the memory
+            any client can make the catalogue hold.
+    """
+
+    boolean_keys = [
+        'stochastic',
+        'long_run_time',
+        'manipulates_state',
+        'manipulates_source',
+        'inspects_source',
+    ]
+
+    memory_depth_operators = {
+        'memory_depth': operator.eq,
+        'min_memory_depth': operator.ge,
+        'max_memory_depth': operator.le,
+    }
+
+    def __init__(self, strategies, max_hosts=4):
+        self.strategies = {strategy_id(s): s for s in strategies}
+        # dictionaries are not ordered before Python 3.6
+        self.ids = [strategy_id(s) for s in strategies]
+        self.boolean_index = defaultdict(set)
+        self.memory_depth_index = defaultdict(set)
+        self.makes_use_of_index = defaultdict(set)
+        for _id, strategy in self.strategies.items():
+            # some players only set their classifier on instantiation,
+            # which is also what axelrod.filtered_strategies inspects
+            classifier = strategy().classifier
+            for key in self.boolean_keys:
+                if key in classifier:
+                    self.boolean_index[key, bool(classifier[key])].add(_id)
+            self.memory_depth_index[classifier.get('memory_depth')].add(_id)
+            for item in classifier.get('makes_use_of', []):
+                self.makes_use_of_index[item].add(_id)
+        # serialized strategies keyed by the base url used for their
+        # links, least recently used first
+        self.max_hosts = max_hosts
+        self._encoded = OrderedDict()
+
+    def __contains__(self, _id):
+        return _id in self.strategies
+
+    def filter(self, filterset):
+        """
+        Return the ids of the strategies matching every filter in the
+        filterset, in catalogue order. Takes the same filterset as
+        axelrod.filtered_strategies.
+        """
+        matches = set(self.ids)
+        for key, value in filterset.items():
+            if key in self.memory_depth_operators:
+                compare = self.memory_depth_operators[key]
+                matches &= set().union(*(
+                    ids for depth, ids in self.memory_depth_index.items()
+                    if depth is not None and compare(depth, value)))
+            elif key == 'makes_use_of':
+                for item in value:
+                    matches &= self.makes_use_of_index.get(item, set())
+            else:
+                matches &= self.boolean_index.get((key, bool(value)), set())
+        return [_id for _id in self.ids if _id in matches]
+
+    def encoded(self, request):
+        """
+        Return a dictionary mapping strategy id to the JSON encoded
+        strategy, serializing the whole catalogue the first time a
+        host is seen or after it has been dropped.
+        """
+        base_url = request.build_absolute_uri('/')
+        encoded = self._encoded.get(base_url)
+        if encoded is None:
+            renderer = JSONRenderer()
+            with metrics.catalogue_encode_seconds.time():
+                encoded = {
+                    _id: renderer.render(
+                        StrategySerializer(strategy, context={'request': request}).data)
+                    for _id, strategy in self.strategies.items()
+                }
+            self._encoded[base_url] = encoded
+            while len(self._encoded) > self.max_hosts:
+                self._encoded.popitem(last=False)
+        else:
+            self._encoded.move_to_end(base_url)
+        return encoded
+
+    def render_list(self, ids, request):
+        """JSON encoded array of the given strategies"""
+        encoded = self.encoded(request)
+        return b'[' + b','.join(encoded[_id] for _id in ids) + b']'
+
+    def render_detail(self, _id, request):
+        """JSON encoded strategy"""
+        return self.encoded(request)[_id]
@@ -0,0 +1,102 @@
+"""
+Compact storage for contest results. Results that grow with the
+square of the number of players or with the number of repetitions are
+stored as NumPy arrays in a compressed npz blob and only the summary
+statistics are kept in the contest's JSON results.
+"""
+from io import BytesIO
+import json
+
+import numpy as np
+
+
+def split_results(results):
+    """
+    Separate the results into a summary dictionary and a dictionary of
+    NumPy arrays. Numeric lists with two or more dimensions become
+    arrays while scalars, strings and per player vectors stay in the
+    summary.
+
+    Parameters
+    ----------
+        results: dict
+            serialized results of a contest
+    """
+    summary, arrays = {}, {}
+    for key, value in results.items():
+        if isinstance(value, (list, tuple)):
+            array = np.asarray(value)
+            if array.ndim >= 2 and array.dtype.kind in 'biuf':
+                arrays[key] = array
+                continue
+        summary[key] = value
+    return summary, arrays
+
+
+def encode_arrays(arrays):
+    """encode a dictionary of arrays as compressed npz bytes"""
+    buffer = BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def decode_arrays(data, keys=None):
+    """
+    decode npz bytes into a dictionary of arrays. Each array is
+    compressed separately so only the given keys are decompressed.
+    """
+    with np.load(BytesIO(bytes(data))) as npz:
+        if keys is None:
+            keys = npz.files
+        return {key: npz[key] for key in keys if key in npz.files}
+
+
+def join_results(summary, arrays):
+    """rebuild the JSON results from the summary and the arrays"""
+    results = dict(summary)
+    for key, array in arrays.items():
+        results[key] = array.tolist()
+    return results
+
+
+def join_results_json(summary, arrays):
+    """
+    rebuild the results as JSON text from the summary, as JSON text
+    read from the database, and the arrays without parsing the summary
+    """
+    if not arrays:
+        return summary
+    items = ', '.join('{}: {}'.format(json.dumps(key), json.dumps(array.tolist()))
+                      for key, array in arrays.items())
+    summary = summary.rstrip()
+    if summary[:-1].strip() == '{':
+        return '{' + items + '}'
+    return summary[:-1] + ', ' + items + '}'
+
+
+def encode_interactions(pairs, defections):
+    """
+    encode the interactions of a round robin tournament as compressed
+    npz bytes holding the index pairs and a boolean array of defections
+
+    Parameters
+    ----------
+        pairs: list of tuples
+            index pairs of the players, in the order of the defections
+        defections: array
+            boolean array with shape (pairs, repetitions, turns, 2)
+    """
+    return encode_arrays({
+        'pairs': np.array(pairs, dtype=np.int32).reshape(-1, 2),
+        'defections': defections,
+    })
+
+
+def decode_interactions(data):
+    """decode npz bytes into a dictionary mapping index pairs to interactions"""
+    arrays = decode_arrays(data)
+    actions = np.array(['C', 'D'])[arrays['defections'].astype(np.intp)].tolist()
+    return {
+        tuple(pair): [list(map(tuple, repetition)) for repetition in actions[i]]
+        for i, pair in enumerate(arrays['pairs'].tolist())
+    }
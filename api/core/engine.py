@@ -0,0 +1,147 @@
+"""
+Table driven match engine for memory-one players. A memory-one player
+is described by its first move and its probability of cooperating after
+each outcome of the previous turn, so matches between such players can
+be played from lookup tables rather than by calling every player's
+strategy method on every turn.
+
+Deterministic matches are played as NumPy arrays, all pairs at once.
+Matches with noise or stochastic players are played one at a time and
+draw from the random module exactly as axelrod.Match does, so both
+engines give the same interactions under the same seed.
+"""
+import axelrod as axl
+from axelrod.random_ import random_choice
+import numpy as np
+
+C, D = axl.Actions.C, axl.Actions.D
+
+# action codes used by the arrays, 0 is C and 1 is D
+_actions = np.array([C, D])
+_codes = {C: 0, D: 1}
+
+# outcomes of the previous turn in four vector order
+_states = ((C, C), (C, D), (D, C), (D, D))
+
+# players with a fixed memory-one response that do not derive from
+# MemoryOnePlayer, mapped to their first move and four vector
+_fixed_tables = {
+    axl.Cooperator: (C, (1, 1, 1, 1)),
+    axl.Defector: (D, (0, 0, 0, 0)),
+    axl.TitForTat: (C, (1, 0, 1, 0)),
+    axl.SuspiciousTitForTat: (D, (1, 0, 1, 0)),
+    axl.Alternator: (C, (0, 0, 1, 1)),
+}
+
+
+def memory_one_table(player):
+    """
+    Return the first move and the four vector (P(C|CC), P(C|CD), P(C|DC),
+    P(C|DD)) of a player, or None if it is not a memory-one player. Some
+    players only set their four vector once they receive their match
+    attributes.
+    """
+    cls = type(player)
+    if cls in _fixed_tables and not player.init_kwargs:
+        return _fixed_tables[cls]
+    if (isinstance(player, axl.MemoryOnePlayer) and
+            cls.strategy is axl.MemoryOnePlayer.strategy and
+            hasattr(player, '_four_vector')):
+        return player._initial, tuple(player._four_vector[s] for s in _states)
+    return None
+
+
+def memory_one_tables(players, turns, game=None, noise=0):
+    """
+    Pass the match attributes to a pair of players as axelrod.Match does
+    and return their tables, or None if either is not memory-one.
+    """
+    tables = []
+    for player in players:
+        player.set_match_attributes(length=turns, game=game, noise=noise)
+        table = memory_one_table(player)
+        if table is None:
+            return None
+        tables.append(table)
+    return tables
+
+
+def is_deterministic(tables, noise=0):
+    """check whether a match between the tables draws no random numbers"""
+    return noise == 0 and all(
+        p in (0, 1) for _, vector in tables for p in vector)
+
+
+def play_deterministic(pairs, turns):
+    """
+    Play deterministic matches between many pairs of tables at once.
+
+    Parameters
+    ----------
+        pairs: list
+            pairs of (first move, four vector) tables
+        turns: int
+            number of turns of every match
+
+    Returns
+    -------
+        array of action codes with shape (len(pairs), turns, 2)
+    """
+    rows = np.arange(len(pairs))
+    first = np.array([[_codes[initial] for initial, _ in pair]
+                      for pair in pairs], dtype=np.intp).reshape(-1, 2)
+    # the code of the action to take after each of the four outcomes
+    responses = 1 - np.array([[vector for _, vector in pair] for pair in pairs],
+                             dtype=np.intp).reshape(-1, 2, 4)
+    codes = np.empty((len(pairs), turns, 2), dtype=np.intp)
+    if turns:
+        codes[:, 0] = first
+    for turn in range(1, turns):
+        own, opponent = codes[:, turn - 1, 0], codes[:, turn - 1, 1]
+        codes[:, turn, 0] = responses[rows, 0, 2 * own + opponent]
+        codes[:, turn, 1] = responses[rows, 1, 2 * opponent + own]
+    return codes
+
+
+def play_stochastic(tables, turns, noise=0):
+    """
+    Play one match between a pair of tables, drawing random numbers in
+    the same order as axelrod.Match: each player's move and then the
+    noise for each player.
+    """
+    (first1, vector1), (first2, vector2) = tables
+    vector1, vector2 = dict(zip(_states, vector1)), dict(zip(_states, vector2))
+    result = []
+    for turn in range(turns):
+        if turn:
+            last1, last2 = result[-1]
+            s1 = random_choice(vector1[last1, last2])
+            s2 = random_choice(vector2[last2, last1])
+        else:
+            s1, s2 = first1, first2
+        if noise:
+            s1, s2 = axl.Player._add_noise(noise, s1, s2)
+        result.append((s1, s2))
+    return result
+
+
+def to_interactions(codes):
+    """convert an array of action codes to a list of action pairs"""
+    return list(map(tuple, _actions[codes].tolist()))
+
+
+def play(players, turns, repetitions=1, game=None, noise=0):
+    """
+    Play repetitions of a match between two memory-one players.
+
+    Returns
+    -------
+        a list with the interactions of every repetition, or None if
+        either player is not memory-one
+    """
+    tables = memory_one_tables(players, turns, game=game, noise=noise)
+    if tables is None:
+        return None
+    if is_deterministic(tables, noise):
+        return [to_interactions(play_deterministic([tables], turns)[0])] * repetitions
+    return [play_stochastic(tables, turns, noise) for _ in range(repetitions)]
@@ -0,0 +1,119 @@
+"""
+Fixation probabilities estimated from many independent Moran processes.
+Replicates are played in batches, in parallel if requested, and only the
+number of times each strategy fixated is kept.
+"""
+from collections import Counter
+import math
+from multiprocessing import Pool
+import random
+
+import axelrod as axl
+
+# confidence level of the intervals and its two sided z value
+CONFIDENCE = 0.95
+Z = 1.959963984540054
+
+
+def wilson_interval(successes, trials, z=Z):
+    """Wilson score interval of a binomial proportion"""
+    if not trials:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z ** 2 / trials
+    centre = (p + z ** 2 / (2 * trials)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) / denominator
+    return max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+
+def play_replicate(args):
+    """
+    Play one Moran process until the population is absorbed and return
+    the name of the strategy that fixated.
+
+    Parameters
+    ----------
+        args: tuple
+            strategy classes, turns, noise, mode and the seed of the
+            replicate
+    """
+    strategies, turns, noise, mode, seed = args
+    axl.seed(seed)
+    mp = axl.MoranProcess([s() for s in strategies], turns=turns, noise=noise, mode=mode)
+    for _ in mp:
+        # only the winner is needed so no history is kept
+        del mp.populations[:]
+        del mp.score_history[:]
+    return mp.winning_strategy_name
+
+
+class FixationEstimate:
+    """
+    Estimate the probability of each strategy fixating in a Moran process.
+
+    Parameters
+    ----------
+        strategies: list of axelrod.Strategy
+            strategy classes making up the initial population
+        turns: int
+            turns of every match
+        noise: float
+            noise of every match
+        mode: str
+            'bd' for birth death or 'db' for death birth
+        max_replicates: int
+            most Moran processes to play
+        precision: float
+            stop once the half width of every confidence interval is at
+            most precision, or play max_replicates if None
+        batch_size: int
+            replicates played between convergence checks
+    """
+
+    def __init__(self, strategies, turns, noise, mode, max_replicates,
+                 precision=None, batch_size=100):
+        self.strategies = list(strategies)
+        self.turns = turns
+        self.noise = noise
+        self.mode = mode
+        self.max_replicates = max_replicates
+        self.precision = precision
+        self.batch_size = batch_size
+        # replicate seeds come from their own generator so they do not
+        # depend on how many processes play the replicates
+        self.seeds = random.Random(random.getrandbits(64))
+
+        self.confidence = CONFIDENCE
+        self.replicates = 0
+        self.fixations = Counter({str(s()): 0 for s in self.strategies})
+        self.fixation_probabilities = {}
+        self.confidence_intervals = {}
+        self.converged = False
+
+    def play(self, processes=1):
+        pool = Pool(processes) if processes > 1 else None
+        try:
+            while self.replicates < self.max_replicates and not self.converged:
+                size = min(self.batch_size, self.max_replicates - self.replicates)
+                args = [(self.strategies, self.turns, self.noise, self.mode,
+                         self.seeds.randrange(2 ** 32)) for _ in range(size)]
+                winners = pool.map(play_replicate, args) if pool else map(play_replicate, args)
+                self.fixations.update(winners)
+                self.replicates += size
+                self.estimate()
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        return self
+
+    def estimate(self):
+        """update the probabilities and intervals from the fixation counts"""
+        self.fixation_probabilities = {
+            name: count / self.replicates for name, count in self.fixations.items()}
+        self.confidence_intervals = {
+            name: wilson_interval(count, self.replicates)
+            for name, count in self.fixations.items()}
+        self.converged = self.precision is not None and all(
+            (high - low) / 2 <= self.precision
+            for low, high in self.confidence_intervals.values())
@@ -0,0 +1,82 @@
+"""
+Population history of Moran processes. A process can run for thousands
+of generations, so the worker appends every generation to chunks of
+population counts as it goes and only keeps a downsampled history in
+memory for the contest results.
+"""
+import numpy as np
+
+
+class Downsampler:
+    """
+    Keep at most size evenly spaced items of a sequence of unknown
+    length. When the samples overflow every other one is dropped and
+    the interval between the items that are kept doubles.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.interval = 1
+        self.samples = []
+        self._count = 0
+
+    def append(self, item):
+        if self._count % self.interval == 0:
+            self.samples.append(item)
+            if len(self.samples) > self.size:
+                del self.samples[1::2]
+                self.interval *= 2
+        self._count += 1
+
+
+class PopulationHistory:
+    """
+    Buffer the population counts of every generation and hand them to
+    save in chunks of chunk_size generations.
+
+    Parameters
+    ----------
+        strategies: list of str
+            names of the strategies in the process, in column order
+        save: callable
+            called as save(strategies, start, counts) with the index of
+            the first generation of the chunk and an int32 array with
+            one row of counts per generation
+        chunk_size: int
+            number of generations per chunk
+    """
+
+    def __init__(self, strategies, save, chunk_size):
+        self.strategies = list(strategies)
+        self.columns = {name: i for i, name in enumerate(self.strategies)}
+        self.save = save
+        self.chunk_size = chunk_size
+        self.generations = 0
+        self._buffer = []
+
+    def append(self, population):
+        """record a population distribution, a Counter of strategy names"""
+        counts = [0] * len(self.strategies)
+        for name, count in population.items():
+            counts[self.columns[name]] = count
+        self._buffer.append(counts)
+        self.generations += 1
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """save the buffered generations"""
+        if self._buffer:
+            start = self.generations - len(self._buffer)
+            self.save(self.strategies, start, np.array(self._buffer, dtype=np.int32))
+            self._buffer = []
+
+
+def encode_counts(counts):
+    """encode an int32 array of population counts as bytes"""
+    return counts.astype(np.int32).tobytes()
+
+
+def decode_counts(data, strategies):
+    """decode population counts back into one array row per generation"""
+    return np.frombuffer(bytes(data), dtype=np.int32).reshape(-1, len(strategies))
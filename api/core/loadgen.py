@@ -0,0 +1,385 @@
+"""
+Load generation for capacity checks run by `manage.py loadgen`. Requests
+either come from a weighted mix over the routes registered with the API
+router or are replayed from traffic recorded by TrafficRecorderMiddleware,
+and are sent to a running instance over HTTP or to the application in
+process through its WSGI handler.
+"""
+from collections import defaultdict, namedtuple
+import http.client
+import itertools
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.test import Client
+from django.urls import Resolver404, resolve
+from rest_framework.serializers import ValidationError
+
+from api.core import metrics
+from api.core.benchmarks import percentile
+
+Request = namedtuple('Request', ['method', 'path', 'body', 'time'])
+
+# values of the definition fields of generated contests
+DEFINITION_DEFAULTS = {
+    'turns': 200,
+    'noise': 0,
+    'repetitions': 10,
+    'with_morality': False,
+    'mode': 'bd',
+    'replicates': 100,
+}
+MAX_PLAYERS = 8
+
+# relative frequency of each action in the generated mix
+DEFAULT_WEIGHTS = {
+    'list': 2,
+    'filter': 4,
+    'retrieve': 8,
+    'create': 1,
+}
+
+
+def endpoint(method, path):
+    """
+    Name the endpoint handling a request after the route and viewset
+    action, such as tournaments-create, with lists given a query string
+    named as filters.
+    """
+    path, _, query = path.partition('?')
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return 'unknown'
+    actions = getattr(match.func, 'actions', None) or {}
+    action = actions.get(method.lower())
+    if action is None or match.url_name is None:
+        return match.url_name or match.view_name or 'unknown'
+    if action == 'list' and query:
+        action = 'filter'
+    return '{}-{}'.format(match.url_name.rsplit('-', 1)[0], action)
+
+
+def read_requests(path):
+    """read recorded requests in the order they were received"""
+    with open(path) as f:
+        requests = [Request(**json.loads(line)) for line in f if line.strip()]
+    return sorted(requests, key=lambda r: r.time)
+
+
+class RouteMix:
+    """
+    Endless random mix of requests over the routes of a router. Strategy
+    routes are listed, filtered on random classifier values and
+    retrieved; contest routes are created with random players and the
+    contests created so far are retrieved. Routes that are neither are
+    left out.
+
+    Parameters
+    ----------
+        registry: list of tuple
+            prefix, viewset and base name of every registered route
+        weights: dict
+            relative frequency of an action, such as create, or of an
+            endpoint, such as tournaments-create, which takes precedence
+        seed: int
+            seed of the random choices
+    """
+
+    def __init__(self, registry, weights=None, seed=None):
+        self.random = random.Random(seed)
+        weights = dict(weights or {})
+        self.created = defaultdict(list)
+        self.templates = []
+        for prefix, viewset, base_name in registry:
+            if hasattr(viewset, 'catalogue'):
+                actions = self._strategy_actions(prefix, viewset.catalogue)
+            elif hasattr(viewset, 'definition_serializer') and hasattr(viewset, 'create'):
+                actions = self._contest_actions(prefix, viewset)
+            else:
+                continue
+            for action, build in actions.items():
+                name = '{}-{}'.format(base_name, action)
+                weight = weights.get(name, weights.get(action, DEFAULT_WEIGHTS[action]))
+                if weight > 0:
+                    self.templates.append((name, weight, build))
+        self._lock = threading.Lock()
+
+    def _strategy_actions(self, prefix, catalogue):
+        filters = [(key, value) for key in catalogue.boolean_keys for value in ('true', 'false')]
+        filters += [(key, depth) for key in catalogue.memory_depth_operators for depth in range(4)]
+
+        def filter_request():
+            key, value = self.random.choice(filters)
+            return Request('GET', '/{}/?{}={}'.format(prefix, key, value), None, None)
+
+        return {
+            'list': lambda: Request('GET', '/{}/'.format(prefix), None, None),
+            'filter': filter_request,
+            'retrieve': lambda: Request('GET', '/{}/{}/'.format(
+                prefix, self.random.choice(catalogue.ids)), None, None),
+        }
+
+    def _contest_actions(self, prefix, viewset):
+        serializer = viewset.definition_serializer
+        fields = serializer().fields
+        if any(field.required and not field.read_only and
+               name not in DEFINITION_DEFAULTS and name != 'player_list'
+               for name, field in fields.items()):
+            return {}
+        # fields that are optional in the serializer may still be needed,
+        # such as booleans without a default
+        names = [name for name, field in fields.items()
+                 if not field.read_only and name in DEFINITION_DEFAULTS]
+        players = [_id for _id, s in viewset.strategies_index.items()
+                   if not s.classifier['long_run_time']]
+
+        def create_request():
+            count = self.random.randint(2, MAX_PLAYERS)
+            try:
+                serializer.validate_player_list([None] * count)
+            except ValidationError:
+                count = 2
+            data = {name: DEFINITION_DEFAULTS[name] for name in names}
+            data['player_list'] = self.random.sample(players, count)
+            return Request('POST', '/{}/'.format(prefix), json.dumps(data), None)
+
+        def retrieve_request():
+            ids = self.created[prefix]
+            if not ids:
+                return Request('GET', '/{}/'.format(prefix), None, None)
+            return Request('GET', '/{}/{}/'.format(prefix, self.random.choice(ids)), None, None)
+
+        return {
+            'create': create_request,
+            'list': lambda: Request('GET', '/{}/'.format(prefix), None, None),
+            'retrieve': retrieve_request,
+        }
+
+    def __iter__(self):
+        total = sum(weight for _, weight, _ in self.templates)
+        while True:
+            pick = self.random.uniform(0, total)
+            for _, weight, build in self.templates:
+                pick -= weight
+                if pick <= 0:
+                    break
+            with self._lock:
+                request = build()
+            yield request
+
+    def observe(self, request, status, body):
+        """remember the ids of created contests so they can be retrieved"""
+        if request.method != 'POST' or status not in (201, 202):
+            return
+        try:
+            _id = json.loads(body.decode())['id']
+        except (ValueError, KeyError, TypeError):
+            return
+        with self._lock:
+            self.created[request.path.strip('/')].append(_id)
+
+
+class HTTPTransport:
+    """
+    Send requests to a running instance, keeping one connection open
+    per thread.
+
+    Parameters
+    ----------
+        url: str
+            base url of the instance, such as http://localhost:8000
+    """
+
+    def __init__(self, url, timeout=60):
+        parts = urlsplit(url)
+        self.connection_class = (http.client.HTTPSConnection if parts.scheme == 'https'
+                                 else http.client.HTTPConnection)
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def send(self, request):
+        """return the status and body of the response to request"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self.connection_class(
+                self.netloc, timeout=self.timeout)
+        headers = {'Accept': 'application/json'}
+        body = None
+        if request.body is not None:
+            body = request.body.encode()
+            headers['Content-Type'] = 'application/json'
+        try:
+            connection.request(request.method, self.prefix + request.path, body, headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self._local.connection = None
+            raise
+
+
+class WSGITransport:
+    """
+    Send requests to the application in this process through its WSGI
+    handler, with one test client per thread. The application uses the
+    configured database.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def send(self, request):
+        """return the status and body of the response to request"""
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = Client(HTTP_ACCEPT='application/json')
+        kwargs = {}
+        if request.body is not None:
+            kwargs = {'data': request.body, 'content_type': 'application/json'}
+        response = client.generic(request.method, request.path, **kwargs)
+        body = b''.join(response) if response.streaming else response.content
+        return response.status_code, body
+
+
+class Report:
+    """latencies and failures of the requests sent to every endpoint"""
+
+    def __init__(self):
+        self.registry = metrics.Registry()
+        self.histogram = self.registry.histogram(
+            'loadgen_request_seconds', 'Latency of the requests sent by the load generator',
+            ('endpoint',))
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.elapsed = 0
+        self._lock = threading.Lock()
+
+    def record(self, name, latency, status):
+        """record a response, with a status of None for a failed request"""
+        self.histogram.observe(latency, endpoint=name)
+        with self._lock:
+            self.latencies[name].append(latency)
+            if status is None or status >= 400:
+                self.errors[name] += 1
+
+    @property
+    def count(self):
+        return sum(len(latencies) for latencies in self.latencies.values())
+
+    def summary(self):
+        """count, errors and latency percentiles of every endpoint"""
+        return {
+            name: {
+                'count': len(latencies),
+                'errors': self.errors[name],
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+                'max': max(latencies),
+            }
+            for name, latencies in sorted(self.latencies.items())
+        }
+
+
+class LoadGenerator:
+    """
+    Send requests from several threads and record their latencies.
+
+    In closed loop mode every thread sends its next request as soon as
+    the previous one returns, no sooner than the rate allows, and the
+    latency is the time the request took. In open loop mode requests are
+    due at a fixed rate, or at the times they were recorded if there is
+    no rate, whether or not earlier ones have returned, and the latency
+    is counted from the time a request was due so that a slow server
+    cannot hide its queueing delay. Concurrency bounds the requests in
+    flight either way.
+
+    Parameters
+    ----------
+        transport: HTTPTransport or WSGITransport
+            sends the requests
+        requests: iterable of Request
+            requests to send, in order
+        concurrency: int
+            number of threads sending requests
+        rate: float
+            requests per second, or None for no limit
+        mode: str
+            'open' or 'closed'
+        total: int
+            most requests to send
+        duration: float
+            seconds after which no more requests are sent
+        observe: callable
+            called with every request, its status and its body
+    """
+
+    def __init__(self, transport, requests, concurrency=1, rate=None, mode='closed',
+                 total=None, duration=None, observe=None):
+        if mode not in ('open', 'closed'):
+            raise ValueError('mode must be open or closed, not {}'.format(mode))
+        self.transport = transport
+        self.requests = iter(requests if total is None else itertools.islice(requests, total))
+        self.concurrency = concurrency
+        self.rate = rate
+        self.mode = mode
+        self.duration = duration
+        self.observe = observe
+        self.report = Report()
+        self._index = 0
+        self._first_time = None
+        self._lock = threading.Lock()
+
+    def _next(self):
+        """the next request and the time it is due, or None when done"""
+        with self._lock:
+            if self.duration is not None and time.perf_counter() - self._start >= self.duration:
+                return None
+            request = next(self.requests, None)
+            if request is None:
+                return None
+            index = self._index
+            self._index += 1
+            if self.rate is not None:
+                return request, self._start + index / self.rate
+            if self.mode == 'open' and request.time is not None:
+                if self._first_time is None:
+                    self._first_time = request.time
+                return request, self._start + request.time - self._first_time
+            return request, None
+
+    def _send(self):
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            request, due = item
+            if due is not None:
+                time.sleep(max(0, due - time.perf_counter()))
+            sent = time.perf_counter()
+            try:
+                status, body = self.transport.send(request)
+            except Exception:
+                status, body = None, b''
+            finished = time.perf_counter()
+            start = due if self.mode == 'open' and due is not None else sent
+            self.report.record(endpoint(request.method, request.path), finished - start, status)
+            if self.observe is not None and status is not None:
+                self.observe(request, status, body)
+
+    def run(self):
+        self._start = time.perf_counter()
+        threads = [threading.Thread(target=self._send, daemon=True)
+                   for _ in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.report.elapsed = time.perf_counter() - self._start
+        return self.report
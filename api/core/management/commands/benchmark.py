@@ -0,0 +1,71 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from api.core import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the API hot paths against a throwaway test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--baseline',
+            help='JSON file of earlier results to check for regressions')
+        parser.add_argument(
+            '--save',
+            help='JSON file to write the results to, for use as a baseline')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='fraction by which a case may be slower than its baseline')
+        parser.add_argument(
+            '--filter', default='',
+            help='only run cases whose name contains this text')
+        parser.add_argument(
+            '--contests', type=int, default=5000,
+            help='number of tournaments in the table the listing cases page through')
+
+    def report(self, name, result):
+        if result is None:
+            self.stdout.write('{:<45} skipped, needs PostgreSQL'.format(name))
+            return
+        self.stdout.write(
+            '{:<45} {:>9.1f} ops/s  p50 {:>8.2f} ms  p95 {:>8.2f} ms  '
+            'p99 {:>8.2f} ms  rss +{:>6.1f} MB  process peak {:>7.1f} MB'.format(
+                name, result['ops_per_sec'], result['p50'] * 1000, result['p95'] * 1000,
+                result['p99'] * 1000, result['rss_growth_mb'], result['process_peak_rss_mb']))
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0)
+        try:
+            cases = [case for case in benchmarks.cases(options['contests'])
+                     if options['filter'] in case.name]
+            results = benchmarks.run(cases, self.report)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        environment = benchmarks.environment()
+        if options['save']:
+            with open(options['save'], 'w') as f:
+                json.dump({'environment': environment, 'results': results}, f,
+                          indent=2, sort_keys=True)
+
+        if baseline is not None:
+            if baseline['environment'] != environment:
+                self.stderr.write('Baseline was recorded with {}, not {}'.format(
+                    baseline['environment'], environment))
+            regressions = benchmarks.compare(results, baseline['results'], options['tolerance'])
+            if regressions:
+                raise CommandError('Regressions against {}:\n{}'.format(
+                    options['baseline'], '\n'.join(regressions)))
+            self.stdout.write('No regressions against {}'.format(options['baseline']))
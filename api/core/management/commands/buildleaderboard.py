@@ -0,0 +1,66 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.core import columnar
+from api.core.models import ResultArrays, StrategyAggregate, Tournament
+
+
+def result_player_ids(results):
+    """
+    strategy ids of the players named in the results of a tournament,
+    such as 'Tit For Tat' or 'Cycler: CCD'
+    """
+    return [name.split(':')[0].lower().replace(' ', '')
+            for name in (results or {}).get('players', [])]
+
+
+def tournament_player_ids(tournament, arrays):
+    """
+    Return the strategy ids of the tournament's players, read from its
+    results if its definition was stored before it kept them, or None
+    if they do not match the rows of its result arrays.
+    """
+    player_ids = tournament.definition.strategy_ids or result_player_ids(tournament.results)
+    if not player_ids or len(player_ids) != len(arrays['normalised_scores']):
+        return None
+    return player_ids
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the leaderboard from the results of every finished tournament'
+
+    def handle(self, *args, **options):
+        tournaments = (Tournament.objects
+                       .filter(status=Tournament.SUCCESS)
+                       .select_related('definition', 'result_arrays')
+                       .order_by('id'))
+        count, skipped = 0, []
+        with transaction.atomic():
+            StrategyAggregate.objects.all().delete()
+            Tournament.objects.update(in_leaderboard=False)
+            for tournament in tournaments.iterator():
+                if not tournament.counts_in_leaderboard:
+                    continue
+                try:
+                    arrays = columnar.decode_arrays(
+                        tournament.result_arrays.data, ['normalised_scores', 'wins'])
+                except ResultArrays.DoesNotExist:
+                    # stored before the arrays were split out
+                    _, arrays = columnar.split_results(tournament.results or {})
+                if 'normalised_scores' not in arrays or 'wins' not in arrays:
+                    continue
+                player_ids = tournament_player_ids(tournament, arrays)
+                if player_ids is None:
+                    skipped.append(tournament.id)
+                    continue
+                # only read by add_tournament, the definition is not saved
+                tournament.definition.player_ids = json.dumps(player_ids)
+                StrategyAggregate.add_tournament(tournament.definition, arrays)
+                Tournament.objects.filter(id=tournament.id).update(in_leaderboard=True)
+                count += 1
+        if skipped:
+            self.stderr.write('Skipped {} tournaments whose players are unknown: {}'.format(
+                len(skipped), ', '.join(str(_id) for _id in skipped)))
+        self.stdout.write('Added {} tournaments to the leaderboard'.format(count))
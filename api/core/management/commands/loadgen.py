@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.config.urls import router
+from api.core import loadgen
+
+
+class Command(BaseCommand):
+    help = 'Send a mix of API requests, or replay recorded ones, and report their latencies'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            help='base url of a running instance, or leave out to send requests '
+                 'to the application in this process')
+        parser.add_argument(
+            '--replay',
+            help='file of requests recorded with TRAFFIC_RECORD_FILE to send '
+                 'instead of the generated mix')
+        parser.add_argument(
+            '--mode', choices=('closed', 'open'), default='closed',
+            help='closed loop waits for each response before sending the next request, '
+                 'open loop sends requests when they are due')
+        parser.add_argument(
+            '--concurrency', type=int, default=4,
+            help='most requests in flight at once')
+        parser.add_argument(
+            '--rate', type=float,
+            help='requests per second, required for an open loop over the generated mix')
+        parser.add_argument(
+            '--requests', type=int,
+            help='number of requests to send')
+        parser.add_argument(
+            '--duration', type=float,
+            help='seconds to send requests for')
+        parser.add_argument(
+            '--weight', action='append', default=[], metavar='NAME=WEIGHT',
+            help='relative frequency of an action, such as create, or an endpoint, '
+                 'such as tournaments-create, in the generated mix')
+        parser.add_argument(
+            '--seed', type=int,
+            help='seed of the generated mix')
+        parser.add_argument(
+            '--histograms',
+            help='file to write the latency histograms to in the Prometheus text format')
+
+    def handle(self, *args, **options):
+        observe = None
+        if options['replay']:
+            requests = loadgen.read_requests(options['replay'])
+        else:
+            if options['requests'] is None and options['duration'] is None:
+                raise CommandError('Give --requests or --duration for the generated mix')
+            if options['mode'] == 'open' and options['rate'] is None:
+                raise CommandError('Give --rate for an open loop over the generated mix')
+            try:
+                weights = {name: float(weight) for name, weight in
+                           (w.split('=', 1) for w in options['weight'])}
+            except ValueError:
+                raise CommandError('Weights are given as NAME=WEIGHT')
+            requests = loadgen.RouteMix(router.registry, weights, options['seed'])
+            observe = requests.observe
+
+        if options['target']:
+            transport = loadgen.HTTPTransport(options['target'])
+        else:
+            transport = loadgen.WSGITransport()
+
+        generator = loadgen.LoadGenerator(
+            transport, requests, concurrency=options['concurrency'], rate=options['rate'],
+            mode=options['mode'], total=options['requests'], duration=options['duration'],
+            observe=observe)
+        report = generator.run()
+
+        self.stdout.write('{:<32} {:>7} {:>7} {:>10} {:>10} {:>10} {:>10}'.format(
+            'endpoint', 'count', 'errors', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms'))
+        for name, row in report.summary().items():
+            self.stdout.write('{:<32} {:>7} {:>7} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.2f}'.format(
+                name, row['count'], row['errors'], row['p50'] * 1000, row['p95'] * 1000,
+                row['p99'] * 1000, row['max'] * 1000))
+        self.stdout.write('{} requests in {:.1f} s, {:.1f} requests/s'.format(
+            report.count, report.elapsed, report.count / report.elapsed if report.elapsed else 0))
+
+        if options['histograms']:
+            with open(options['histograms'], 'w') as f:
+                f.write(report.registry.render())
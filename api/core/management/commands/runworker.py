@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.core.worker import start_workers
+
+
+class Command(BaseCommand):
+    help = 'Start a pool of workers that run PENDING contests'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.WORKER_PROCESSES,
+            help='number of worker processes')
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.WORKER_POLL_INTERVAL,
+            help='seconds to wait between polls of an empty queue')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Starting {} contest workers'.format(options['processes']))
+        start_workers(options['processes'], options['poll_interval'])
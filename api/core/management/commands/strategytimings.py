@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+import axelrod as axl
+
+from api.core.pool import StrategyPool, POOL_THRESHOLD
+
+
+class Command(BaseCommand):
+    help = 'Time the cold, warm and copied construction of every strategy'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold', type=float, default=POOL_THRESHOLD,
+            help='construction seconds above which a strategy is worth pooling')
+        parser.add_argument(
+            '--top', type=int,
+            help='only list the strategies that are slowest to construct')
+
+    def handle(self, *args, **options):
+        pool = StrategyPool(axl.all_strategies, options['threshold']).warm_up()
+        rows = sorted(pool.timings.items(), key=lambda item: -item[1]['warm'])
+        self.stdout.write('{:<32} {:>10} {:>10} {:>10}  {}'.format(
+            'strategy', 'cold us', 'warm us', 'copy us', 'pooled'))
+        for _id, timing in rows[:options['top']]:
+            copied = '-' if timing['copy'] is None else '{:.1f}'.format(timing['copy'] * 1e6)
+            self.stdout.write('{:<32} {:>10.1f} {:>10.1f} {:>10}  {}'.format(
+                _id, timing['cold'] * 1e6, timing['warm'] * 1e6, copied,
+                'yes' if _id in pool.prototypes else 'no'))
+        self.stdout.write('{} of {} strategies pooled'.format(
+            len(pool.prototypes), len(pool.strategies)))
@@ -0,0 +1,53 @@
+"""
+Keys and encoding of the pairwise interaction table. A match between two
+deterministic players without noise always has the same interactions,
+whichever contest it is played in, so they are stored once per pair of
+strategies, number of turns and game and reused by later contests.
+"""
+import hashlib
+import json
+
+import axelrod as axl
+
+
+def pair_key(players, turns, game, noise=0):
+    """
+    Return the key of a match and whether its players are in the reverse
+    of the stored order, or None if the match is not deterministic. The
+    players must already have received their match attributes.
+
+    Parameters
+    ----------
+        players: list of axelrod.Player
+            the two players of the match
+        turns: int
+            number of turns of the match
+        game: axelrod.Game
+            game used to score the match
+        noise: float
+            noise of the match
+    """
+    if noise or any(p.classifier['stochastic'] for p in players):
+        return None
+    # str includes the parameters of players that take any
+    names = [str(p) for p in players]
+    canonical = json.dumps({
+        'players': sorted(names),
+        'turns': turns,
+        'game': game.RPST(),
+        'axelrod': axl.__version__,
+    }, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest(), names[0] > names[1]
+
+
+def encode(interactions, flipped=False):
+    """encode the interactions of a match as a string of action pairs"""
+    if flipped:
+        return ''.join(s2 + s1 for s1, s2 in interactions)
+    return ''.join(s1 + s2 for s1, s2 in interactions)
+
+
+def decode(data, flipped=False):
+    """decode the interactions of a match from a string of action pairs"""
+    first, second = (1, 0) if flipped else (0, 1)
+    return [(data[i + first], data[i + second]) for i in range(0, len(data), 2)]
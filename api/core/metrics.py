@@ -0,0 +1,269 @@
+"""
+In-process registry of counters and histograms rendered in the
+Prometheus text exposition format at /metrics/.
+
+Every web and worker process claims a file in METRICS_DIR named after
+its slot, such as web-0.json or worker-1.json, and dumps its registry
+there: workers after every contest and web processes every
+METRICS_DUMP_INTERVAL seconds. The process answering /metrics/ merges
+the other processes' dumps into its own metrics when it renders them.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+import glob
+import json
+import os
+import threading
+import time
+
+DEFAULT_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60, 300)
+
+
+class Metric:
+    """
+    A named metric holding one value per combination of label values.
+
+    Parameters
+    ----------
+        name: str
+            metric name, without the _bucket, _sum and _count suffixes
+            of histograms
+        documentation: str
+            help text of the metric
+        labelnames: tuple of str
+            names of the labels every observation is given
+    """
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError('Expected labels {}, got {}'.format(
+                self.labelnames, tuple(labels)))
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def copy(self):
+        """a snapshot of the values by label values"""
+        with self._lock:
+            return {key: list(value) if isinstance(value, list) else value
+                    for key, value in self.values.items()}
+
+    def _format_labels(self, key, **extra):
+        pairs = list(zip(self.labelnames, key)) + list(extra.items())
+        if not pairs:
+            return ''
+        return '{' + ','.join('{}="{}"'.format(
+            name, value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+            for name, value in pairs) + '}'
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    @staticmethod
+    def combine(value, other):
+        return value + other
+
+    def samples(self, values):
+        for key, value in sorted(values.items()):
+            yield self.name + self._format_labels(key), value
+
+
+class Histogram(Metric):
+    """
+    Metric counting observations in cumulative buckets. Each value is a
+    list of the per bucket counts followed by the sum of the
+    observations.
+    """
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self.values.setdefault(key, [0] * (len(self.buckets) + 2))
+            counts[bisect_left(self.buckets, value)] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """observe the seconds taken by the body of a with statement"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    @staticmethod
+    def combine(value, other):
+        return [a + b for a, b in zip(value, other)]
+
+    def samples(self, values):
+        for key, counts in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                yield self.name + '_bucket' + self._format_labels(key, le=le), cumulative
+            yield self.name + '_sum' + self._format_labels(key), counts[-1]
+            yield self.name + '_count' + self._format_labels(key), cumulative
+
+
+def read_state(path):
+    """the state dumped to path, or None if it cannot be read"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # a process may have exited while writing
+        return None
+
+
+def clear_dumps(directory, prefix):
+    """
+    delete the dumps of a group of processes, such as the workers, when
+    the group is started afresh
+    """
+    for path in glob.glob(os.path.join(directory, '{}-*.json'.format(prefix))):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class Registry:
+    """collection of metrics that can be rendered, dumped and merged"""
+
+    def __init__(self):
+        self.metrics = {}
+        # file this process dumps to, once it has claimed one
+        self.dump_path = None
+        self._dumped_at = None
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def state(self):
+        """values of every metric as a JSON serializable dictionary"""
+        return {
+            name: [[list(key), value] for key, value in metric.copy().items()]
+            for name, metric in self.metrics.items()
+        }
+
+    def load(self, path):
+        """add the values dumped to path, if any, to the metrics"""
+        for name, values in (read_state(path) or {}).items():
+            metric = self.metrics.get(name)
+            if metric is None:
+                continue
+            with metric._lock:
+                for key, value in values:
+                    key = tuple(key)
+                    metric.values[key] = (metric.combine(metric.values[key], value)
+                                          if key in metric.values else value)
+
+    def claim(self, path):
+        """
+        Dump to path from now on, carrying on from the values that the
+        process which held it before dumped there, so that counters do
+        not go backwards when a process is replaced.
+        """
+        self.load(path)
+        self.dump_path = path
+        self.dump()
+
+    def dump(self, path=None):
+        """
+        write the state to path, or to the claimed file, replacing any
+        earlier dump atomically
+        """
+        path = path or self.dump_path
+        if path is None:
+            return
+        temporary = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temporary, 'w') as f:
+            json.dump(self.state(), f)
+        os.replace(temporary, path)
+        self._dumped_at = time.monotonic()
+
+    def dump_if_due(self, interval):
+        """dump to the claimed file if the last dump is interval seconds old"""
+        if self.dump_path is None:
+            return
+        if self._dumped_at is None or time.monotonic() - self._dumped_at >= interval:
+            self.dump()
+
+    def render(self, directory=None):
+        """
+        Render the metrics in the Prometheus text format, adding the
+        values dumped by other processes to directory, if any. The
+        file this process dumps to is left out as its values are
+        already in the metrics.
+        """
+        paths = sorted(glob.glob(os.path.join(directory, '*.json'))) if directory else []
+        own = os.path.abspath(self.dump_path) if self.dump_path else None
+        states = [read_state(path) for path in paths if os.path.abspath(path) != own]
+        states = [state for state in states if state is not None]
+
+        lines = []
+        for metric in self.metrics.values():
+            values = metric.copy()
+            for state in states:
+                for key, value in state.get(metric.name, []):
+                    key = tuple(key)
+                    values[key] = metric.combine(values[key], value) if key in values else value
+            lines.append('# HELP {} {}'.format(metric.name, metric.documentation))
+            lines.append('# TYPE {} {}'.format(metric.name, metric.type))
+            for sample, value in metric.samples(values):
+                lines.append('{} {}'.format(sample, float(value)))
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+requests_total = registry.counter(
+    'axelrod_requests_total', 'Requests handled by the API',
+    ('view', 'action', 'method', 'status'))
+request_seconds = registry.histogram(
+    'axelrod_request_seconds', 'Time taken to handle a request',
+    ('view', 'action'))
+contest_start_seconds = registry.histogram(
+    'axelrod_contest_start_seconds', 'Time taken to queue a contest or serve it from the cache',
+    ('contest',))
+contest_run_seconds = registry.histogram(
+    'axelrod_contest_run_seconds', 'Time taken to play a contest',
+    ('contest',))
+contests_total = registry.counter(
+    'axelrod_contests_total', 'Contests finished by the workers',
+    ('contest', 'status'))
+results_serialize_seconds = registry.histogram(
+    'axelrod_results_serialize_seconds', 'Time taken to serialize the results of a contest',
+    ('serializer',))
+results_write_seconds = registry.histogram(
+    'axelrod_results_write_seconds', 'Time taken to store the results of a contest',
+    ('contest',))
+strategy_filter_seconds = registry.histogram(
+    'axelrod_strategy_filter_seconds', 'Time taken to filter the strategy catalogue')
+catalogue_encode_seconds = registry.histogram(
+    'axelrod_catalogue_encode_seconds', 'Time taken to serialize the strategy catalogue')
@@ -0,0 +1,147 @@
+import gzip
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+
+from api.core import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class MetricsMiddleware:
+    """
+    Count requests and time them, labelled by the view class and the
+    viewset action that handled them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.metrics_labels = {'view': 'none', 'action': ''}
+        start = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+        metrics.request_seconds.observe(elapsed, **request.metrics_labels)
+        metrics.requests_total.inc(
+            method=request.method, status=response.status_code, **request.metrics_labels)
+        metrics.registry.dump_if_due(settings.METRICS_DUMP_INTERVAL)
+        return response
+
+    @staticmethod
+    def process_view(request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, 'cls', view_func)
+        actions = getattr(view_func, 'actions', None) or {}
+        request.metrics_labels = {
+            'view': view.__name__,
+            'action': actions.get(request.method.lower(), ''),
+        }
+
+
+class TrafficRecorderMiddleware:
+    """
+    Append requests to the API's viewsets to TRAFFIC_RECORD_FILE as lines
+    of JSON so the traffic can be replayed by `manage.py loadgen
+    --replay`. Other routes, such as the admin and the login views, and
+    request bodies that are not JSON are never recorded, so credentials
+    posted in forms do not end up on disk. Left out of the middleware
+    chain when the setting is empty.
+    """
+
+    def __init__(self, get_response):
+        if not settings.TRAFFIC_RECORD_FILE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.path = settings.TRAFFIC_RECORD_FILE
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def replayable(request):
+        """whether request is to an API viewset with no body or a JSON one"""
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return False
+        if not getattr(match.func, 'actions', None):
+            return False
+        return not request.body or request.content_type == 'application/json'
+
+    def __call__(self, request):
+        if self.replayable(request):
+            line = json.dumps({
+                'method': request.method,
+                'path': request.get_full_path(),
+                'body': request.body.decode('utf-8', 'replace') or None,
+                'time': time.time(),
+            })
+            with self._lock, open(self.path, 'a') as f:
+                f.write(line + '\n')
+        return self.get_response(request)
+
+
+def accepted_encoding(header):
+    """
+    The encoding, br or gzip, the client prefers of the ones available
+    according to an Accept-Encoding header, or None for neither.
+    """
+    available = ['br', 'gzip'] if brotli is not None else ['gzip']
+    weights = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        weight = 1.0
+        if params.strip().startswith('q='):
+            try:
+                weight = float(params.strip()[2:])
+            except ValueError:
+                continue
+        weights[coding.strip().lower()] = weight
+    # ties go to the first available encoding, which compresses better
+    choices = [(weights.get(coding, weights.get('*', 0)), coding) for coding in available]
+    weight, coding = max(choices, key=lambda choice: choice[0])
+    return coding if weight > 0 else None
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies of at least COMPRESS_MIN_BYTES with brotli
+    or gzip, whichever the client prefers. Streaming responses, such as
+    Server-Sent Events, are left as they are so that every event is
+    sent as soon as it is written.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.streaming or response.has_header('Content-Encoding') or
+                len(response.content) < settings.COMPRESS_MIN_BYTES):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = accepted_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        if encoding == 'br':
+            content = brotli.compress(response.content, quality=settings.BROTLI_QUALITY)
+        else:
+            content = gzip.compress(response.content, compresslevel=settings.GZIP_LEVEL)
+        if len(content) >= len(response.content):
+            return response
+
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        # the compressed body is not byte for byte the tagged one
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
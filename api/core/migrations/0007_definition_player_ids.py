@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11 on 2026-10-18 13:55
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_remove_tournamentdefinition_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matchdefinition',
+            name='player_ids',
+            field=models.TextField(default='[]'),
+        ),
+        migrations.AddField(
+            model_name='morandefinition',
+            name='player_ids',
+            field=models.TextField(default='[]'),
+        ),
+        migrations.AddField(
+            model_name='tournamentdefinition',
+            name='player_ids',
+            field=models.TextField(default='[]'),
+        ),
+    ]
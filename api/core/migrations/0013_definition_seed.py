@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11 on 2026-10-18 14:14
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matchdefinition',
+            name='seed',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='morandefinition',
+            name='seed',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tournamentdefinition',
+            name='seed',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11 on 2026-10-18 14:16
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_definition_seed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MoranPopulations',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.IntegerField()),
+                ('strategies', models.TextField()),
+                ('counts', models.BinaryField()),
+                ('moran', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='population_chunks', to='core.MoranProcess')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='moranpopulations',
+            unique_together=set([('moran', 'start')]),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11 on 2026-10-18 14:18
+from __future__ import unicode_literals
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_moranpopulations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MoranFixation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('status', models.IntegerField(choices=[(0, 'PENDING'), (1, 'RUNNING'), (2, 'SUCCESS'), (3, 'FAILED')], default=0)),
+                ('results', django.contrib.postgres.fields.jsonb.JSONField(null=True)),
+                ('metadata', django.contrib.postgres.fields.jsonb.JSONField(null=True)),
+                ('batch', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='core.Batch')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='MoranFixationDefinition',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('turns', models.IntegerField()),
+                ('noise', models.FloatField()),
+                ('player_ids', models.TextField(default='[]')),
+                ('seed', models.IntegerField(blank=True, null=True)),
+                ('mode', models.CharField(max_length=2)),
+                ('replicates', models.IntegerField()),
+                ('precision', models.FloatField(blank=True, null=True)),
+                ('processes', models.IntegerField(default=1)),
+                ('player_list', models.ManyToManyField(to='core.InternalStrategy')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='moranfixation',
+            name='definition',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.MoranFixationDefinition'),
+        ),
+    ]
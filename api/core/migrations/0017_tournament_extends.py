@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11 on 2026-10-18 14:22
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_pairinteractions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TournamentInteractions',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.BinaryField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='extends',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='extensions', to='core.Tournament'),
+        ),
+        migrations.AddField(
+            model_name='tournamentinteractions',
+            name='tournament',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stored_interactions', to='core.Tournament'),
+        ),
+    ]
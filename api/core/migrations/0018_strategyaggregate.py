@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11 on 2026-10-18 14:49
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_tournament_extends'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StrategyAggregate',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('turns', models.IntegerField()),
+                ('noise', models.FloatField()),
+                ('repetitions', models.IntegerField()),
+                ('tournaments', models.IntegerField(default=0)),
+                ('score_total', models.FloatField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('matches', models.IntegerField(default=0)),
+                ('strategy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aggregates', to='core.InternalStrategy')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='strategyaggregate',
+            unique_together=set([('strategy', 'turns', 'noise', 'repetitions')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='strategyaggregate',
+            index_together=set([('turns', 'noise', 'repetitions')]),
+        ),
+    ]
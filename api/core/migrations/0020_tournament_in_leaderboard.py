@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11 on 2026-10-18 15:12
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_contest_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='in_leaderboard',
+            field=models.BooleanField(default=False),
+        ),
+    ]
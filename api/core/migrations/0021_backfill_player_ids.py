@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+
+from django.db import migrations
+
+
+def backfill_player_ids(apps, schema_editor):
+    """
+    fill player_ids of the definitions created before it was added from
+    their player_list, in the order the players were added to it
+    """
+    for name in ('MatchDefinition', 'MoranDefinition', 'TournamentDefinition'):
+        model = apps.get_model('core', name)
+        through = model.player_list.through
+        field = '{}_id'.format(name.lower())
+        for definition_id in (model.objects.filter(player_ids='[]')
+                              .values_list('id', flat=True).iterator()):
+            player_ids = list(through.objects
+                              .filter(**{field: definition_id})
+                              .order_by('id')
+                              .values_list('internalstrategy_id', flat=True))
+            if player_ids:
+                model.objects.filter(id=definition_id).update(
+                    player_ids=json.dumps(player_ids))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_tournament_in_leaderboard'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_player_ids, migrations.RunPython.noop),
+    ]
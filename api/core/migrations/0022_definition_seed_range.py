@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11 on 2026-10-18 15:21
+from __future__ import unicode_literals
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_backfill_player_ids'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='matchdefinition',
+            name='seed',
+            field=models.IntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(4294967295)]),
+        ),
+        migrations.AlterField(
+            model_name='morandefinition',
+            name='seed',
+            field=models.IntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(4294967295)]),
+        ),
+        migrations.AlterField(
+            model_name='moranfixationdefinition',
+            name='seed',
+            field=models.IntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(4294967295)]),
+        ),
+        migrations.AlterField(
+            model_name='tournamentdefinition',
+            name='seed',
+            field=models.IntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(4294967295)]),
+        ),
+    ]
@@ -1,17 +1,34 @@
+import json
+
+from django.conf import settings
 from django.contrib.postgres.fields import JSONField
+from django.contrib.postgres.fields.jsonb import KeyTransform
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import IntegrityError, transaction
 from django.db.models import (
+    BinaryField,
     BooleanField,
     DateTimeField,
     CharField,
+    F,
+    Func,
     IntegerField,
     ForeignKey,
     FloatField,
     Model,
     ManyToManyField,
+    OneToOneField,
     TextField,
 )
+from django.db.models.functions import Cast
 import axelrod as axl
 
+from api.core import analytics, columnar, engine, fixation, history, memo
+from api.core.progress import ProgressTournament
+
+# numpy, which axelrod seeds, takes seeds between 0 and 2 ** 32 - 1
+MAX_SEED = 2 ** 32 - 1
+
 
 class Contest(Model):
 
@@ -32,10 +49,120 @@ class Contest(Model):
     last_updated = DateTimeField(auto_now=True, editable=False)
     status = IntegerField(choices=STATUS_CHOICES, default=PENDING)
     results = JSONField(null=True)
+    # timings recorded by the worker that played the contest
+    metadata = JSONField(null=True)
+    batch = ForeignKey('Batch', null=True)
+    # last time the worker playing a RUNNING contest showed it was alive
+    heartbeat = DateTimeField(null=True)
+
+    # whether results of deterministic contests may be stored in and
+    # served from the result cache
+    cacheable = False
+    # whether a seeded contest gives the same results when played by
+    # several processes
+    parallel_reproducible = False
+    # related objects needed to rebuild the results of many contests
+    results_related = ()
 
     class Meta:
         abstract = True
 
+    def store_results(self, results):
+        """
+        Set the serialized results of the contest. The contest itself
+        still has to be saved by the caller.
+        """
+        self.results = results
+
+    def add_to_leaderboard(self, results):
+        """
+        Hook for contests whose results are added to the leaderboard,
+        called by the worker in the transaction that saves the finished
+        contest. Other contests have nothing to add.
+        """
+
+    def get_results(self):
+        """the serialized results of the contest"""
+        return self.results
+
+    def get_typed_results(self):
+        """the results with matrix shaped values as NumPy arrays"""
+        results = self.get_results()
+        if results is None:
+            return None
+        summary, arrays = columnar.split_results(results)
+        summary.update(arrays)
+        return summary
+
+    @classmethod
+    def with_results_json(cls):
+        """
+        Contests annotated with their results as the JSON text stored in
+        the database, which is read without being parsed.
+        """
+        return cls.objects.defer('results').annotate(
+            results_json=Cast('results', TextField()))
+
+    def get_results_json(self):
+        """the results of a contest read by with_results_json as JSON text"""
+        return self.results_json
+
+    @classmethod
+    def results_subset(cls, pk, keys, as_arrays=False):
+        """
+        Read the given keys of a contest's results with JSONB key
+        extraction so the rest of the document is never loaded.
+        Missing keys map to None.
+
+        Parameters
+        ----------
+            pk: int
+                id of the contest
+            keys: list of strings
+                results keys, which must be plain identifiers
+            as_arrays: bool
+                whether matrix shaped values are returned as NumPy arrays
+        """
+        subset, _ = cls.read_results(pk, keys, as_arrays)
+        return subset
+
+    @classmethod
+    def read_results(cls, pk, keys, as_arrays=False):
+        """
+        Read keys of a contest's results as results_subset does and also
+        return the keys that are not in the results at all, as opposed
+        to stored as null.
+        """
+        annotations = {}
+        for i, key in enumerate(keys):
+            annotations['results_{}'.format(i)] = KeyTransform(key, 'results')
+            # 'null' for a stored null and NULL for a missing key
+            annotations['type_{}'.format(i)] = Func(
+                KeyTransform(key, 'results'), function='jsonb_typeof', output_field=TextField())
+        row = cls.objects.filter(id=pk).annotate(**annotations).values(*annotations).get()
+        subset = {key: row['results_{}'.format(i)] for i, key in enumerate(keys)}
+        missing = [key for i, key in enumerate(keys) if row['type_{}'.format(i)] is None]
+        if as_arrays:
+            subset, arrays = columnar.split_results(subset)
+            subset.update(arrays)
+        return subset, missing
+
+    def run(self, strategies, processes=1):
+        """
+        Play the contest and return the axelrod result object. Status
+        transitions are handled by the worker that claimed the contest.
+        Abstract hook that every contest type implements.
+
+        Parameters
+        ----------
+            strategies: list of axelrod.Strategy
+                **instantiated** axelrod Strategy classes that are
+                playing the contest
+            processes: int
+                the number of processes the contest may use
+        """
+        raise NotImplementedError
+
 
 class ContestDefinition(Model):
     created = DateTimeField(auto_now_add=True, editable=False)
@@ -43,48 +170,299 @@ class ContestDefinition(Model):
     turns = IntegerField()
     noise = FloatField()
     player_list = ManyToManyField('InternalStrategy')
+    # player_list is a set so the submitted order and any duplicate
+    # players are kept here as a JSON encoded list of strategy ids
+    player_ids = TextField(default='[]')
+    # seeds axelrod's random number generators before the contest is
+    # played so that stochastic and noisy contests can be reproduced
+    seed = IntegerField(null=True, blank=True, validators=[
+        MinValueValidator(0), MaxValueValidator(MAX_SEED)])
 
     class Meta:
         abstract = True
 
+    @property
+    def strategy_ids(self):
+        return json.loads(self.player_ids)
+
 
 class Tournament(Contest):
 
+    cacheable = True
+    results_related = ('result_arrays',)
     definition = ForeignKey('TournamentDefinition')
+    # tournament whose interactions are reused, when this one adds
+    # players or repetitions to it
+    extends = ForeignKey('self', null=True, related_name='extensions')
+    # whether the results have been added to the leaderboard totals
+    in_leaderboard = BooleanField(default=False)
+
+    def store_results(self, results):
+        """
+        Keep the summary statistics in the results field and store the
+        matrix shaped results as arrays in a separate row.
+        """
+        summary, arrays = columnar.split_results(results)
+        ResultArrays.objects.update_or_create(
+            tournament=self, defaults={'data': columnar.encode_arrays(arrays)})
+        self.results = summary
+
+    @property
+    def counts_in_leaderboard(self):
+        """
+        Whether the results count in the leaderboard. Results served
+        from the cache and extensions repeat tournaments that already
+        count, so they are left out.
+        """
+        return self.extends_id is None and not (self.metadata or {}).get('cached')
+
+    def add_to_leaderboard(self, results):
+        """
+        Add the results to the leaderboard if they count and have not
+        been added already, so a tournament played twice after being
+        requeued is only counted once.
+        """
+        if not self.counts_in_leaderboard:
+            return
+        marked = (Tournament.objects.filter(id=self.id, in_leaderboard=False)
+                  .update(in_leaderboard=True))
+        if marked:
+            _, arrays = columnar.split_results(results)
+            StrategyAggregate.add_tournament(self.definition, arrays)
+            self.in_leaderboard = True
+
+    def get_results(self):
+        """
+        Rebuild the full results from the summary and the stored arrays.
+        Tournaments stored before the arrays were split out already
+        hold their full results.
+        """
+        try:
+            data = self.result_arrays.data
+        except ResultArrays.DoesNotExist:
+            return self.results
+        if self.results is None:
+            return None
+        return columnar.join_results(self.results, columnar.decode_arrays(data))
+
+    def get_typed_results(self):
+        try:
+            data = self.result_arrays.data
+        except ResultArrays.DoesNotExist:
+            return super().get_typed_results()
+        if self.results is None:
+            return None
+        results = dict(self.results)
+        results.update(columnar.decode_arrays(data))
+        return results
 
-    def run(self, strategies):
-        tournament = axl.Tournament(strategies,
-                                    turns=self.definition.turns,
-                                    noise=self.definition.noise,
-                                    repetitions=self.definition.repetitions,
-                                    with_morality=self.definition.with_morality,
-                                    )
-        self.status = 1
-        self.save()
-        results = tournament.play()
-        self.status = 2
-        self.save()
+    @classmethod
+    def with_results_json(cls):
+        return super().with_results_json().select_related('result_arrays')
+
+    def get_results_json(self):
+        try:
+            data = self.result_arrays.data
+        except ResultArrays.DoesNotExist:
+            return self.results_json
+        if self.results_json is None:
+            return None
+        return columnar.join_results_json(self.results_json, columnar.decode_arrays(data))
+
+    @classmethod
+    def read_results(cls, pk, keys, as_arrays=False):
+        """
+        Read the given keys of a tournament's results, decompressing
+        only the requested arrays for keys that are not in the summary.
+        """
+        subset, missing = super().read_results(pk, keys, as_arrays)
+        if missing:
+            try:
+                data = ResultArrays.objects.values_list(
+                    'data', flat=True).get(tournament_id=pk)
+            except ResultArrays.DoesNotExist:
+                return subset, missing
+            arrays = columnar.decode_arrays(data, missing)
+            for key, array in arrays.items():
+                subset[key] = array if as_arrays else array.tolist()
+            missing = [key for key in missing if key not in arrays]
+        return subset, missing
+
+    def extendable(self, strategies):
+        """
+        Whether the tournament can be extended. A seeded tournament with
+        random play can not, as replaying only part of it draws other
+        random numbers than playing the extended tournament from the start.
+        """
+        from api.core import cache
+        return self.definition.seed is None or cache.is_deterministic(
+            self.definition, strategies)
+
+    def run(self, strategies, processes=1):
+        """
+        Play the tournament and, if it is extendable, store its
+        interactions so that it can be extended later. Extensions reuse
+        the stored interactions of the tournament they extend.
+        """
+        previous = None
+        if self.extends_id is not None:
+            data = (TournamentInteractions.objects
+                    .filter(tournament_id=self.extends_id)
+                    .values_list('data', flat=True).first())
+            if data is not None:
+                previous = columnar.decode_interactions(data)
+
+        progress = TournamentProgress(tournament=self)
+        tournament = ProgressTournament(strategies,
+                                        progress=progress,
+                                        memo=PairInteractions,
+                                        previous=previous,
+                                        record=self.extendable(strategies),
+                                        turns=self.definition.turns,
+                                        noise=self.definition.noise,
+                                        repetitions=self.definition.repetitions,
+                                        with_morality=self.definition.with_morality,
+                                        )
+        TournamentProgress.objects.filter(tournament=self).delete()
+        progress.total = tournament.matches_total
+        progress.save()
+        # axelrod plays serially when processes is None
+        results = tournament.play(processes=processes if processes > 1 else None)
+        if tournament.recorded is not None:
+            TournamentInteractions.objects.update_or_create(
+                tournament=self, defaults={'data': columnar.encode_interactions(
+                    tournament.recorded_pairs, tournament.recorded)})
         return results
 
 
+class ResultArrays(Model):
+    """
+    Matrix shaped results of a tournament, such as the payoff matrix
+    and the per repetition scores, stored as a compressed NumPy npz
+    archive so the tournament row only holds its summary statistics.
+    """
+    tournament = OneToOneField('Tournament', related_name='result_arrays')
+    data = BinaryField()
+
+
+class TournamentInteractions(Model):
+    """
+    Every interaction of a tournament, stored as a compressed array of
+    defections so the tournament can be extended without replaying it.
+    """
+    tournament = OneToOneField('Tournament', related_name='stored_interactions')
+    data = BinaryField()
+
+
+class TournamentProgress(Model):
+    """
+    Matches played so far by a running tournament, written by the
+    worker so clients can follow it without reloading the tournament.
+    """
+    tournament = OneToOneField('Tournament', related_name='progress')
+    completed = IntegerField(default=0)
+    total = IntegerField(default=0)
+    started = DateTimeField(auto_now_add=True, editable=False)
+    last_updated = DateTimeField(auto_now=True, editable=False)
+    # first interaction of the most recently played player pairs
+    interactions = JSONField(null=True)
+
+    @property
+    def eta(self):
+        """estimated seconds until every match has been played"""
+        if not self.completed or self.started is None or self.last_updated is None:
+            return None
+        elapsed = (self.last_updated - self.started).total_seconds()
+        return elapsed * (self.total - self.completed) / self.completed
+
+
+class StrategyAggregate(Model):
+    """
+    Totals of the results of every finished tournament for one strategy
+    and one combination of turns, noise and repetitions. Tournaments are
+    added as they finish so the leaderboard is read from here rather
+    than from the results of every tournament. Cached results and
+    extensions are not added, see Tournament.counts_in_leaderboard.
+    """
+    strategy = ForeignKey('InternalStrategy', related_name='aggregates')
+    turns = IntegerField()
+    noise = FloatField()
+    repetitions = IntegerField()
+    # number of times the strategy played in these tournaments
+    tournaments = IntegerField(default=0)
+    # sum of the mean normalised score of every time it played
+    score_total = FloatField(default=0)
+    wins = IntegerField(default=0)
+    matches = IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('strategy', 'turns', 'noise', 'repetitions')
+        index_together = ('turns', 'noise', 'repetitions')
+
+    @classmethod
+    def add_tournament(cls, definition, arrays):
+        """
+        Add the results of a finished tournament to the totals of its
+        strategies, incrementing them in the database so that workers
+        finishing tournaments at the same time do not lose updates.
+
+        Parameters
+        ----------
+            definition: TournamentDefinition
+                definition of the tournament
+            arrays: dict
+                matrix shaped results of the tournament, as split out by
+                columnar.split_results
+        """
+        totals = analytics.strategy_totals(
+            definition.strategy_ids, arrays['normalised_scores'], arrays['wins'])
+        group = {
+            'turns': definition.turns,
+            'noise': definition.noise,
+            'repetitions': definition.repetitions,
+        }
+        with transaction.atomic():
+            for _id, (count, score_total, wins, matches) in sorted(totals.items()):
+                cls.objects.get_or_create(strategy_id=_id, **group)
+                cls.objects.filter(strategy_id=_id, **group).update(
+                    tournaments=F('tournaments') + count,
+                    score_total=F('score_total') + score_total,
+                    wins=F('wins') + wins,
+                    matches=F('matches') + matches,
+                )
+
+
 class TournamentDefinition(ContestDefinition):
     repetitions = IntegerField()
     with_morality = BooleanField()
+    processes = IntegerField(default=1)
 
 
 class Match(Contest):
 
+    cacheable = True
     definition = ForeignKey('MatchDefinition')
 
-    def run(self, strategies):
+    def run(self, strategies, processes=1):
         match = axl.Match(strategies,
                           turns=self.definition.turns,
                           noise=self.definition.noise)
-        self.status = 1
-        self.save()
-        match.play()
-        self.status = 2
-        self.save()
+        key = memo.pair_key(match.players, match.turns, match.game, match.noise)
+        if key is not None:
+            key, flipped = key
+            found = PairInteractions.get_many([key])
+            if key in found:
+                match.result = memo.decode(found[key], flipped)
+                return match
+
+        interactions = engine.play(match.players, match.turns,
+                                   game=match.game, noise=match.noise)
+        if interactions is None:
+            match.play()
+        else:
+            match.result = interactions[0]
+        if key is not None:
+            PairInteractions.put_many({key: memo.encode(match.result, flipped)})
         return match
 
 
@@ -98,24 +476,153 @@ class MoranProcess(Contest):
 
     definition = ForeignKey('MoranDefinition')
 
-    def run(self, strategies):
+    def run(self, strategies, processes=1):
+        """
+        Step through the process one generation at a time. Every
+        generation's population is appended to MoranPopulations rows
+        while the populations and scores kept on the process, and so in
+        the results, are downsampled to MORAN_INLINE_GENERATIONS.
+        """
         mp = axl.MoranProcess(strategies,
                               turns=self.definition.turns,
                               noise=self.definition.noise,
                               mode=self.definition.mode,
                               )
-        self.status = 1
-        self.save()
-        mp.play()
-        self.status = 2
-        self.save()
+        MoranPopulations.objects.filter(moran=self).delete()
+        strategies = sorted(set(mp.populations[0]))
+        populations = history.PopulationHistory(
+            strategies, self.save_populations, settings.MORAN_HISTORY_CHUNK_SIZE)
+        inline_populations = history.Downsampler(settings.MORAN_INLINE_GENERATIONS)
+        inline_scores = history.Downsampler(settings.MORAN_INLINE_GENERATIONS)
+
+        populations.append(mp.populations[0])
+        inline_populations.append(mp.populations.pop())
+        for _ in mp:
+            populations.append(mp.populations[-1])
+            inline_populations.append(mp.populations.pop())
+            if mp.score_history:
+                inline_scores.append(mp.score_history.pop())
+        populations.flush()
+
+        mp.populations = inline_populations.samples
+        mp.score_history = inline_scores.samples
+        mp.generations = populations.generations
+        mp.history_interval = inline_populations.interval
         return mp
 
+    def save_populations(self, strategies, start, counts):
+        MoranPopulations.objects.create(
+            moran=self, start=start, strategies=json.dumps(strategies),
+            counts=history.encode_counts(counts))
+
 
 class MoranDefinition(ContestDefinition):
     mode = CharField(max_length=2)
 
 
+class MoranFixation(Contest):
+
+    definition = ForeignKey('MoranFixationDefinition')
+    # replicates get their seeds from a generator seeded once, so a
+    # seeded estimate is the same whichever process plays each replicate
+    parallel_reproducible = True
+
+    def run(self, strategies, processes=1):
+        estimate = fixation.FixationEstimate(
+            [type(s) for s in strategies],
+            turns=self.definition.turns,
+            noise=self.definition.noise,
+            mode=self.definition.mode,
+            max_replicates=self.definition.replicates,
+            precision=self.definition.precision,
+            batch_size=settings.FIXATION_BATCH_SIZE,
+        )
+        return estimate.play(processes=processes)
+
+
+class MoranFixationDefinition(ContestDefinition):
+    mode = CharField(max_length=2)
+    # most replicates to play and the confidence interval half width at
+    # which to stop early
+    replicates = IntegerField()
+    precision = FloatField(null=True, blank=True)
+    processes = IntegerField(default=1)
+
+
+class MoranPopulations(Model):
+    """
+    Population counts of a chunk of consecutive generations of a Moran
+    process, stored as an int32 array with one row per generation and
+    one column per strategy. Rows are only ever appended.
+    """
+    moran = ForeignKey('MoranProcess', related_name='population_chunks')
+    start = IntegerField()
+    # JSON encoded list of the strategy names of the columns
+    strategies = TextField()
+    counts = BinaryField()
+
+    class Meta:
+        unique_together = ('moran', 'start')
+
+    def populations(self):
+        """population of each generation as a dictionary of nonzero counts"""
+        strategies = json.loads(self.strategies)
+        return [
+            {name: count for name, count in zip(strategies, row) if count}
+            for row in history.decode_counts(self.counts, strategies).tolist()
+        ]
+
+
+class Batch(Model):
+    """
+    A group of contests of one type submitted together, such as the
+    points of a parameter sweep.
+    """
+    created = DateTimeField(auto_now_add=True, editable=False)
+    last_updated = DateTimeField(auto_now=True, editable=False)
+    contest_type = CharField(max_length=20)
+
+
+class PairInteractions(Model):
+    """
+    Interactions of a deterministic match between two strategies, kept
+    so that every later contest playing the same pair for the same
+    number of turns and game can reuse them. See api.core.memo for the
+    keys and the encoding.
+    """
+    key = CharField(max_length=64, primary_key=True)
+    interactions = TextField()
+    created = DateTimeField(auto_now_add=True, editable=False)
+
+    # keys per query, below the sqlite limit on query parameters
+    query_size = 500
+
+    @classmethod
+    def get_many(cls, keys):
+        """return a dictionary of the encoded interactions of the keys found"""
+        keys = list(keys)
+        found = {}
+        for i in range(0, len(keys), cls.query_size):
+            found.update(cls.objects.filter(
+                key__in=keys[i:i + cls.query_size]).values_list('key', 'interactions'))
+        return found
+
+    @classmethod
+    def put_many(cls, entries):
+        """
+        insert encoded interactions by key. Entries added meanwhile by
+        another worker hold the same interactions and are left as they are.
+        """
+        missing = set(entries).difference(cls.get_many(entries))
+        try:
+            with transaction.atomic():
+                cls.objects.bulk_create(
+                    cls(key=key, interactions=entries[key]) for key in missing)
+        except IntegrityError:
+            for key in missing:
+                cls.objects.get_or_create(key=key, defaults={'interactions': entries[key]})
+
+
 class InternalStrategy(Model):
     """
     This model is used to represent strategies in an internal
@@ -128,3 +635,14 @@ class InternalStrategy(Model):
     last_updated = DateTimeField(auto_now=True, editable=False)
 
 
+class CachedResult(Model):
+    """
+    Serialized results of a deterministic contest stored under a hash
+    of its definition so identical contests are only played once.
+    Rows are evicted least recently used first once the cache grows
+    past RESULT_CACHE_MAX_BYTES.
+    """
+    key = CharField(max_length=64, primary_key=True)
+    results = JSONField()
+    size = IntegerField()
+    last_used = DateTimeField(db_index=True)
@@ -0,0 +1,20 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class ContestCursorPagination(CursorPagination):
+    """
+    Page through contests newest first. The cursor encodes the last id
+    seen so each page is an indexed range scan however deep it is.
+    """
+    page_size = settings.CONTEST_PAGE_SIZE
+    ordering = '-id'
+
+
+class PopulationCursorPagination(CursorPagination):
+    """
+    Page through the population history of a Moran process in order of
+    the first generation of each chunk.
+    """
+    page_size = settings.MORAN_HISTORY_PAGE_SIZE
+    ordering = 'start'
@@ -0,0 +1,107 @@
+"""
+Strategy classes warmed once per process and a pool of prototype players
+for the strategies that are expensive to construct. Warming at boot,
+before the web or worker processes fork, means every process starts
+with the strategy modules imported and the prototypes built.
+"""
+import copy
+import random
+import time
+
+import numpy as np
+import axelrod as axl
+
+from api.core.utils import strategy_id
+
+# construction time above which a copyable strategy is pooled
+POOL_THRESHOLD = 0.001
+
+
+def construct(strategy):
+    """
+    Return a new player of strategy, the seconds its construction took
+    and whether it drew random numbers.
+    """
+    python_state, numpy_state = random.getstate(), np.random.get_state()
+    start = time.perf_counter()
+    player = strategy()
+    seconds = time.perf_counter() - start
+    new_numpy_state = np.random.get_state()
+    draws = (random.getstate() != python_state or
+             numpy_state[2:] != new_numpy_state[2:] or
+             not np.array_equal(numpy_state[1], new_numpy_state[1]))
+    return player, seconds, draws
+
+
+class StrategyPool:
+    """
+    Hand out players, copying a prototype of each pooled strategy rather
+    than constructing it again. A strategy is pooled when constructing
+    it takes at least threshold seconds, copying it is faster and its
+    construction does not draw random numbers, which a copy would repeat
+    and a seeded contest would no longer draw.
+
+    Parameters
+    ----------
+        strategies: list of axelrod.Strategy
+            strategy classes the pool hands out
+        threshold: float
+            construction time in seconds above which a strategy is
+            worth pooling
+    """
+
+    def __init__(self, strategies, threshold=POOL_THRESHOLD):
+        self.strategies = {strategy_id(s): s for s in strategies}
+        self.threshold = threshold
+        self.prototypes = {}
+        # cold, warm and copy construction seconds of every strategy
+        self.timings = {}
+        self.warm = False
+
+    def warm_up(self):
+        """construct every strategy twice, timing it, and build the prototypes"""
+        python_state, numpy_state = random.getstate(), np.random.get_state()
+        for _id, strategy in self.strategies.items():
+            _, cold, draws = construct(strategy)
+            prototype, warm, _ = construct(strategy)
+            try:
+                start = time.perf_counter()
+                copy.deepcopy(prototype)
+                copied = time.perf_counter() - start
+            except TypeError:
+                # players holding generators cannot be copied
+                copied = None
+            self.timings[_id] = {'cold': cold, 'warm': warm, 'copy': copied}
+            if (not draws and copied is not None and
+                    warm >= self.threshold and copied < warm):
+                self.prototypes[_id] = prototype
+        # warming up leaves the random number generators as they were
+        random.setstate(python_state)
+        np.random.set_state(numpy_state)
+        self.warm = True
+        return self
+
+    def player(self, _id):
+        """a new player of the strategy with the given id"""
+        prototype = self.prototypes.get(_id)
+        if prototype is not None:
+            return copy.deepcopy(prototype)
+        return self.strategies[_id]()
+
+    def players(self, ids):
+        return [self.player(_id) for _id in ids]
+
+
+default_pool = StrategyPool(axl.all_strategies)
+
+
+def warm():
+    """warm the process wide pool unless it has been already"""
+    if not default_pool.warm:
+        default_pool.warm_up()
+    return default_pool
+
+
+def players(ids):
+    """new players of the strategies with the given ids"""
+    return default_pool.players(ids)
@@ -0,0 +1,217 @@
+"""
+Progress reporting for tournaments played by the workers.
+"""
+from collections import OrderedDict
+from multiprocessing import Queue
+import time
+
+from django.conf import settings
+import axelrod as axl
+import numpy as np
+
+from api.core import engine, memo
+
+
+class ProgressTournament(axl.Tournament):
+    """
+    axelrod Tournament that records its progress after every chunk of
+    matches. Chunks are written back in this process whether or not the
+    matches are played in parallel, so progress is recorded either way.
+
+    Matches between memory-one players are played by the table driven
+    engine. When played serially, the deterministic ones are played
+    together before the rest of the chunks; they draw no random numbers
+    so the other matches see the same random sequence as they would
+    otherwise.
+
+    Deterministic pairs found in the memo table are not played at all
+    and the ones that are played are added to it.
+
+    Parameters
+    ----------
+        progress: TournamentProgress
+            progress row updated with the completed matches and the
+            first interaction of the most recently played pairs. Writes
+            are throttled to one every PROGRESS_WRITE_INTERVAL seconds.
+        memo: PairInteractions
+            table of the interactions of deterministic matches, with
+            get_many and put_many class methods
+        previous: dict
+            interactions of an earlier tournament between the first
+            players, by index pair. Its repetitions are reused and only
+            the missing ones are played.
+        record: bool
+            whether to keep every interaction as a boolean array of
+            defections with shape (pairs, repetitions, turns, 2) in the
+            recorded attribute, its rows in the order of recorded_pairs
+    """
+
+    def __init__(self, players, progress=None, memo=None, previous=None,
+                 record=False, **kwargs):
+        super().__init__(players, **kwargs)
+        self.progress = progress
+        self.memo = memo
+        self.previous = previous or {}
+        self.recorded = None
+        if record:
+            self.recorded_pairs = sorted(
+                index_pair for index_pair, _, _ in self.match_generator.build_match_chunks())
+            self.recorded = np.zeros(
+                (len(self.recorded_pairs), self.repetitions, self.turns, 2), dtype=bool)
+            self._recorded_rows = {pair: i for i, pair in enumerate(self.recorded_pairs)}
+            self._recorded_counts = [0] * len(self.recorded_pairs)
+        self._unwritten = {}
+        self.matches_total = len(self.match_generator) * self.repetitions
+        self._recent_interactions = OrderedDict()
+        self._last_write = None
+        # memo keys of the deterministic pairs left to play and the
+        # encoded interactions of the ones played so far
+        self._memo_keys = {}
+        self._memo_entries = {}
+
+    def _unplayed_chunks(self):
+        """
+        Write the interactions of the pairs found in the previous
+        tournament or the memo table and return the chunks, or the
+        remaining repetitions of them, that still have to be played.
+        """
+        chunks = []
+        for chunk in self.match_generator.build_match_chunks():
+            index_pair, match_params, repetitions = chunk
+            previous = self.previous.get(index_pair, [])[:repetitions]
+            if len(previous) == repetitions:
+                self._write_interactions({index_pair: previous})
+                continue
+            if previous:
+                # the result set expects the repetitions of a pair to
+                # be written together, so these wait for the new ones
+                self._unwritten[index_pair] = previous
+                chunk = (index_pair, match_params, repetitions - len(previous))
+            chunks.append(chunk)
+        if self.memo is None:
+            return chunks
+        keys = {}
+        for index_pair, match_params, _ in chunks:
+            if len(match_params) != 4:
+                return chunks
+            turns, game, _, noise = match_params
+            players = [self.players[index].clone() for index in index_pair]
+            for player in players:
+                player.set_match_attributes(length=turns, game=game, noise=noise)
+            key = memo.pair_key(players, turns, game, noise)
+            if key is not None:
+                keys[index_pair] = key
+
+        found = self.memo.get_many({key for key, _ in keys.values()})
+        remaining = []
+        for chunk in chunks:
+            index_pair, _, repetitions = chunk
+            key, flipped = keys.get(index_pair, (None, False))
+            if key in found:
+                interactions = memo.decode(found[key], flipped)
+                self._write_interactions({index_pair: [interactions] * repetitions})
+            else:
+                if key is not None:
+                    self._memo_keys[index_pair] = key, flipped
+                remaining.append(chunk)
+        return remaining
+
+    def _store_memo(self):
+        if self._memo_entries:
+            self.memo.put_many(self._memo_entries)
+            self._memo_entries = {}
+
+    def _run_parallel(self, processes=2, progress_bar=False):
+        """axelrod's parallel run over the chunks missing from the memo table"""
+        work_queue = Queue()
+        done_queue = Queue()
+        workers = self._n_workers(processes=processes)
+        for chunk in self._unplayed_chunks():
+            work_queue.put(chunk)
+        self._start_workers(workers, work_queue, done_queue)
+        self._process_done_queue(workers, done_queue, progress_bar=progress_bar)
+        self._store_memo()
+        return True
+
+    def _memory_one_tables(self, chunk):
+        """tables of the players of a round robin chunk, or None"""
+        index_pair, match_params, repetitions = chunk
+        if len(match_params) != 4:
+            return None
+        players = [self.players[index].clone() for index in index_pair]
+        turns, game, _, noise = match_params
+        return engine.memory_one_tables(players, turns, game=game, noise=noise)
+
+    def _run_serial(self, progress_bar=False):
+        chunks, deterministic = [], []
+        for chunk in self._unplayed_chunks():
+            tables = self._memory_one_tables(chunk)
+            if tables is not None and engine.is_deterministic(tables, self.noise):
+                deterministic.append((chunk, tables))
+            else:
+                chunks.append(chunk)
+
+        if deterministic:
+            codes = engine.play_deterministic(
+                [tables for _, tables in deterministic], self.turns)
+            for (chunk, _), match_codes in zip(deterministic, codes):
+                index_pair, _, repetitions = chunk
+                interactions = engine.to_interactions(match_codes)
+                self._write_interactions({index_pair: [interactions] * repetitions})
+                if progress_bar:
+                    self.progress_bar.update(1)
+
+        for chunk in chunks:
+            self._write_interactions(self._play_matches(chunk))
+            if progress_bar:
+                self.progress_bar.update(1)
+        self._store_memo()
+        return True
+
+    def _play_matches(self, chunk):
+        tables = self._memory_one_tables(chunk)
+        if tables is None:
+            return super()._play_matches(chunk)
+        index_pair, (turns, _, _, noise), repetitions = chunk
+        if engine.is_deterministic(tables, noise):
+            interactions = engine.to_interactions(
+                engine.play_deterministic([tables], turns)[0])
+            return {index_pair: [interactions] * repetitions}
+        return {index_pair: [engine.play_stochastic(tables, turns, noise)
+                             for _ in range(repetitions)]}
+
+    def _write_interactions(self, results):
+        results = {
+            index_pair: self._unwritten.pop(index_pair, []) + list(interactions)
+            for index_pair, interactions in results.items()
+        }
+        super()._write_interactions(results)
+        if self.recorded is not None:
+            for index_pair, interactions in results.items():
+                row = self._recorded_rows[index_pair]
+                start = self._recorded_counts[row]
+                self._recorded_counts[row] = start + len(interactions)
+                self.recorded[row, start:start + len(interactions)] = (
+                    np.array(interactions) == 'D')
+        for index_pair, interactions in results.items():
+            if index_pair in self._memo_keys:
+                key, flipped = self._memo_keys.pop(index_pair)
+                self._memo_entries[key] = memo.encode(interactions[0], flipped)
+        if self.progress is None:
+            return
+
+        for index_pair, interactions in results.items():
+            self.progress.completed += len(interactions)
+            key = '{}-{}'.format(*index_pair)
+            self._recent_interactions.pop(key, None)
+            self._recent_interactions[key] = interactions[0]
+        while len(self._recent_interactions) > settings.PROGRESS_RECENT_PAIRS:
+            self._recent_interactions.popitem(last=False)
+
+        now = time.monotonic()
+        finished = self.progress.completed >= self.progress.total
+        if (finished or self._last_write is None or
+                now - self._last_write >= settings.PROGRESS_WRITE_INTERVAL):
+            self.progress.interactions = dict(self._recent_interactions)
+            self.progress.save()
+            self._last_write = now
@@ -0,0 +1,171 @@
+import json
+import uuid
+
+from rest_framework import renderers
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class RawJSON(str):
+    """JSON text that JSONRenderer writes into the response as it is"""
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """
+    JSON renderer that writes RawJSON values held in dictionaries
+    straight into the output, so that documents read from the database
+    as JSON text are never parsed and encoded again. Every RawJSON value
+    is replaced by a unique placeholder string, the rest of the data is
+    encoded as usual and the placeholders are then swapped for the text.
+    None is written as null unless the response has no content.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if data is None and response is not None and response.status_code != 204:
+            return b'null'
+        raw = {}
+        data = self.hold(data, raw)
+        content = super().render(data, accepted_media_type, renderer_context)
+        for placeholder, text in raw.items():
+            content = content.replace(
+                json.dumps(placeholder).encode(), text.encode(), 1)
+        return content
+
+    @classmethod
+    def hold(cls, data, raw):
+        """
+        Return data with every RawJSON value in a dictionary, at any
+        depth, replaced by a placeholder recorded in raw. Lists are not
+        searched since results are always stored under a key.
+        """
+        if not isinstance(data, dict):
+            return data
+        held = None
+        for key, value in data.items():
+            if isinstance(value, RawJSON):
+                placeholder = uuid.uuid4().hex
+                raw[placeholder] = value
+            elif isinstance(value, dict):
+                placeholder = cls.hold(value, raw)
+                if placeholder is value:
+                    continue
+            else:
+                continue
+            if held is None:
+                held = dict(data)
+            held[key] = placeholder
+        return data if held is None else held
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Render data as a single Server-Sent Event whose data is the JSON
+    encoded object. An event_id and a retry delay in milliseconds can be
+    given in the renderer context.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        lines = []
+        if renderer_context.get('retry') is not None:
+            lines.append('retry: {}'.format(renderer_context['retry']))
+        if renderer_context.get('event_id') is not None:
+            lines.append('id: {}'.format(renderer_context['event_id']))
+        lines.append('data: {}'.format(json.dumps(data, cls=JSONEncoder)))
+        return ('\n'.join(lines) + '\n\n').encode()
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Render data as MessagePack. NumPy arrays are sent in the layout used
+    by msgpack-numpy, a map of nd, type, shape and data holding the
+    contiguous little endian buffer of the array, which numpy.frombuffer
+    reads without copying.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    # whether the libraries the renderer needs are installed
+    available = msgpack is not None
+    # whether matrix shaped results are given to the renderer as arrays
+    typed_results = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return msgpack.packb(data, default=self.encode, use_bin_type=True)
+
+    @staticmethod
+    def encode(obj):
+        if isinstance(obj, np.ndarray):
+            array = np.ascontiguousarray(obj, dtype=obj.dtype.newbyteorder('<'))
+            return {'nd': True, 'type': array.dtype.str, 'shape': list(array.shape),
+                    'data': array.tobytes()}
+        if isinstance(obj, np.generic):
+            return obj.item()
+        return JSONEncoder().default(obj)
+
+
+class ArrowRenderer(BaseRenderer):
+    """
+    Render data as an Apache Arrow IPC stream of a single record batch
+    with one row. The results of a contest, or the data itself when it
+    has no results, become one column per key and any other fields go
+    into the schema metadata as JSON. NumPy arrays are stored flattened
+    in a list column whose field metadata holds their shape, so that
+    clients can reshape the values buffer without copying it; other
+    values are stored as JSON text.
+    """
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+    charset = None
+    render_style = 'binary'
+    available = pyarrow is not None
+    typed_results = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        metadata = {}
+        if isinstance(data, dict) and isinstance(data.get('results'), dict):
+            columns = data['results']
+            fields = {key: value for key, value in data.items() if key != 'results'}
+            metadata['contest'] = json.dumps(fields, cls=JSONEncoder)
+        elif isinstance(data, dict):
+            columns = data
+        else:
+            columns = {'value': data}
+
+        fields, arrays = [], []
+        for key, value in columns.items():
+            if isinstance(value, np.ndarray):
+                flat = pyarrow.array(np.ascontiguousarray(value).ravel())
+                offsets = pyarrow.array([0, len(flat)], type=pyarrow.int32())
+                arrays.append(pyarrow.ListArray.from_arrays(offsets, flat))
+                fields.append(pyarrow.field(key, arrays[-1].type, metadata={
+                    'shape': json.dumps(list(value.shape))}))
+            else:
+                arrays.append(pyarrow.array(
+                    [json.dumps(value, cls=JSONEncoder)], type=pyarrow.string()))
+                fields.append(pyarrow.field(key, pyarrow.string(), metadata={
+                    'encoding': 'json'}))
+
+        schema = pyarrow.schema(fields, metadata=metadata)
+        batch = pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+        sink = pyarrow.BufferOutputStream()
+        writer = pyarrow.RecordBatchStreamWriter(sink, schema)
+        writer.write_batch(batch)
+        writer.close()
+        return sink.getvalue().to_pybytes()
@@ -1,3 +1,8 @@
+import json
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
 from rest_framework import serializers
 from rest_framework.reverse import reverse
 
@@ -31,7 +36,8 @@ class StrategySerializer(serializers.Serializer):
         return strategy.__doc__
 
     def get_classifier(self, strategy):
-        classifier = strategy.classifier
+        # copy so the class attribute used for filtering is left untouched
+        classifier = dict(strategy.classifier)
         # float('inf') is not valid json
         if classifier['memory_depth'] == float('inf'):
             classifier['memory_depth'] = -1
@@ -45,7 +51,122 @@ class StrategySerializer(serializers.Serializer):
         return params
 
 
-class TournamentDefinitionSerializer(serializers.ModelSerializer):
+class ContestSerializer(serializers.ModelSerializer):
+    """
+    Takes an additional `fields` argument that limits the serialized
+    fields to the given field names.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class StrategyListField(serializers.ManyRelatedField):
+    """
+    Look up every strategy of a player list with a single query rather
+    than one query per player. Duplicate players are kept. Serializers
+    validating many player lists can pass the strategies they looked
+    up in advance as the 'strategies' context.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['child_relation'] = serializers.PrimaryKeyRelatedField(
+            queryset=models.InternalStrategy.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        for pk in data:
+            if not isinstance(pk, str):
+                self.child_relation.fail('incorrect_type', data_type=type(pk).__name__)
+
+        strategies = self.context.get('strategies')
+        if strategies is None:
+            strategies = self.child_relation.get_queryset().in_bulk(data)
+        for pk in data:
+            if pk not in strategies:
+                self.child_relation.fail('does_not_exist', pk_value=pk)
+        return [strategies[pk] for pk in data]
+
+
+def create_player_lists(model, definitions, player_lists):
+    """
+    write the player_list rows of new definitions with a single insert
+
+    Parameters
+    ----------
+        model: ContestDefinition
+            definition model class
+        definitions: list of ContestDefinition
+            saved definitions
+        player_lists: list of lists of InternalStrategy
+            the player list of each definition
+    """
+    field = model._meta.get_field('player_list')
+    through = field.remote_field.through
+    source = field.m2m_field_name() + '_id'
+    target = field.m2m_reverse_field_name() + '_id'
+    through.objects.bulk_create(
+        through(**{source: definition.pk, target: pk})
+        for definition, player_list in zip(definitions, player_lists)
+        for pk in sorted({strategy.pk for strategy in player_list}))
+
+
+def player_ids(player_list):
+    """the ordered strategy ids of a player list, encoded for storage"""
+    return json.dumps([strategy.pk for strategy in player_list])
+
+
+class ContestDefinitionListSerializer(serializers.ListSerializer):
+    """
+    Create many contest definitions with one insert for the definitions,
+    where the database can return their ids, and one for their player
+    lists.
+    """
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        player_lists = [attrs.pop('player_list') for attrs in validated_data]
+        definitions = [
+            model(player_ids=player_ids(player_list), **attrs)
+            for attrs, player_list in zip(validated_data, player_lists)
+        ]
+        if connection.features.can_return_ids_from_bulk_insert:
+            model.objects.bulk_create(definitions)
+        else:
+            for definition in definitions:
+                definition.save()
+        create_player_lists(model, definitions, player_lists)
+        return definitions
+
+
+class ContestDefinitionSerializer(serializers.ModelSerializer):
+    """
+    Base serializer for contest definitions that writes the player
+    list of a new definition with a single insert.
+    """
+    player_list = StrategyListField()
+    seed = serializers.IntegerField(
+        min_value=0, max_value=models.MAX_SEED, required=False, allow_null=True)
+
+    def create(self, validated_data):
+        player_list = validated_data.pop('player_list')
+        validated_data.setdefault('player_ids', player_ids(player_list))
+        definition = self.Meta.model.objects.create(**validated_data)
+        create_player_lists(self.Meta.model, [definition], [player_list])
+        return definition
+
+
+class TournamentDefinitionSerializer(ContestDefinitionSerializer):
+    processes = serializers.IntegerField(
+        min_value=1, max_value=settings.MAX_CONTEST_PROCESSES, required=False)
 
     @staticmethod
     def validate_player_list(player_list):
@@ -55,19 +176,31 @@ class TournamentDefinitionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = models.TournamentDefinition
-        fields = ('created', 'last_updated', 'turns',
-                  'repetitions', 'noise', 'with_morality', 'player_list')
+        list_serializer_class = ContestDefinitionListSerializer
+        fields = ('created', 'last_updated', 'turns', 'repetitions',
+                  'noise', 'with_morality', 'processes', 'seed', 'player_list')
 
 
-class TournamentSerializer(serializers.ModelSerializer):
+class TournamentSerializer(ContestSerializer):
     definition = TournamentDefinitionSerializer()
+    results = serializers.JSONField(source='get_results', read_only=True)
+    extends = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
         model = models.Tournament
-        fields = ('id', 'created', 'last_updated', 'status', 'definition', 'results')
+        fields = ('id', 'created', 'last_updated', 'status', 'definition',
+                  'extends', 'metadata', 'results')
 
 
-class MatchDefinitionSerializer(serializers.ModelSerializer):
+class TournamentProgressSerializer(serializers.ModelSerializer):
+    eta = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = models.TournamentProgress
+        fields = ('completed', 'total', 'eta', 'started', 'last_updated', 'interactions')
+
+
+class MatchDefinitionSerializer(ContestDefinitionSerializer):
 
     @staticmethod
     def validate_player_list(player_list):
@@ -77,18 +210,20 @@ class MatchDefinitionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = models.MatchDefinition
-        fields = ('turns', 'noise', 'player_list')
+        list_serializer_class = ContestDefinitionListSerializer
+        fields = ('turns', 'noise', 'seed', 'player_list')
 
 
-class MatchSerializer(serializers.ModelSerializer):
+class MatchSerializer(ContestSerializer):
     definition = MatchDefinitionSerializer()
 
     class Meta:
         model = models.Match
-        fields = ('id', 'created', 'last_updated', 'status', 'definition', 'results')
+        fields = ('id', 'created', 'last_updated', 'status', 'definition',
+                  'metadata', 'results')
 
 
-class MoranDefinitionSerializer(serializers.ModelSerializer):
+class MoranDefinitionSerializer(ContestDefinitionSerializer):
     mode = serializers.CharField(min_length=2, max_length=2)
 
     @staticmethod
@@ -99,16 +234,113 @@ class MoranDefinitionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = models.MoranDefinition
+        list_serializer_class = ContestDefinitionListSerializer
         fields = ('created', 'last_updated', 'turns', 'noise',
-                  'mode', 'player_list')
+                  'mode', 'seed', 'player_list')
 
 
-class MoranSerializer(serializers.ModelSerializer):
+class MoranSerializer(ContestSerializer):
     definition = MoranDefinitionSerializer()
 
     class Meta:
         model = models.Match
-        fields = ('id', 'created', 'last_updated', 'status', 'definition', 'results')
+        fields = ('id', 'created', 'last_updated', 'status', 'definition',
+                  'metadata', 'results')
+
+
+class MoranFixationDefinitionSerializer(ContestDefinitionSerializer):
+    mode = serializers.CharField(min_length=2, max_length=2)
+    replicates = serializers.IntegerField(
+        min_value=1, max_value=settings.FIXATION_MAX_REPLICATES)
+    precision = serializers.FloatField(min_value=0, required=False, allow_null=True)
+    processes = serializers.IntegerField(
+        min_value=1, max_value=settings.MAX_CONTEST_PROCESSES, required=False)
+
+    @staticmethod
+    def validate_player_list(player_list):
+        if len(player_list) < 2:
+            raise serializers.ValidationError('Ensure this field has at least 2 elements.')
+        return player_list
+
+    class Meta:
+        model = models.MoranFixationDefinition
+        list_serializer_class = ContestDefinitionListSerializer
+        fields = ('created', 'last_updated', 'turns', 'noise', 'mode', 'replicates',
+                  'precision', 'processes', 'seed', 'player_list')
+
+
+class MoranFixationSerializer(ContestSerializer):
+    definition = MoranFixationDefinitionSerializer()
+
+    class Meta:
+        model = models.MoranFixation
+        fields = ('id', 'created', 'last_updated', 'status', 'definition',
+                  'metadata', 'results')
+
+
+class MoranPopulationsSerializer(serializers.ModelSerializer):
+    populations = serializers.ListField(read_only=True)
+
+    class Meta:
+        model = models.MoranPopulations
+        fields = ('start', 'populations')
+
+
+class BatchSerializer(serializers.ModelSerializer):
+    """
+    Serialize a batch with the ids of its contests and the aggregate
+    status of the contests. Takes the contest model in the 'model'
+    context.
+    """
+    status = serializers.SerializerMethodField()
+    counts = serializers.SerializerMethodField()
+    contests = serializers.SerializerMethodField()
+
+    class Meta:
+        model = models.Batch
+        fields = ('id', 'created', 'last_updated', 'contest_type',
+                  'status', 'counts', 'contests')
+
+    def contest_queryset(self, batch):
+        return self.context['model'].objects.filter(batch=batch)
+
+    def get_counts(self, batch):
+        model = self.context['model']
+        counts = dict(self.contest_queryset(batch)
+                      .values_list('status')
+                      .annotate(count=Count('id'))
+                      .order_by())
+        return {name: counts.get(status, 0) for status, name in model.STATUS_CHOICES}
+
+    def get_status(self, batch):
+        """
+        PENDING until a contest starts, RUNNING until they have all
+        finished, then FAILED if any of them failed and SUCCESS if not
+        """
+        model = self.context['model']
+        counts = self.get_counts(batch)
+        total = sum(counts.values())
+        if counts['PENDING'] == total:
+            return model.PENDING
+        if counts['PENDING'] or counts['RUNNING']:
+            return model.RUNNING
+        if counts['FAILED']:
+            return model.FAILED
+        return model.SUCCESS
+
+    def get_contests(self, batch):
+        return list(self.contest_queryset(batch).order_by('id').values_list('id', flat=True))
+
+
+class LeaderboardSerializer(serializers.Serializer):
+    """
+    Serialize the totals of a strategy, summed over the tournament
+    settings that matched the leaderboard's filters.
+    """
+    strategy = serializers.CharField(source='strategy_id')
+    tournaments = serializers.IntegerField(source='total_tournaments')
+    mean_score = serializers.FloatField()
+    win_rate = serializers.FloatField()
 
 
 class ContestResultSerializer:
@@ -154,6 +386,22 @@ class MoranResultsSerializer(ContestResultSerializer):
         return mutation_targets
 
 
+class MoranFixationResultsSerializer(ContestResultSerializer):
+
+    exclude = [
+        'strategies',
+        'turns',
+        'noise',
+        'mode',
+        'batch_size',
+        'seeds',
+    ]
+
+    def __init__(self, result):
+        super().__init__(result)
+        self.data['fixations'] = dict(result.fixations)
+
+
 class MatchResultsSerializer(ContestResultSerializer):
 
     handle_locally = []
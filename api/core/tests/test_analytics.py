@@ -0,0 +1,28 @@
+from unittest import TestCase
+import numpy as np
+
+from api.core.analytics import player_indices, ranking, strategy_totals, submatrix
+
+
+class TestAnalytics(TestCase):
+
+    def test_player_indices(self):
+        indices, missing = player_indices(['a', 'b', 'a', 'c'], ['c', 'a', 'd'])
+        self.assertEqual([3, 0], indices)
+        self.assertEqual(['d'], missing)
+
+    def test_submatrix(self):
+        matrix = np.arange(9).reshape(3, 3)
+        self.assertEqual([[5, 3], [2, 0]], submatrix(matrix, [1, 0], [2, 0]).tolist())
+
+    def test_ranking(self):
+        scores = np.array([[1., 3.], [4., 4.], [2., 2.]])
+        self.assertEqual(([1, 2, 3], [1, 0, 2], [4., 2., 2.]), ranking([1, 0, 2], scores))
+        self.assertEqual(([1], [1], [4.]), ranking([1, 0, 2], scores, top=1))
+        self.assertEqual(([3], [2], [2.]), ranking([1, 0, 2], scores, players=[2]))
+        self.assertEqual(([], [], []), ranking([1, 0, 2], scores, top=1, players=[2]))
+
+    def test_strategy_totals(self):
+        totals = strategy_totals(
+            ['a', 'b', 'a'], [[1., 3.], [4., 4.], [2., 2.]], [[1, 0], [2, 2], [0, 1]])
+        self.assertEqual({'a': (2, 4., 2, 8), 'b': (1, 4., 4, 4)}, totals)
@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from api.core import benchmarks
+
+
+class TestPercentile(TestCase):
+
+    def test_interpolates_between_ranks(self):
+        samples = [4, 1, 3, 2]
+        self.assertEqual(1, benchmarks.percentile(samples, 0))
+        self.assertEqual(2.5, benchmarks.percentile(samples, 50))
+        self.assertEqual(4, benchmarks.percentile(samples, 100))
+
+    def test_single_sample(self):
+        self.assertEqual(7, benchmarks.percentile([7], 95))
+
+
+class TestCompare(TestCase):
+    baseline = {
+        'a': {'ops_per_sec': 100, 'p95': 0.010},
+        'b': {'ops_per_sec': 100, 'p95': 0.010},
+    }
+
+    def test_within_tolerance(self):
+        results = {'a': {'ops_per_sec': 85, 'p95': 0.011}}
+        self.assertEqual([], benchmarks.compare(results, self.baseline, 0.2))
+
+    def test_reports_slower_cases(self):
+        results = {
+            'a': {'ops_per_sec': 50, 'p95': 0.010},
+            'b': {'ops_per_sec': 100, 'p95': 0.020},
+            'c': {'ops_per_sec': 1, 'p95': 1},
+        }
+        regressions = benchmarks.compare(results, self.baseline, 0.2)
+        self.assertEqual(2, len(regressions))
+        self.assertTrue(regressions[0].startswith('a: 50.0 ops/sec'))
+        self.assertTrue(regressions[1].startswith('b: p95 20.00 ms'))
+
+
+class TestBenchmarkCase(TestCase):
+
+    def test_measures_operation(self):
+        calls = []
+        case = benchmarks.Case('count', lambda: calls.append(1), 5,
+                               setup=lambda: calls.append(0))
+        result = case.measure()
+        self.assertEqual([0] + [1] * 6, calls)
+        self.assertEqual(5, result['iterations'])
+        self.assertGreater(result['ops_per_sec'], 0)
+        self.assertLessEqual(result['p50'], result['p99'])
+        self.assertGreater(result['process_peak_rss_mb'], 0)
+        self.assertGreaterEqual(result['rss_growth_mb'], 0)
+
+    def test_resets_before_every_call(self):
+        calls = []
+        case = benchmarks.Case('count', lambda: calls.append(1), 2,
+                               reset=lambda: calls.append(0))
+        case.measure()
+        self.assertEqual([0, 1] * 3, calls)
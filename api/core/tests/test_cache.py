@@ -0,0 +1,97 @@
+from unittest import TestCase, mock
+import axelrod as axl
+
+from api.core.cache import cache_key, evict, get, is_deterministic, is_reproducible
+from api.core.models import Match, MatchDefinition, Tournament, TournamentDefinition
+
+
+class TestIsDeterministic(TestCase):
+
+    def test_deterministic_players_without_noise(self):
+        definition = MatchDefinition(turns=5, noise=0)
+        self.assertTrue(is_deterministic(definition, [axl.Cooperator, axl.TitForTat]))
+
+    def test_noise(self):
+        definition = MatchDefinition(turns=5, noise=0.1)
+        self.assertFalse(is_deterministic(definition, [axl.Cooperator, axl.TitForTat]))
+
+    def test_stochastic_player(self):
+        definition = MatchDefinition(turns=5, noise=0)
+        self.assertFalse(is_deterministic(definition, [axl.Cooperator, axl.Random]))
+
+
+class TestIsReproducible(TestCase):
+
+    def test_seeded_stochastic_contest(self):
+        definition = MatchDefinition(turns=5, noise=0.1, seed=4)
+        self.assertTrue(is_reproducible(definition, [axl.Cooperator, axl.Random]))
+
+    def test_unseeded_stochastic_contest(self):
+        definition = MatchDefinition(turns=5, noise=0.1)
+        self.assertFalse(is_reproducible(definition, [axl.Cooperator, axl.Random]))
+
+
+class TestCacheKey(TestCase):
+
+    def setUp(self):
+        self.definition = TournamentDefinition(
+            id=1, turns=5, repetitions=2, noise=0, with_morality=False,
+            player_ids='["cooperator", "defector"]')
+
+    def test_ignores_identity_fields(self):
+        other = TournamentDefinition(
+            id=2, turns=5, repetitions=2, noise=0, with_morality=False,
+            player_ids='["cooperator", "defector"]')
+        self.assertEqual(cache_key(Tournament, self.definition),
+                         cache_key(Tournament, other))
+
+    def test_depends_on_fields(self):
+        other = TournamentDefinition(
+            id=1, turns=6, repetitions=2, noise=0, with_morality=False,
+            player_ids='["cooperator", "defector"]')
+        self.assertNotEqual(cache_key(Tournament, self.definition),
+                            cache_key(Tournament, other))
+
+    def test_depends_on_seed(self):
+        seeded = TournamentDefinition(
+            id=1, turns=5, repetitions=2, noise=0, with_morality=False,
+            player_ids='["cooperator", "defector"]', seed=1)
+        other = TournamentDefinition(
+            id=1, turns=5, repetitions=2, noise=0, with_morality=False,
+            player_ids='["cooperator", "defector"]', seed=2)
+        keys = {cache_key(Tournament, d) for d in (self.definition, seeded, other)}
+        self.assertEqual(3, len(keys))
+
+    def test_depends_on_player_order(self):
+        other = TournamentDefinition(
+            id=1, turns=5, repetitions=2, noise=0, with_morality=False,
+            player_ids='["defector", "cooperator"]')
+        self.assertNotEqual(cache_key(Tournament, self.definition),
+                            cache_key(Tournament, other))
+
+    def test_depends_on_contest_type(self):
+        definition = MatchDefinition(turns=5, noise=0, player_ids='["cooperator", "defector"]')
+        self.assertNotEqual(cache_key(Tournament, self.definition),
+                            cache_key(Match, definition))
+
+    def test_miss(self):
+        self.assertIsNone(get(cache_key(Tournament, self.definition)))
+
+
+class TestEvict(TestCase):
+
+    @mock.patch('api.core.cache.CachedResult')
+    def test_under_budget(self, model):
+        model.objects.aggregate.return_value = {'total': 100}
+        evict(100)
+        model.objects.order_by.assert_not_called()
+        model.objects.filter.assert_not_called()
+
+    @mock.patch('api.core.cache.CachedResult')
+    def test_evicts_least_recently_used(self, model):
+        model.objects.aggregate.return_value = {'total': 100}
+        model.objects.order_by.return_value.values_list.return_value.iterator.return_value = [
+            ('a', 20), ('b', 30), ('c', 40)]
+        evict(60)
+        model.objects.order_by.assert_called_with('last_used')
+        model.objects.filter.assert_called_with(key__in=['a', 'b'])
@@ -0,0 +1,64 @@
+from unittest import TestCase
+from rest_framework.test import APIRequestFactory
+import axelrod as axl
+
+from api.core.catalogue import StrategyCatalogue
+
+
+class TestStrategyCatalogue(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.catalogue = StrategyCatalogue(axl.all_strategies)
+        cls.request = APIRequestFactory().get('/strategies/')
+
+    def assertMatchesAxelrod(self, filterset):
+        expected = [s.name.lower().replace(' ', '')
+                    for s in axl.filtered_strategies(filterset)]
+        self.assertEqual(expected, self.catalogue.filter(filterset))
+
+    def test_no_filters(self):
+        self.assertEqual(len(axl.all_strategies), len(self.catalogue.filter({})))
+
+    def test_keeps_input_order(self):
+        catalogue = StrategyCatalogue([axl.TitForTat, axl.Cooperator, axl.Defector])
+        self.assertEqual(['titfortat', 'cooperator', 'defector'], catalogue.filter({}))
+
+    def test_boolean_filter(self):
+        self.assertMatchesAxelrod({'stochastic': False})
+        self.assertMatchesAxelrod({'long_run_time': True})
+
+    def test_memory_depth_filters(self):
+        self.assertMatchesAxelrod({'memory_depth': 1})
+        self.assertMatchesAxelrod({'min_memory_depth': 3})
+        self.assertMatchesAxelrod({'max_memory_depth': 2})
+
+    def test_makes_use_of(self):
+        self.assertMatchesAxelrod({'makes_use_of': ['game']})
+        self.assertMatchesAxelrod({'makes_use_of': ['game', 'length']})
+
+    def test_combined_filters(self):
+        self.assertMatchesAxelrod({'stochastic': True, 'min_memory_depth': 1,
+                                   'makes_use_of': ['length']})
+
+    def test_renders_list(self):
+        ids = self.catalogue.filter({'memory_depth': 0})
+        content = self.catalogue.render_list(ids, self.request)
+        self.assertTrue(content.startswith(b'[{'))
+        self.assertEqual(len(ids), content.count(b'"url":'))
+
+    def test_encodes_once_per_host(self):
+        first = self.catalogue.encoded(self.request)
+        self.assertIs(first, self.catalogue.encoded(self.request))
+
+    def test_keeps_recent_hosts(self):
+        catalogue = StrategyCatalogue(axl.basic_strategies, max_hosts=2)
+        factory = APIRequestFactory()
+        requests = [factory.get('/strategies/', HTTP_HOST='host{}.example'.format(i))
+                    for i in range(3)]
+        first = catalogue.encoded(requests[0])
+        catalogue.encoded(requests[1])
+        self.assertIs(first, catalogue.encoded(requests[0]))
+        catalogue.encoded(requests[2])
+        self.assertEqual(['http://host0.example/', 'http://host2.example/'],
+                         list(catalogue._encoded))
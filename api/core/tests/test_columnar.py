@@ -0,0 +1,191 @@
+from io import StringIO
+import json
+from unittest import TestCase, mock, skipUnless
+import axelrod as axl
+import numpy as np
+from django.core.management import call_command
+from django.db import connection
+
+from api.core.columnar import (
+    decode_arrays, encode_arrays, join_results, join_results_json, split_results)
+from api.core.management.commands.buildleaderboard import tournament_player_ids
+from api.core.models import (
+    Contest, InternalStrategy, ResultArrays, StrategyAggregate, Tournament, TournamentDefinition)
+from api.core.serializers import TournamentResultsSerializer
+
+
+class TestColumnarResults(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        tournament = axl.Tournament(
+            [axl.Cooperator(), axl.Defector(), axl.TitForTat()], turns=5, repetitions=2)
+        cls.results = TournamentResultsSerializer(tournament.play(progress_bar=False)).data
+
+    def test_splits_matrices_from_summary(self):
+        summary, arrays = split_results(self.results)
+        self.assertEqual((3, 3), arrays['payoff_matrix'].shape)
+        self.assertEqual((3, 2), arrays['scores'].shape)
+        self.assertIn('ranked_names', summary)
+        self.assertIn('ranking', summary)
+        self.assertNotIn('payoff_matrix', summary)
+
+    def test_round_trip(self):
+        summary, arrays = split_results(self.results)
+        rebuilt = join_results(summary, decode_arrays(encode_arrays(arrays)))
+        self.assertEqual(self.results, rebuilt)
+
+    def test_tournament_rebuilds_results(self):
+        summary, arrays = split_results(self.results)
+        tournament = Tournament(results=summary)
+        tournament.result_arrays = ResultArrays(data=encode_arrays(arrays))
+        self.assertEqual(self.results, tournament.get_results())
+
+    def test_tournament_without_arrays(self):
+        tournament = Tournament(id=1, results={'ranked_names': []})
+        self.assertEqual({'ranked_names': []}, tournament.get_results())
+
+    def test_round_trip_json(self):
+        summary, arrays = split_results(self.results)
+        rebuilt = join_results_json(json.dumps(summary), decode_arrays(encode_arrays(arrays)))
+        self.assertEqual(json.loads(json.dumps(self.results)), json.loads(rebuilt))
+        self.assertEqual('{"a": [[1]]}', join_results_json('{}', {'a': np.array([[1]])}))
+        self.assertEqual('{"b": 2}', join_results_json('{"b": 2}', {}))
+
+    def test_tournament_rebuilds_results_json(self):
+        summary, arrays = split_results(self.results)
+        tournament = Tournament()
+        tournament.results_json = json.dumps(summary)
+        tournament.result_arrays = ResultArrays(data=encode_arrays(arrays))
+        self.assertEqual(json.loads(json.dumps(self.results)),
+                         json.loads(tournament.get_results_json()))
+
+    def test_tournament_adds_results_to_leaderboard(self):
+        for s in ('cooperator', 'defector', 'titfortat'):
+            InternalStrategy.objects.get_or_create(id=s)
+        definition = TournamentDefinition.objects.create(
+            turns=5, repetitions=2, noise=0, with_morality=False,
+            player_ids=json.dumps(['cooperator', 'defector', 'titfortat']))
+        tournament = Tournament.objects.create(status=1, definition=definition)
+        try:
+            tournament.add_to_leaderboard(self.results)
+            # already added
+            tournament.add_to_leaderboard(self.results)
+            # repeats of a tournament that already counts
+            Tournament(definition=definition, metadata={'cached': True}).add_to_leaderboard(
+                self.results)
+            Tournament(definition=definition, extends=tournament).add_to_leaderboard(
+                self.results)
+            self.assertTrue(Tournament.objects.get(id=tournament.id).in_leaderboard)
+            aggregates = StrategyAggregate.objects.filter(turns=5, repetitions=2, noise=0)
+            self.assertEqual(['cooperator', 'defector', 'titfortat'],
+                             sorted(a.strategy_id for a in aggregates))
+            defector = aggregates.get(strategy_id='defector')
+            self.assertEqual(1, defector.tournaments)
+            self.assertEqual(4, defector.matches)
+            self.assertEqual(sum(self.results['wins'][1]), defector.wins)
+        finally:
+            StrategyAggregate.objects.all().delete()
+            tournament.delete()
+            definition.delete()
+
+
+class TestBuildLeaderboard(TestCase):
+
+    def setUp(self):
+        self.arrays = {'normalised_scores': np.zeros((3, 2)), 'wins': np.zeros((3, 2))}
+
+    def test_player_ids_from_definition(self):
+        tournament = Tournament(definition=TournamentDefinition(
+            player_ids=json.dumps(['cooperator', 'defector', 'titfortat'])))
+        self.assertEqual(['cooperator', 'defector', 'titfortat'],
+                         tournament_player_ids(tournament, self.arrays))
+
+    def test_player_ids_from_results(self):
+        tournament = Tournament(definition=TournamentDefinition(), results={
+            'players': ['Cooperator', 'Cycler: CCD', 'Tit For Tat']})
+        self.assertEqual(['cooperator', 'cycler', 'titfortat'],
+                         tournament_player_ids(tournament, self.arrays))
+
+    def test_unknown_players(self):
+        tournament = Tournament(definition=TournamentDefinition(), results={
+            'players': ['Cooperator', 'Defector']})
+        self.assertIsNone(tournament_player_ids(tournament, self.arrays))
+        self.assertIsNone(tournament_player_ids(
+            Tournament(definition=TournamentDefinition()), self.arrays))
+
+    def test_skips_tournaments_without_players(self):
+        definition = TournamentDefinition.objects.create(
+            turns=5, repetitions=2, noise=0, with_morality=False)
+        tournament = Tournament.objects.create(status=2, definition=definition)
+        ResultArrays.objects.create(tournament=tournament, data=encode_arrays(self.arrays))
+        stdout, stderr = StringIO(), StringIO()
+        try:
+            call_command('buildleaderboard', stdout=stdout, stderr=stderr)
+            self.assertIn('Added 0 tournaments', stdout.getvalue())
+            self.assertIn('Skipped 1 tournaments whose players are unknown: {}'.format(
+                tournament.id), stderr.getvalue())
+            self.assertFalse(Tournament.objects.get(id=tournament.id).in_leaderboard)
+            self.assertFalse(StrategyAggregate.objects.exists())
+        finally:
+            tournament.delete()
+            definition.delete()
+
+
+class TestTournamentResultsSubset(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        definition = TournamentDefinition.objects.create(
+            id=1, turns=5, repetitions=2, noise=0, with_morality=False)
+        tournament = Tournament.objects.create(id=1, status=2, definition=definition)
+        ResultArrays.objects.create(tournament=tournament, data=encode_arrays({
+            'payoff_matrix': np.array([[3.0, 0.0], [5.0, 1.0]]),
+        }))
+
+    @classmethod
+    def tearDownClass(cls):
+        Tournament.objects.all().delete()
+        TournamentDefinition.objects.all().delete()
+
+    def test_reads_missing_keys_from_arrays(self):
+        read = {'payoff_matrix': None, 'ranking': [1, 0]}, ['payoff_matrix']
+        with mock.patch.object(Contest, 'read_results', return_value=read):
+            subset = Tournament.results_subset(1, ['payoff_matrix', 'ranking'])
+        self.assertEqual({'payoff_matrix': [[3.0, 0.0], [5.0, 1.0]], 'ranking': [1, 0]}, subset)
+
+    def test_keeps_stored_null(self):
+        read = {'payoff_matrix': None}, []
+        with mock.patch.object(Contest, 'read_results', return_value=read):
+            subset = Tournament.results_subset(1, ['payoff_matrix'])
+        self.assertEqual({'payoff_matrix': None}, subset)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'JSONB key extraction needs PostgreSQL')
+class TestTournamentResultsSubsetQuery(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        definition = TournamentDefinition.objects.create(
+            id=1, turns=5, repetitions=2, noise=0, with_morality=False)
+        tournament = Tournament.objects.create(
+            id=1, status=2, definition=definition, results={'wins': None})
+        ResultArrays.objects.create(tournament=tournament, data=encode_arrays({
+            'payoff_matrix': np.array([[3.0, 0.0], [5.0, 1.0]]),
+            'wins': np.array([[0, 0], [2, 2]]),
+        }))
+
+    @classmethod
+    def tearDownClass(cls):
+        Tournament.objects.all().delete()
+        TournamentDefinition.objects.all().delete()
+
+    def test_reads_requested_arrays(self):
+        subset = Tournament.results_subset(1, ['payoff_matrix'])
+        self.assertEqual({'payoff_matrix': [[3.0, 0.0], [5.0, 1.0]]}, subset)
+
+    def test_unknown_key(self):
+        self.assertEqual({'unknown': None}, Tournament.results_subset(1, ['unknown']))
+
+    def test_keeps_stored_null(self):
+        self.assertEqual({'wins': None}, Tournament.results_subset(1, ['wins']))
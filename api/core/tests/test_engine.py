@@ -0,0 +1,92 @@
+from unittest import TestCase
+import axelrod as axl
+
+from api.core import engine
+from api.core.progress import ProgressTournament
+
+
+class TestMemoryOneTable(TestCase):
+
+    def test_fixed_tables(self):
+        self.assertEqual(('C', (1, 0, 1, 0)), engine.memory_one_table(axl.TitForTat()))
+        self.assertEqual(('D', (0, 0, 0, 0)), engine.memory_one_table(axl.Defector()))
+
+    def test_four_vector(self):
+        player = axl.WinStayLoseShift()
+        self.assertEqual(('C', (1, 0, 0, 1)), engine.memory_one_table(player))
+
+    def test_four_vector_from_match_attributes(self):
+        tables = engine.memory_one_tables([axl.GTFT(), axl.Cooperator()], turns=5)
+        self.assertEqual('C', tables[0][0])
+        self.assertAlmostEqual(1 / 3, tables[0][1][1])
+
+    def test_not_memory_one(self):
+        self.assertIsNone(engine.memory_one_table(axl.Grudger()))
+        self.assertIsNone(engine.play([axl.Grudger(), axl.TitForTat()], turns=5))
+
+
+class TestPlay(TestCase):
+
+    deterministic = [axl.Cooperator, axl.Defector, axl.TitForTat, axl.SuspiciousTitForTat,
+                     axl.Alternator, axl.WinStayLoseShift, axl.WinShiftLoseStay]
+    stochastic = [axl.GTFT, axl.StochasticWSLS, axl.ZDGTFT2, axl.Joss]
+
+    def object_engine(self, players, turns, repetitions=1, noise=0):
+        match = axl.Match(players, turns=turns, noise=noise)
+        results = []
+        for _ in range(repetitions):
+            match.play()
+            results.append(match.result)
+        return results
+
+    def test_deterministic_matches_object_engine(self):
+        for player1 in self.deterministic:
+            for player2 in self.deterministic:
+                players = [player1(), player2()]
+                self.assertEqual(self.object_engine(players, 20, repetitions=2),
+                                 engine.play(players, 20, repetitions=2))
+
+    def test_plays_pairs_at_once(self):
+        pairs = [[engine.memory_one_table(p()) for p in pair] for pair in
+                 [(axl.TitForTat, axl.Alternator), (axl.Defector, axl.WinStayLoseShift)]]
+        codes = engine.play_deterministic(pairs, 4)
+        self.assertEqual((2, 4, 2), codes.shape)
+        self.assertEqual([('C', 'C'), ('C', 'D'), ('D', 'C'), ('C', 'D')],
+                         engine.to_interactions(codes[0]))
+        self.assertEqual([('D', 'C'), ('D', 'D'), ('D', 'C'), ('D', 'D')],
+                         engine.to_interactions(codes[1]))
+
+    def test_stochastic_matches_object_engine_under_seed(self):
+        for noise in (0, 0.1):
+            for player1 in self.stochastic + self.deterministic[:3]:
+                for player2 in self.stochastic:
+                    axl.seed(3)
+                    expected = self.object_engine([player1(), player2()], 30, 3, noise)
+                    axl.seed(3)
+                    actual = engine.play([player1(), player2()], 30, 3, noise=noise)
+                    self.assertEqual(expected, actual)
+
+    def test_zero_turns(self):
+        self.assertEqual([[]], engine.play([axl.Cooperator(), axl.Defector()], 0))
+
+
+class TestTournamentEngine(TestCase):
+
+    def assert_same_results(self, players, **kwargs):
+        axl.seed(1)
+        expected = axl.Tournament(players, **kwargs).play(progress_bar=False)
+        axl.seed(1)
+        actual = ProgressTournament(players, **kwargs).play(progress_bar=False)
+        self.assertEqual(expected.ranked_names, actual.ranked_names)
+        self.assertEqual(expected.payoff_matrix, actual.payoff_matrix)
+        self.assertEqual(expected.cooperation, actual.cooperation)
+
+    def test_deterministic_tournament(self):
+        players = [axl.Cooperator(), axl.Defector(), axl.TitForTat(),
+                   axl.WinStayLoseShift(), axl.Grudger()]
+        self.assert_same_results(players, turns=10, repetitions=2)
+
+    def test_stochastic_tournament(self):
+        players = [axl.Cooperator(), axl.GTFT(), axl.TitForTat(),
+                   axl.Random(), axl.Grudger(), axl.StochasticWSLS()]
+        self.assert_same_results(players, turns=10, repetitions=3, noise=0.05)
@@ -0,0 +1,53 @@
+from unittest import TestCase
+import axelrod as axl
+
+from api.core.fixation import FixationEstimate, play_replicate, wilson_interval
+
+
+class TestWilsonInterval(TestCase):
+
+    def test_contains_proportion(self):
+        low, high = wilson_interval(30, 100)
+        self.assertLess(low, 0.3)
+        self.assertGreater(high, 0.3)
+        self.assertAlmostEqual(0.2189, low, places=4)
+        self.assertAlmostEqual(0.3958, high, places=4)
+
+    def test_bounds(self):
+        self.assertAlmostEqual(0.0, wilson_interval(0, 10)[0])
+        self.assertAlmostEqual(1.0, wilson_interval(10, 10)[1])
+        self.assertEqual((0.0, 1.0), wilson_interval(0, 0))
+
+
+class TestFixationEstimate(TestCase):
+
+    strategies = [axl.Cooperator, axl.Defector, axl.Defector]
+
+    def test_replicate_returns_winner(self):
+        winner = play_replicate((self.strategies, 5, 0, 'bd', 1))
+        self.assertIn(winner, ('Cooperator', 'Defector'))
+
+    def test_plays_every_replicate(self):
+        axl.seed(0)
+        estimate = FixationEstimate(self.strategies, 5, 0, 'bd', max_replicates=25,
+                                    batch_size=10).play()
+        self.assertEqual(25, estimate.replicates)
+        self.assertEqual(25, sum(estimate.fixations.values()))
+        self.assertEqual({'Cooperator', 'Defector'}, set(estimate.confidence_intervals))
+        self.assertAlmostEqual(1, sum(estimate.fixation_probabilities.values()))
+        self.assertFalse(estimate.converged)
+
+    def test_stops_at_precision(self):
+        estimate = FixationEstimate(self.strategies, 5, 0, 'bd', max_replicates=10000,
+                                    precision=0.1, batch_size=20).play()
+        self.assertTrue(estimate.converged)
+        self.assertLess(estimate.replicates, 10000)
+        self.assertEqual(0, estimate.replicates % 20)
+
+    def test_seeded_estimate_does_not_depend_on_processes(self):
+        estimates = []
+        for processes in (1, 2):
+            axl.seed(5)
+            estimates.append(FixationEstimate(self.strategies, 5, 0, 'bd', max_replicates=20,
+                                              batch_size=10).play(processes))
+        self.assertEqual(estimates[0].fixations, estimates[1].fixations)
@@ -0,0 +1,69 @@
+from collections import Counter
+from unittest import TestCase
+from django.test import override_settings
+import axelrod as axl
+
+from api.core.history import Downsampler, PopulationHistory, decode_counts
+from api.core.models import MoranDefinition, MoranPopulations, MoranProcess
+
+
+class TestDownsampler(TestCase):
+
+    def test_keeps_everything_below_size(self):
+        sampler = Downsampler(5)
+        for i in range(5):
+            sampler.append(i)
+        self.assertEqual([0, 1, 2, 3, 4], sampler.samples)
+        self.assertEqual(1, sampler.interval)
+
+    def test_keeps_evenly_spaced_items(self):
+        sampler = Downsampler(4)
+        for i in range(20):
+            sampler.append(i)
+        self.assertEqual([0, 8, 16], sampler.samples)
+        self.assertEqual(8, sampler.interval)
+
+
+class TestPopulationHistory(TestCase):
+
+    def test_saves_chunks(self):
+        chunks = []
+        history = PopulationHistory(
+            ['A', 'B'], lambda strategies, start, counts: chunks.append((start, counts.tolist())), 2)
+        for population in [Counter(A=2), Counter(A=1, B=1), Counter(B=2)]:
+            history.append(population)
+        self.assertEqual([(0, [[2, 0], [1, 1]])], chunks)
+        history.flush()
+        self.assertEqual((2, [[0, 2]]), chunks[-1])
+        self.assertEqual(3, history.generations)
+
+    def test_decodes_counts(self):
+        data = b'\x01\x00\x00\x00\x02\x00\x00\x00'
+        self.assertEqual([[1, 2]], decode_counts(data, ['A', 'B']).tolist())
+
+
+class TestMoranRun(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        definition = MoranDefinition.objects.create(id=1, turns=5, noise=0, mode='bd')
+        cls.moran = MoranProcess.objects.create(id=1, status=1, definition=definition)
+
+    @classmethod
+    def tearDownClass(cls):
+        MoranPopulations.objects.all().delete()
+        MoranProcess.objects.all().delete()
+        MoranDefinition.objects.all().delete()
+
+    @override_settings(MORAN_HISTORY_CHUNK_SIZE=3, MORAN_INLINE_GENERATIONS=2)
+    def test_streams_every_generation(self):
+        axl.seed(0)
+        mp = self.moran.run([axl.Cooperator(), axl.Defector(), axl.Defector()] * 2)
+        chunks = MoranPopulations.objects.filter(moran=self.moran).order_by('start')
+        populations = [p for chunk in chunks for p in chunk.populations()]
+        self.assertEqual(mp.generations, len(populations))
+        self.assertEqual({'Cooperator': 2, 'Defector': 4}, populations[0])
+        self.assertEqual({mp.winning_strategy_name: 6}, populations[-1])
+        self.assertLessEqual(len(mp.populations), 2)
+        self.assertEqual(populations[::mp.history_interval][:len(mp.populations)],
+                         [dict(p) for p in mp.populations])
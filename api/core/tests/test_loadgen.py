@@ -0,0 +1,136 @@
+import os
+import tempfile
+import time
+from unittest import TestCase
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from api.config.urls import router
+from api.core import loadgen
+from api.core.models import Match, MatchDefinition, Tournament, TournamentDefinition
+
+
+class TestEndpoint(TestCase):
+
+    def test_names_route_and_action(self):
+        self.assertEqual('strategies-list', loadgen.endpoint('GET', '/strategies/'))
+        self.assertEqual('strategies-filter',
+                         loadgen.endpoint('GET', '/strategies/?stochastic=true'))
+        self.assertEqual('tournaments-create', loadgen.endpoint('POST', '/tournaments/'))
+        self.assertEqual('tournaments-retrieve', loadgen.endpoint('GET', '/tournaments/3/'))
+        self.assertEqual('tournaments-progress',
+                         loadgen.endpoint('GET', '/tournaments/3/progress/'))
+        self.assertEqual('moran-fixation-create', loadgen.endpoint('POST', '/moran/fixation/'))
+
+    def test_unknown_path(self):
+        self.assertEqual('unknown', loadgen.endpoint('GET', '/nowhere/'))
+
+
+class FakeTransport:
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.sent = []
+
+    def send(self, request):
+        time.sleep(self.delay)
+        self.sent.append(request)
+        return 200, b'{}'
+
+
+class TestLoadGenerator(TestCase):
+    requests = [loadgen.Request('GET', '/strategies/', None, None)] * 10
+
+    def test_closed_loop(self):
+        transport = FakeTransport()
+        report = loadgen.LoadGenerator(transport, self.requests, concurrency=3).run()
+        self.assertEqual(10, len(transport.sent))
+        self.assertEqual(10, report.summary()['strategies-list']['count'])
+        self.assertEqual(0, report.summary()['strategies-list']['errors'])
+
+    def test_total(self):
+        transport = FakeTransport()
+        loadgen.LoadGenerator(transport, self.requests, total=4).run()
+        self.assertEqual(4, len(transport.sent))
+
+    def test_open_loop_counts_queueing(self):
+        transport = FakeTransport(delay=0.02)
+        report = loadgen.LoadGenerator(transport, self.requests, rate=1000, mode='open').run()
+        # requests are due every millisecond but each takes 20
+        self.assertGreater(report.summary()['strategies-list']['max'], 0.1)
+
+    def test_closed_loop_ignores_queueing(self):
+        transport = FakeTransport(delay=0.02)
+        report = loadgen.LoadGenerator(transport, self.requests, rate=1000).run()
+        self.assertLess(report.summary()['strategies-list']['max'], 0.1)
+
+    def test_failed_requests(self):
+        class FailingTransport:
+            def send(self, request):
+                raise OSError
+
+        report = loadgen.LoadGenerator(FailingTransport(), self.requests[:2]).run()
+        self.assertEqual(2, report.summary()['strategies-list']['errors'])
+
+    def test_histograms(self):
+        report = loadgen.LoadGenerator(FakeTransport(), self.requests).run()
+        self.assertIn('loadgen_request_seconds_count{endpoint="strategies-list"} 10.0',
+                      report.registry.render())
+
+
+class TestRouteMix(TestCase):
+
+    def tearDown(self):
+        Tournament.objects.all().delete()
+        TournamentDefinition.objects.all().delete()
+
+    def test_routes(self):
+        mix = loadgen.RouteMix(router.registry, {'moran-fixation-create': 0})
+        names = {name for name, _, _ in mix.templates}
+        self.assertTrue({
+            'strategies-list', 'strategies-filter', 'strategies-retrieve',
+            'matches-create', 'matches-retrieve', 'tournaments-create', 'moran-create',
+        } <= names)
+        self.assertNotIn('moran-fixation-create', names)
+        self.assertFalse(any(name.startswith('batches') for name in names))
+
+    def test_creates_and_retrieves_contests(self):
+        weights = {'list': 0, 'filter': 0, 'create': 0, 'retrieve': 0,
+                   'tournaments-create': 1, 'tournaments-retrieve': 1}
+        mix = loadgen.RouteMix(router.registry, weights, seed=1)
+        report = loadgen.LoadGenerator(loadgen.WSGITransport(), mix, total=20,
+                                       observe=mix.observe).run()
+        summary = report.summary()
+        self.assertEqual(0, sum(row['errors'] for row in summary.values()))
+        self.assertIn('tournaments-create', summary)
+        self.assertTrue(mix.created['tournaments'])
+        self.assertIn('tournaments-retrieve', summary)
+
+
+class TestTrafficRecorder(TestCase):
+
+    def tearDown(self):
+        Match.objects.all().delete()
+        MatchDefinition.objects.all().delete()
+
+    def test_records_and_replays(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'traffic.jsonl')
+            with override_settings(TRAFFIC_RECORD_FILE=path):
+                client = APIClient()
+                client.get('/strategies/?stochastic=false')
+                client.post('/matches/', {'player_list': ['titfortat', 'grudger'],
+                                          'turns': 5, 'noise': 0}, format='json')
+                client.post('/api-auth/login/', {'username': 'admin', 'password': 'secret'})
+                client.post('/matches/', 'player_list=titfortat&turns=5',
+                            content_type='application/x-www-form-urlencoded')
+                client.get('/metrics/')
+            requests = loadgen.read_requests(path)
+
+        self.assertEqual(['GET', 'POST'], [r.method for r in requests])
+        self.assertEqual('/strategies/?stochastic=false', requests[0].path)
+        self.assertIsNone(requests[0].body)
+        report = loadgen.LoadGenerator(loadgen.WSGITransport(), requests, mode='open').run()
+        summary = report.summary()
+        self.assertEqual(1, summary['strategies-filter']['count'])
+        self.assertEqual(0, summary['matches-create']['errors'])
@@ -0,0 +1,100 @@
+from unittest import TestCase, mock
+import axelrod as axl
+
+from api.core import memo
+from api.core.models import Match, MatchDefinition, PairInteractions
+from api.core.progress import ProgressTournament
+
+
+class TestMemo(object):
+
+    def __init__(self):
+        self.entries = {}
+
+    def get_many(self, keys):
+        return {key: self.entries[key] for key in keys if key in self.entries}
+
+    def put_many(self, entries):
+        self.entries.update(entries)
+
+
+class TestPairKey(TestCase):
+
+    def setUp(self):
+        self.game = axl.Game()
+
+    def test_order_of_players(self):
+        key, flipped = memo.pair_key([axl.TitForTat(), axl.Alternator()], 5, self.game)
+        other, other_flipped = memo.pair_key([axl.Alternator(), axl.TitForTat()], 5, self.game)
+        self.assertEqual(key, other)
+        self.assertNotEqual(flipped, other_flipped)
+
+    def test_depends_on_turns_and_game(self):
+        players = [axl.TitForTat(), axl.Alternator()]
+        keys = {memo.pair_key(players, 5, self.game)[0],
+                memo.pair_key(players, 6, self.game)[0],
+                memo.pair_key(players, 5, axl.Game(r=4, s=0, t=5, p=1))[0]}
+        self.assertEqual(3, len(keys))
+
+    def test_not_deterministic(self):
+        self.assertIsNone(memo.pair_key([axl.TitForTat(), axl.Random()], 5, self.game))
+        self.assertIsNone(memo.pair_key([axl.TitForTat(), axl.Defector()], 5, self.game, 0.1))
+
+    def test_encoding(self):
+        interactions = [('C', 'D'), ('D', 'D')]
+        self.assertEqual('CDDD', memo.encode(interactions))
+        self.assertEqual(interactions, memo.decode('CDDD'))
+        self.assertEqual(interactions, memo.decode(memo.encode(interactions, True), True))
+
+
+class TestMemoTournament(TestCase):
+
+    players = [axl.Cooperator(), axl.TitForTat(), axl.Grudger(), axl.Random()]
+
+    def test_reuses_played_pairs(self):
+        table = TestMemo()
+        axl.seed(2)
+        first = ProgressTournament(self.players, memo=table, turns=10,
+                                   repetitions=2).play(progress_bar=False)
+        # pairs without Random are deterministic
+        self.assertEqual(6, len(table.entries))
+
+        axl.seed(2)
+        tournament = ProgressTournament(self.players, memo=table, turns=10, repetitions=2)
+        with mock.patch.object(ProgressTournament, '_play_matches',
+                               wraps=tournament._play_matches) as play_matches:
+            second = tournament.play(progress_bar=False)
+        self.assertEqual(4, play_matches.call_count)
+        self.assertEqual(first.payoff_matrix, second.payoff_matrix)
+        self.assertEqual(first.ranked_names, second.ranked_names)
+
+    def test_same_results_as_axelrod(self):
+        table = TestMemo()
+        ProgressTournament(self.players[:3], memo=table, turns=10,
+                           repetitions=2).play(progress_bar=False)
+        expected = axl.Tournament(self.players[:3], turns=10, repetitions=2).play(progress_bar=False)
+        actual = ProgressTournament(self.players[:3], memo=table, turns=10,
+                                    repetitions=2).play(progress_bar=False)
+        self.assertEqual(expected.payoff_matrix, actual.payoff_matrix)
+
+
+class TestPairInteractions(TestCase):
+
+    def tearDown(self):
+        PairInteractions.objects.all().delete()
+
+    def test_put_and_get(self):
+        PairInteractions.put_many({'a': 'CCDD', 'b': 'DDDD'})
+        PairInteractions.put_many({'a': 'CCDD', 'c': 'CDCD'})
+        self.assertEqual({'a': 'CCDD', 'c': 'CDCD'}, PairInteractions.get_many(['a', 'c', 'd']))
+        self.assertEqual(3, PairInteractions.objects.count())
+
+    def test_match_reuses_interactions(self):
+        definition = MatchDefinition(turns=3, noise=0)
+        result = Match(definition=definition).run([axl.Grudger(), axl.Alternator()]).result
+        self.assertEqual(1, PairInteractions.objects.count())
+        with mock.patch('axelrod.Match.play') as play:
+            reversed_result = Match(definition=definition).run(
+                [axl.Alternator(), axl.Grudger()]).result
+        play.assert_not_called()
+        self.assertEqual([(s2, s1) for s1, s2 in result], reversed_result)
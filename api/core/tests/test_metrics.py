@@ -0,0 +1,115 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+from rest_framework.test import APIClient
+
+from api.config import gunicorn_conf
+from api.core.metrics import Registry, clear_dumps, read_state
+
+
+class TestRegistry(TestCase):
+
+    def setUp(self):
+        self.registry = Registry()
+        self.counter = self.registry.counter('requests_total', 'Requests', ('view',))
+        self.histogram = self.registry.histogram('run_seconds', 'Run time', buckets=(1, 5))
+
+    def test_renders_counter(self):
+        self.counter.inc(view='a')
+        self.counter.inc(2, view='a')
+        self.counter.inc(view='b"c')
+        text = self.registry.render()
+        self.assertIn('# TYPE requests_total counter\n', text)
+        self.assertIn('requests_total{view="a"} 3.0\n', text)
+        self.assertIn('requests_total{view="b\\"c"} 1.0\n', text)
+
+    def test_renders_histogram(self):
+        for value in (0.5, 2, 10):
+            self.histogram.observe(value)
+        text = self.registry.render()
+        self.assertIn('run_seconds_bucket{le="1.0"} 1.0\n', text)
+        self.assertIn('run_seconds_bucket{le="5.0"} 2.0\n', text)
+        self.assertIn('run_seconds_bucket{le="+Inf"} 3.0\n', text)
+        self.assertIn('run_seconds_sum 12.5\n', text)
+        self.assertIn('run_seconds_count 3.0\n', text)
+
+    def test_times_block(self):
+        with self.histogram.time():
+            pass
+        self.assertIn('run_seconds_count 1.0\n', self.registry.render())
+
+    def test_rejects_wrong_labels(self):
+        with self.assertRaises(ValueError):
+            self.counter.inc(other='a')
+
+    def test_merges_dumps(self):
+        self.counter.inc(view='a')
+        self.histogram.observe(2)
+        with tempfile.TemporaryDirectory() as directory:
+            self.registry.dump(os.path.join(directory, 'worker-1.json'))
+            self.registry.dump(os.path.join(directory, 'worker-2.json'))
+            text = self.registry.render(directory)
+        self.assertIn('requests_total{view="a"} 3.0\n', text)
+        self.assertIn('run_seconds_count 3.0\n', text)
+
+    def test_leaves_out_own_dump(self):
+        self.counter.inc(view='a')
+        with tempfile.TemporaryDirectory() as directory:
+            self.registry.claim(os.path.join(directory, 'web-0.json'))
+            self.counter.inc(view='a')
+            self.registry.dump()
+            text = self.registry.render(directory)
+        self.assertIn('requests_total{view="a"} 2.0\n', text)
+
+    def test_claim_carries_on_from_dump(self):
+        self.counter.inc(5, view='a')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'web-0.json')
+            self.registry.dump(path)
+            replacement = Registry()
+            counter = replacement.counter('requests_total', 'Requests', ('view',))
+            replacement.claim(path)
+            counter.inc(view='a')
+            replacement.dump_if_due(0)
+            self.assertEqual(6, read_state(path)['requests_total'][0][1])
+
+    def test_clears_dumps(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ('worker-0.json', 'worker-1.json', 'web-0.json'):
+                self.registry.dump(os.path.join(directory, name))
+            clear_dumps(directory, 'worker')
+            self.assertEqual(['web-0.json'], os.listdir(directory))
+
+
+class TestGunicornHooks(TestCase):
+
+    def test_assigns_lowest_free_slot(self):
+        live = [mock.Mock(metrics_slot=0), mock.Mock(metrics_slot=2)]
+        server = mock.Mock(WORKERS={1: live[0], 2: live[1]})
+        worker = mock.Mock()
+        gunicorn_conf.pre_fork(server, worker)
+        self.assertEqual(1, worker.metrics_slot)
+
+    def test_claims_slot_file(self):
+        worker = mock.Mock(metrics_slot=3)
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.dict(os.environ, {'METRICS_DIR': directory}), \
+                mock.patch('api.core.metrics.registry', Registry()) as registry:
+            gunicorn_conf.post_fork(mock.Mock(), worker)
+            self.assertEqual(os.path.join(directory, 'web-3.json'), registry.dump_path)
+            self.assertTrue(os.path.exists(registry.dump_path))
+
+
+class TestMetricsView(TestCase):
+
+    def test_reports_request_latency(self):
+        client = APIClient()
+        client.get('/strategies/')
+        response = client.get('/metrics/')
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        text = response.content.decode()
+        self.assertIn('axelrod_request_seconds_count{view="StrategyViewSet",action="list"}', text)
+        self.assertIn('axelrod_requests_total{view="StrategyViewSet",action="list",'
+                      'method="GET",status="200"}', text)
+        self.assertIn('axelrod_strategy_filter_seconds_count', text)
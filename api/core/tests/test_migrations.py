@@ -0,0 +1,30 @@
+from importlib import import_module
+from unittest import TestCase
+from django.apps import apps
+
+from api.core.models import InternalStrategy, MatchDefinition
+
+backfill = import_module('api.core.migrations.0021_backfill_player_ids')
+
+
+class TestBackfillPlayerIds(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        for s in ('titfortat', 'cooperator'):
+            InternalStrategy.objects.get_or_create(id=s)
+
+    @classmethod
+    def tearDownClass(cls):
+        MatchDefinition.objects.all().delete()
+        InternalStrategy.objects.all().delete()
+
+    def test_fills_from_player_list(self):
+        definition = MatchDefinition.objects.create(turns=5, noise=0)
+        definition.player_list.add('titfortat')
+        definition.player_list.add('cooperator')
+        empty = MatchDefinition.objects.create(turns=5, noise=0)
+        backfill.backfill_player_ids(apps, None)
+        self.assertEqual(['titfortat', 'cooperator'],
+                         MatchDefinition.objects.get(id=definition.id).strategy_ids)
+        self.assertEqual([], MatchDefinition.objects.get(id=empty.id).strategy_ids)
@@ -0,0 +1,69 @@
+import random
+import time
+from unittest import TestCase
+import axelrod as axl
+
+from api.core.pool import StrategyPool
+
+
+class Expensive(axl.Player):
+    name = 'Expensive'
+
+    def __init__(self):
+        super().__init__()
+        time.sleep(0.005)
+        self.table = list(range(100))
+
+    def strategy(self, opponent):
+        return 'C'
+
+
+class ExpensiveRandom(Expensive):
+    name = 'Expensive Random'
+
+    def __init__(self):
+        super().__init__()
+        self.start = random.random()
+
+
+class ExpensiveGenerator(Expensive):
+    name = 'Expensive Generator'
+
+    def __init__(self):
+        super().__init__()
+        self.moves = (move for move in 'CD')
+
+
+class TestStrategyPool(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = StrategyPool([Expensive, ExpensiveRandom, ExpensiveGenerator,
+                                 axl.TitForTat]).warm_up()
+
+    def test_pools_expensive_copyable_strategies(self):
+        self.assertEqual(['expensive'], list(self.pool.prototypes))
+
+    def test_copies_prototypes(self):
+        player = self.pool.player('expensive')
+        self.assertIsInstance(player, Expensive)
+        self.assertIsNot(self.pool.prototypes['expensive'], player)
+        self.assertIsNot(self.pool.prototypes['expensive'].table, player.table)
+        self.assertEqual([], player.history)
+
+    def test_constructs_other_strategies(self):
+        players = self.pool.players(['titfortat', 'expensiverandom'])
+        self.assertIsInstance(players[0], axl.TitForTat)
+        self.assertIsInstance(players[1], ExpensiveRandom)
+
+    def test_times_every_strategy(self):
+        self.assertEqual(4, len(self.pool.timings))
+        self.assertGreater(self.pool.timings['expensive']['cold'], 0.005)
+        self.assertIsNone(self.pool.timings['expensivegenerator']['copy'])
+
+    def test_keeps_random_state(self):
+        random.seed(1)
+        expected = random.random()
+        random.seed(1)
+        StrategyPool([ExpensiveRandom]).warm_up()
+        self.assertEqual(expected, random.random())
@@ -0,0 +1,79 @@
+from unittest import TestCase, mock
+import axelrod as axl
+
+from api.core.columnar import decode_interactions, encode_interactions
+from api.core.progress import ProgressTournament
+
+
+class TestProgress(object):
+
+    def __init__(self, total):
+        self.completed = 0
+        self.total = total
+        self.interactions = None
+        self.saves = []
+
+    def save(self):
+        self.saves.append(self.completed)
+
+
+class TestProgressTournament(TestCase):
+
+    def setUp(self):
+        self.players = [axl.Cooperator(), axl.Defector(), axl.TitForTat()]
+
+    def test_counts_matches(self):
+        tournament = ProgressTournament(self.players, turns=5, repetitions=2)
+        self.assertEqual(12, tournament.matches_total)
+
+    def test_records_progress(self):
+        progress = TestProgress(12)
+        tournament = ProgressTournament(self.players, progress=progress,
+                                        turns=5, repetitions=2)
+        tournament.play(progress_bar=False)
+        self.assertEqual(12, progress.completed)
+        self.assertEqual(12, progress.saves[-1])
+        self.assertEqual([('C', 'D')] * 5, progress.interactions['0-1'])
+
+    def test_throttles_writes(self):
+        progress = TestProgress(12)
+        tournament = ProgressTournament(self.players, progress=progress,
+                                        turns=5, repetitions=2)
+        tournament.play(progress_bar=False)
+        # the first chunk and the last chunk are always written
+        self.assertEqual([2, 12], progress.saves)
+
+
+class TestExtendedTournament(TestCase):
+
+    def setUp(self):
+        self.players = [axl.Grudger(), axl.TitForTat(), axl.Cooperator(), axl.Defector()]
+
+    def test_records_interactions(self):
+        tournament = ProgressTournament(self.players[:2], record=True, turns=3, repetitions=2)
+        tournament.play(progress_bar=False)
+        self.assertEqual([(0, 0), (0, 1), (1, 1)], tournament.recorded_pairs)
+        self.assertEqual((3, 2, 3, 2), tournament.recorded.shape)
+        self.assertFalse(tournament.recorded.any())
+
+    def test_matches_full_run(self):
+        first = ProgressTournament(self.players[:3], record=True, turns=5, repetitions=2)
+        first.play(progress_bar=False)
+        previous = decode_interactions(encode_interactions(first.recorded_pairs, first.recorded))
+
+        extended = ProgressTournament(self.players, previous=previous, record=True,
+                                      turns=5, repetitions=3)
+        with mock.patch.object(ProgressTournament, '_play_matches',
+                               wraps=extended._play_matches) as play_matches:
+            results = extended.play(progress_bar=False)
+        # one more repetition of the old pairs with Grudger and the new pair
+        self.assertEqual([1, 1, 1, 3], sorted(
+            call[0][0][2] for call in play_matches.call_args_list))
+        self.assertEqual((10, 3, 5, 2), extended.recorded.shape)
+        # Defector defects in every turn of every repetition against Grudger
+        row = extended.recorded_pairs.index((0, 3))
+        self.assertTrue(extended.recorded[row, :, :, 1].all())
+
+        expected = axl.Tournament(self.players, turns=5, repetitions=3).play(progress_bar=False)
+        self.assertEqual(expected.payoff_matrix, results.payoff_matrix)
+        self.assertEqual(expected.ranked_names, results.ranked_names)
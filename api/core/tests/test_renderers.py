@@ -0,0 +1,187 @@
+import gzip
+import json
+from unittest import TestCase, mock, skipIf
+from django.test import override_settings
+from rest_framework.test import APIClient
+import numpy as np
+
+from api.core import middleware
+from api.core.middleware import accepted_encoding
+from api.core.models import Tournament, TournamentDefinition
+from api.core.renderers import (
+    ArrowRenderer, JSONRenderer, MessagePackRenderer, RawJSON, msgpack, pyarrow)
+
+
+class TestJSONRenderer(TestCase):
+
+    def test_writes_raw_json(self):
+        data = {'id': 1, 'results': RawJSON('{"wins": [[1, 2]], "name": "\\u00e9"}')}
+        content = JSONRenderer().render(data)
+        self.assertIn(b'{"wins": [[1, 2]], "name": "\\u00e9"}', content)
+        self.assertEqual({'id': 1, 'results': {'wins': [[1, 2]], 'name': 'é'}},
+                         json.loads(content.decode()))
+        self.assertIsInstance(data['results'], RawJSON)
+
+    def test_nested_raw_json(self):
+        data = {'page': {'a': RawJSON('[1]'), 'b': RawJSON('null')}, 'c': [1]}
+        self.assertEqual({'page': {'a': [1], 'b': None}, 'c': [1]},
+                         json.loads(JSONRenderer().render(data).decode()))
+
+    def test_without_raw_json(self):
+        data = {'a': {'b': 1}}
+        self.assertEqual(b'{"a":{"b":1}}', JSONRenderer().render(data))
+
+
+class TestRawResults(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        definition = TournamentDefinition.objects.create(
+            turns=5, repetitions=5, noise=0, with_morality=False)
+        cls.tournament = Tournament.objects.create(status=2, definition=definition)
+
+    @classmethod
+    def tearDownClass(cls):
+        Tournament.objects.all().delete()
+        TournamentDefinition.objects.all().delete()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    @mock.patch('api.core.models.Tournament.get_results')
+    @mock.patch('api.core.models.Tournament.get_results_json')
+    def test_passes_results_through(self, get_results_json, get_results):
+        get_results_json.return_value = '{"ranked_names": ["Defector"]}'
+        response = self.client.get('/tournaments/{}/'.format(self.tournament.id))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'ranked_names': ['Defector']}, json.loads(response.content)['results'])
+        get_results.assert_not_called()
+
+    def test_browsable_api_parses_results(self):
+        response = self.client.get('/tournaments/{}/'.format(self.tournament.id),
+                                   HTTP_ACCEPT='text/html')
+        self.assertEqual(200, response.status_code)
+
+
+class TestCompression(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_accepted_encoding(self):
+        self.assertEqual('gzip', accepted_encoding('gzip, deflate'))
+        self.assertIsNone(accepted_encoding('deflate'))
+        self.assertIsNone(accepted_encoding('gzip;q=0'))
+        with mock.patch.object(middleware, 'brotli', mock.Mock()):
+            self.assertEqual('br', accepted_encoding('gzip, br'))
+            self.assertEqual('gzip', accepted_encoding('gzip, br;q=0.5'))
+            self.assertEqual('br', accepted_encoding('*'))
+        with mock.patch.object(middleware, 'brotli', None):
+            self.assertEqual('gzip', accepted_encoding('gzip, br'))
+            self.assertEqual('gzip', accepted_encoding('*'))
+
+    def test_compresses_large_bodies(self):
+        plain = self.client.get('/strategies/')
+        response = self.client.get('/strategies/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual('gzip', response['Content-Encoding'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertEqual(plain.content, gzip.decompress(response.content))
+        self.assertNotIn('Content-Encoding', plain)
+
+    @skipIf(middleware.brotli is None, 'brotli is not installed')
+    def test_compresses_with_brotli(self):
+        plain = self.client.get('/strategies/')
+        response = self.client.get('/strategies/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual('br', response['Content-Encoding'])
+        self.assertEqual(plain.content, middleware.brotli.decompress(response.content))
+
+    @override_settings(COMPRESS_MIN_BYTES=10 ** 9)
+    def test_leaves_small_bodies(self):
+        response = self.client.get('/strategies/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_compressed_not_modified(self):
+        response = self.client.get('/strategies/', HTTP_ACCEPT_ENCODING='gzip')
+        response = self.client.get('/strategies/', HTTP_ACCEPT_ENCODING='gzip',
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(304, response.status_code)
+
+
+def unpack_arrays(obj):
+    if obj.get('nd'):
+        return np.frombuffer(obj['data'], dtype=obj['type']).reshape(obj['shape'])
+    return obj
+
+
+@skipIf(msgpack is None, 'msgpack is not installed')
+class TestMessagePack(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        definition = TournamentDefinition.objects.create(
+            turns=5, repetitions=5, noise=0, with_morality=False)
+        cls.tournament = Tournament.objects.create(status=2, definition=definition)
+
+    @classmethod
+    def tearDownClass(cls):
+        Tournament.objects.all().delete()
+        TournamentDefinition.objects.all().delete()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def unpack(self, content):
+        return msgpack.unpackb(content, object_hook=unpack_arrays, raw=False)
+
+    def test_renders_arrays_as_buffers(self):
+        matrix = np.arange(6, dtype=float).reshape(2, 3)
+        content = MessagePackRenderer().render({'a': matrix, 'b': np.int64(2), 'c': ['x']})
+        data = self.unpack(content)
+        np.testing.assert_array_equal(matrix, data['a'])
+        self.assertEqual('<f8', data['a'].dtype.str)
+        self.assertEqual(2, data['b'])
+        self.assertEqual(['x'], data['c'])
+
+    @mock.patch('api.core.models.Tournament.get_typed_results')
+    def test_retrieves_contest(self, get_typed_results):
+        payoffs = np.array([[3.0, 0.0], [5.0, 1.0]])
+        get_typed_results.return_value = {'payoff_matrix': payoffs, 'ranked_names': ['A', 'B']}
+        response = self.client.get('/tournaments/{}/'.format(self.tournament.id),
+                                   HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('application/msgpack', response['Content-Type'])
+        data = self.unpack(response.content)
+        self.assertEqual(self.tournament.id, data['id'])
+        np.testing.assert_array_equal(payoffs, data['results']['payoff_matrix'])
+        self.assertEqual(['A', 'B'], data['results']['ranked_names'])
+
+    @mock.patch('api.core.models.Tournament.read_results')
+    def test_retrieves_results_key(self, read_results):
+        read_results.return_value = {'wins': np.array([[1, 0], [0, 1]])}, []
+        response = self.client.get(
+            '/tournaments/{}/results/wins/?format=msgpack'.format(self.tournament.id))
+        self.assertEqual(200, response.status_code)
+        np.testing.assert_array_equal([[1, 0], [0, 1]], self.unpack(response.content))
+        read_results.assert_called_with(str(self.tournament.id), ['wins'], as_arrays=True)
+
+    def test_not_offered_for_lists(self):
+        response = self.client.get('/tournaments/?format=msgpack')
+        self.assertEqual(404, response.status_code)
+
+
+@skipIf(pyarrow is None, 'pyarrow is not installed')
+class TestArrow(TestCase):
+
+    def test_renders_results_columns(self):
+        matrix = np.arange(6, dtype=float).reshape(2, 3)
+        content = ArrowRenderer().render(
+            {'id': 1, 'results': {'payoff_matrix': matrix, 'ranked_names': ['A']}})
+        reader = pyarrow.RecordBatchStreamReader(pyarrow.BufferReader(content))
+        batch = reader.read_next_batch()
+        field = batch.schema.field_by_name('payoff_matrix')
+        shape = json.loads(field.metadata[b'shape'].decode())
+        values = batch.column(0).flatten().to_numpy().reshape(shape)
+        np.testing.assert_array_equal(matrix, values)
+        self.assertEqual(['A'], json.loads(batch.column(1)[0].as_py()))
+        self.assertEqual({'id': 1}, json.loads(batch.schema.metadata[b'contest'].decode()))
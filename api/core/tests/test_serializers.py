@@ -107,6 +107,21 @@ class TestTournamentDefinitionSerializer(TestCase):
         serializer = TournamentDefinitionSerializer(data=self.valid_post_data)
         self.assertTrue(serializer.is_valid())
 
+    def test_saves_player_list(self):
+        data = dict(self.valid_post_data, player_list=['test1', 'test2', 'test1'])
+        serializer = TournamentDefinitionSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(3, len(serializer.validated_data['player_list']))
+        definition = serializer.save()
+        self.assertEqual(['test1', 'test2'],
+                         sorted(s.id for s in definition.player_list.all()))
+        definition.delete()
+
+    def test_processes_are_bounded(self):
+        serializer = TournamentDefinitionSerializer(data=dict(self.valid_post_data, processes=0))
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('processes', serializer.errors)
+
     def test_is_invalid_with_missing_fields(self):
         serializer = TournamentDefinitionSerializer(data=self.missing_noise)
         self.assertFalse(serializer.is_valid())
@@ -1,12 +1,16 @@
 import json
 from unittest import TestCase, mock
 from django.contrib.auth.models import User
+from django.test import override_settings
 from rest_framework.test import APIClient
+import numpy as np
 
-from api.core.serializers import strategy_id
+from api.core.catalogue import StrategyCatalogue
+from api.core.history import encode_counts
+from api.core.views import BaseContestViewSet
 from api.core.models import (
-    InternalStrategy, MoranProcess, MoranDefinition, Tournament,
-    TournamentDefinition,
+    InternalStrategy, MoranPopulations, MoranProcess, MoranDefinition, StrategyAggregate,
+    Tournament, TournamentDefinition, TournamentProgress,
     Match, MatchDefinition)
 
 
@@ -16,6 +20,10 @@ class TestStrategy(object):
         self.name = name
         self.classifier = classifier
 
+    def __call__(self):
+        # the catalogue instantiates strategy classes to read their classifier
+        return self
+
     def init_params(self):
         return {}
 
@@ -28,25 +36,44 @@ class TestStrategyView(TestCase):
         TestStrategy('Test Four', {'stochastic': False, 'memory_depth': 2}),
         TestStrategy('Test Five', {'stochastic': False, 'memory_depth': 1}),
     ]
-    strategies_index = {strategy_id(s): s for s in strategies}
+    catalogue = StrategyCatalogue(strategies)
 
     def setUp(self):
         self.client = APIClient()
 
-    @mock.patch('api.core.views.axl.filtered_strategies')
-    def test_lists_all_strategies(self, filtered_strategies):
-        filtered_strategies.return_value = self.strategies
+    @mock.patch('api.core.views.StrategyViewSet.catalogue', catalogue)
+    def test_lists_all_strategies(self):
         response = self.client.get('/strategies/')
         self.assertEqual(200, response.status_code)
-        self.assertEqual(5, len(response.data))
+        self.assertEqual(5, len(json.loads(response.content.decode())))
+
+    @mock.patch('api.core.views.StrategyViewSet.catalogue', catalogue)
+    def test_filters_strategies(self):
+        response = self.client.get('/strategies/?stochastic=false&memory_depth=2')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(['testfour'], [s['id'] for s in json.loads(response.content.decode())])
 
-    @mock.patch('api.core.views.StrategyViewSet.strategies_index', strategies_index)
+    @mock.patch('api.core.views.StrategyViewSet.catalogue', catalogue)
     def test_retrieves_one_strategy(self):
         response = self.client.get('/strategies/testone/')
         self.assertEqual(200, response.status_code)
+        self.assertEqual('Test One', json.loads(response.content.decode())['name'])
+
+    @mock.patch('api.core.views.StrategyViewSet.catalogue', catalogue)
+    def test_not_modified(self):
+        response = self.client.get('/strategies/testone/')
+        self.assertIn('max-age', response['Cache-Control'])
+        response = self.client.get('/strategies/testone/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b'', response.content)
+
+    @mock.patch('api.core.views.StrategyViewSet.catalogue', catalogue)
+    def test_browsable_api(self):
+        response = self.client.get('/strategies/testone/', HTTP_ACCEPT='text/html')
+        self.assertEqual(200, response.status_code)
         self.assertEqual('Test One', response.data['name'])
 
-    @mock.patch('api.core.views.StrategyViewSet.strategies_index', strategies_index)
+    @mock.patch('api.core.views.StrategyViewSet.catalogue', catalogue)
     def test_strategy_does_not_exist(self):
         response = self.client.get('/strategies/notfound/')
         self.assertEqual(404, response.status_code)
@@ -96,11 +123,17 @@ class TestTournamentPostView(TestCase):
         self.client = APIClient()
 
     @mock.patch('api.core.models.Tournament.save', mock.MagicMock)
-    def test_tournament_played(self):
+    def test_tournament_queued(self):
         response = self.client.post('/tournaments/',
                                     json.dumps(self.valid_post_data),
                                     content_type='application/json')
-        self.assertEqual(201, response.status_code)
+        self.assertEqual(202, response.status_code)
+
+    def test_creates_missing_players(self):
+        BaseContestViewSet.create_players(['adaptive', 'alternator', 'alternator'])
+        self.assertEqual(['adaptive', 'allcoralld', 'alternator'],
+                         sorted(InternalStrategy.objects.values_list('id', flat=True)))
+        InternalStrategy.objects.filter(id='alternator').delete()
 
     def test_strategy_not_found(self):
         response = self.client.post('/tournaments/',
@@ -118,6 +151,16 @@ class TestTournamentPostView(TestCase):
         self.assertEqual(400, response.status_code)
         self.assertEqual({'noise': ['This field is required.']}, response.data)
 
+    def test_seed_out_of_range(self):
+        for seed, error in ((-1, 'greater than or equal to 0'),
+                            (2 ** 32, 'less than or equal to 4294967295')):
+            response = self.client.post('/tournaments/',
+                                        json.dumps(dict(self.no_strategy_found, seed=seed,
+                                                        player_list=['adaptive', 'allcoralld'])),
+                                        content_type='application/json')
+            self.assertEqual(400, response.status_code)
+            self.assertEqual({'seed': ['Ensure this value is {}.'.format(error)]}, response.data)
+
     def test_invalid_strategy_count(self):
         response = self.client.post('/tournaments/',
                                     json.dumps(self.one_strategy),
@@ -148,7 +191,31 @@ class TestTournamentGetView(TestCase):
     def test_retrieves_all(self):
         response = self.client.get('/tournaments/')
         self.assertEqual(200, response.status_code)
-        self.assertEqual(4, len(response.data))
+        self.assertEqual(4, len(response.data['results']))
+
+    def test_list_leaves_out_results(self):
+        response = self.client.get('/tournaments/')
+        self.assertEqual([4, 3, 2, 1], [t['id'] for t in response.data['results']])
+        self.assertNotIn('results', response.data['results'][0])
+        self.assertIn('definition', response.data['results'][0])
+
+    def test_list_selects_fields(self):
+        response = self.client.get('/tournaments/?fields=id,status,results')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'id': 4, 'status': 3, 'results': None}, response.data['results'][0])
+
+    def test_list_unknown_field(self):
+        response = self.client.get('/tournaments/?fields=id,name')
+        self.assertEqual(400, response.status_code)
+        self.assertEqual({'fields': ['Unknown field: name']}, response.data)
+
+    @mock.patch('api.core.views.ContestCursorPagination.page_size', 3)
+    def test_list_pages(self):
+        response = self.client.get('/tournaments/')
+        self.assertEqual([4, 3, 2], [t['id'] for t in response.data['results']])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([1], [t['id'] for t in response.data['results']])
+        self.assertIsNone(response.data['next'])
 
     def test_retrieves_one(self):
         response = self.client.get('/tournaments/2/')
@@ -156,11 +223,254 @@ class TestTournamentGetView(TestCase):
         self.assertEqual(2, response.data['id'])
         self.assertEqual(2, response.data['status'])
 
+    @mock.patch('api.core.views.TournamentViewSet.contest_serializer')
+    def test_finished_not_modified(self, contest_serializer):
+        contest_serializer.return_value.data = {}
+        response = self.client.get('/tournaments/2/')
+        response = self.client.get('/tournaments/2/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(1, contest_serializer.call_count)
+
+    def test_finished_changed(self):
+        response = self.client.get('/tournaments/2/', HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(200, response.status_code)
+        self.assertIn('ETag', response)
+
+    def test_pending_has_no_etag(self):
+        response = self.client.get('/tournaments/3/')
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn('ETag', response)
+
+    @mock.patch('api.core.models.Tournament.read_results')
+    def test_retrieves_results_key(self, read_results):
+        read_results.return_value = {'ranked_names': ['Defector', 'Cooperator']}, []
+        response = self.client.get('/tournaments/2/results/ranked_names/')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(['Defector', 'Cooperator'], response.data)
+        read_results.assert_called_with('2', ['ranked_names'])
+
+    @mock.patch('api.core.models.Tournament.read_results')
+    def test_results_key_stored_as_null(self, read_results):
+        read_results.return_value = {'wins': None}, []
+        response = self.client.get('/tournaments/2/results/wins/')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b'null', response.content)
+
+    @mock.patch('api.core.models.Tournament.read_results')
+    def test_results_key_not_found(self, read_results):
+        read_results.return_value = {'unknown': None}, ['unknown']
+        response = self.client.get('/tournaments/2/results/unknown/')
+        self.assertEqual(404, response.status_code)
+
+    @mock.patch('api.core.models.Tournament.results_subset')
+    def test_retrieves_results_fields(self, results_subset):
+        results_subset.return_value = {'wins': [[1]], 'ranking': [0]}
+        response = self.client.get('/tournaments/2/?results_fields=wins,ranking')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, response.data['id'])
+        self.assertEqual({'wins': [[1]], 'ranking': [0]}, response.data['results'])
+        results_subset.assert_called_with('2', ['wins', 'ranking'])
+
+    def test_invalid_results_fields(self):
+        response = self.client.get("/tournaments/2/?results_fields=wins,a'b")
+        self.assertEqual(400, response.status_code)
+        self.assertEqual({'results_fields': ["Invalid results key: a'b"]}, response.data)
+
+    def test_progress_before_start(self):
+        response = self.client.get('/tournaments/3/progress/')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(0, response.data['status'])
+        self.assertEqual(0, response.data['completed'])
+        self.assertIsNone(response.data['eta'])
+
+    def test_progress(self):
+        TournamentProgress.objects.create(tournament_id=3, completed=5, total=20)
+        response = self.client.get('/tournaments/3/progress/')
+        TournamentProgress.objects.all().delete()
+        self.assertEqual(5, response.data['completed'])
+        self.assertEqual(20, response.data['total'])
+        self.assertIsNotNone(response.data['eta'])
+
+    def test_progress_not_found(self):
+        response = self.client.get('/tournaments/10/progress/')
+        self.assertEqual(404, response.status_code)
+
+    def test_progress_stream_ends_when_finished(self):
+        response = self.client.get('/tournaments/2/progress/stream/',
+                                   HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('text/event-stream', response['Content-Type'])
+        events = [e for e in b''.join(response.streaming_content).decode().split('\n\n') if e]
+        self.assertEqual(1, len(events))
+        retry, event_id, data = events[0].split('\n')
+        self.assertEqual('retry: 1000', retry)
+        self.assertEqual('id: 2-0', event_id)
+        self.assertEqual(2, json.loads(data[6:])['status'])
+
+    def test_progress_stream_stops_reconnects_when_finished(self):
+        response = self.client.get('/tournaments/2/progress/stream/',
+                                   HTTP_ACCEPT='text/event-stream', HTTP_LAST_EVENT_ID='2-0')
+        self.assertEqual(204, response.status_code)
+
+    @override_settings(PROGRESS_STREAM_DURATION=0.05, PROGRESS_STREAM_INTERVAL=0.01)
+    def test_progress_stream_closes_after_duration(self):
+        response = self.client.get('/tournaments/3/progress/stream/',
+                                   HTTP_ACCEPT='text/event-stream', HTTP_LAST_EVENT_ID='0-0')
+        self.assertEqual(200, response.status_code)
+        # the progress has not changed since the client's last event
+        self.assertEqual(b'', b''.join(response.streaming_content))
+
     def test_id_does_not_exist(self):
         response = self.client.get('/tournaments/10/')
         self.assertEqual(404, response.status_code)
 
 
+class TestTournamentAnalyticsView(TestCase):
+
+    payoffs = np.array([[3., 0., 3.], [5., 1., 1.4], [3., 0.9, 3.]])
+    subset = {
+        'ranking': [1, 2, 0],
+        'normalised_scores': np.array([[2., 2.], [3., 2.], [2., 2.6]]),
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        definition = TournamentDefinition.objects.create(
+            id=7, turns=5, repetitions=2, noise=0, with_morality=False,
+            player_ids=json.dumps(['cooperator', 'defector', 'titfortat']))
+        Tournament.objects.create(id=7, status=2, definition=definition)
+        Tournament.objects.create(id=8, status=0, definition=definition)
+
+    @classmethod
+    def tearDownClass(cls):
+        Tournament.objects.filter(id__in=[7, 8]).delete()
+        TournamentDefinition.objects.filter(id=7).delete()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    @mock.patch('api.core.models.Tournament.results_subset')
+    def test_payoff_between_players(self, results_subset):
+        results_subset.return_value = {'payoff_matrix': self.payoffs}
+        response = self.client.get('/tournaments/7/payoff/?row=defector&col=titfortat')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({
+            'key': 'payoff_matrix', 'rows': ['defector'], 'cols': ['titfortat'], 'values': [[1.4]]
+        }, response.data)
+        self.assertIn('ETag', response)
+        results_subset.assert_called_with('7', ['payoff_matrix'], as_arrays=True)
+
+    @mock.patch('api.core.models.Tournament.results_subset')
+    def test_payoff_row(self, results_subset):
+        results_subset.return_value = {'cooperation': self.payoffs}
+        response = self.client.get('/tournaments/7/payoff/?row=titfortat&key=cooperation')
+        self.assertEqual(['cooperator', 'defector', 'titfortat'], response.data['cols'])
+        self.assertEqual([[3., .9, 3.]], response.data['values'])
+
+    def test_payoff_unknown_player(self):
+        response = self.client.get('/tournaments/7/payoff/?row=grudger&col=defector')
+        self.assertEqual(400, response.status_code)
+        self.assertEqual({'row': ['Strategy not in tournament: grudger']}, response.data)
+
+    def test_payoff_unknown_key(self):
+        response = self.client.get('/tournaments/7/payoff/?key=ranking')
+        self.assertEqual(400, response.status_code)
+        self.assertIn('key', response.data)
+
+    @mock.patch('api.core.models.Tournament.results_subset')
+    def test_payoff_not_finished(self, results_subset):
+        results_subset.return_value = {'payoff_matrix': None}
+        response = self.client.get('/tournaments/8/payoff/')
+        self.assertEqual(404, response.status_code)
+
+    def test_payoff_tournament_not_found(self):
+        response = self.client.get('/tournaments/10/payoff/')
+        self.assertEqual(404, response.status_code)
+
+    @mock.patch('api.core.models.Tournament.results_subset')
+    def test_ranking_top(self, results_subset):
+        results_subset.return_value = self.subset
+        response = self.client.get('/tournaments/7/ranking/?top=2')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'ranking': [
+            {'rank': 1, 'player': 'defector', 'median_score': 2.5},
+            {'rank': 2, 'player': 'titfortat', 'median_score': 2.3},
+        ]}, response.data)
+
+    @mock.patch('api.core.models.Tournament.results_subset')
+    def test_ranking_of_player(self, results_subset):
+        results_subset.return_value = self.subset
+        response = self.client.get('/tournaments/7/ranking/?player=cooperator')
+        self.assertEqual([{'rank': 3, 'player': 'cooperator', 'median_score': 2.0}],
+                         response.data['ranking'])
+
+    def test_ranking_invalid_top(self):
+        for top in ('0', 'ten'):
+            response = self.client.get('/tournaments/7/ranking/?top={}'.format(top))
+            self.assertEqual(400, response.status_code)
+            self.assertEqual({'top': ['Ensure this value is a positive integer.']}, response.data)
+
+
+class TestLeaderboardView(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        for s in ('cooperator', 'defector'):
+            InternalStrategy.objects.get_or_create(id=s)
+        players = json.dumps(['cooperator', 'defector'])
+        short = TournamentDefinition(turns=5, repetitions=2, noise=0, player_ids=players)
+        long = TournamentDefinition(turns=200, repetitions=2, noise=0, player_ids=players)
+        StrategyAggregate.add_tournament(short, {
+            'normalised_scores': np.array([[0., 0.], [5., 5.]]),
+            'wins': np.array([[0, 0], [1, 1]]),
+        })
+        StrategyAggregate.add_tournament(short, {
+            'normalised_scores': np.array([[1., 1.], [4., 4.]]),
+            'wins': np.array([[0, 0], [1, 0]]),
+        })
+        StrategyAggregate.add_tournament(long, {
+            'normalised_scores': np.array([[3., 3.], [1., 2.]]),
+            'wins': np.array([[0, 0], [1, 1]]),
+        })
+
+    @classmethod
+    def tearDownClass(cls):
+        StrategyAggregate.objects.all().delete()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_increments_totals(self):
+        aggregate = StrategyAggregate.objects.get(strategy_id='defector', turns=5)
+        self.assertEqual(2, aggregate.tournaments)
+        self.assertEqual(9., aggregate.score_total)
+        self.assertEqual(3, aggregate.wins)
+        self.assertEqual(4, aggregate.matches)
+
+    def test_lists_every_tournament(self):
+        response = self.client.get('/leaderboard/')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(['defector', 'cooperator'], [e['strategy'] for e in response.data])
+        self.assertEqual({
+            'strategy': 'defector', 'tournaments': 3,
+            'mean_score': 3.5, 'win_rate': 5 / 6,
+        }, response.data[0])
+
+    def test_filters_on_settings(self):
+        response = self.client.get('/leaderboard/?turns=200&noise=0&repetitions=2')
+        self.assertEqual(['cooperator', 'defector'], [e['strategy'] for e in response.data])
+        self.assertEqual([3., 1.5], [e['mean_score'] for e in response.data])
+
+    def test_no_matching_tournaments(self):
+        response = self.client.get('/leaderboard/?repetitions=3')
+        self.assertEqual([], response.data)
+
+    def test_invalid_filter(self):
+        response = self.client.get('/leaderboard/?turns=many')
+        self.assertEqual(400, response.status_code)
+        self.assertEqual({'turns': ['A valid int is required.']}, response.data)
+
+
 class TestTournamentDeleteView(TestCase):
 
     @classmethod
@@ -217,6 +527,11 @@ class TestMatchPostView(TestCase):
             'noise': 0.1,
             'player_list': ["adapt", 'allcoralld'],
         }
+        cls.deterministic_post_data = {
+            'turns': 5,
+            'noise': 0,
+            'player_list': ["cooperator", "defector"],
+        }
         cls.missing_noise = {
             'turns': 5,
             'player_list': ["adaptive", "allcoralld"],
@@ -238,11 +553,23 @@ class TestMatchPostView(TestCase):
         self.client = APIClient()
 
     @mock.patch('api.core.models.Match.save', mock.MagicMock)
-    def test_match_played(self):
+    def test_match_queued(self):
         response = self.client.post('/matches/',
                                     json.dumps(self.valid_post_data),
                                     content_type='application/json')
+        self.assertEqual(202, response.status_code)
+        self.assertEqual(0, response.data['status'])
+
+    @mock.patch('api.core.views.cache.get')
+    @mock.patch('api.core.models.Match.save', mock.MagicMock)
+    def test_match_served_from_cache(self, cache_get):
+        cache_get.return_value = {'winner': 'Defector'}
+        response = self.client.post('/matches/',
+                                    json.dumps(self.deterministic_post_data),
+                                    content_type='application/json')
         self.assertEqual(201, response.status_code)
+        self.assertEqual(2, response.data['status'])
+        self.assertEqual({'winner': 'Defector'}, response.data['results'])
 
     def test_strategy_not_found(self):
         response = self.client.post('/matches/',
@@ -293,7 +620,7 @@ class TestMatchGetView(TestCase):
     def test_retrieves_all(self):
         response = self.client.get('/matches/')
         self.assertEqual(200, response.status_code)
-        self.assertEqual(4, len(response.data))
+        self.assertEqual(4, len(response.data['results']))
 
     def test_retrieves_one(self):
         response = self.client.get('/matches/2/')
@@ -392,11 +719,11 @@ class TestMoranProcessPostView(TestCase):
         self.client = APIClient()
 
     @mock.patch('api.core.models.MoranProcess.save', mock.MagicMock)
-    def test_moran_played(self):
+    def test_moran_queued(self):
         response = self.client.post('/moran/',
                                     json.dumps(self.valid_post_data),
                                     content_type='application/json')
-        self.assertEqual(201, response.status_code)
+        self.assertEqual(202, response.status_code)
 
     def test_strategy_not_found(self):
         response = self.client.post('/moran/',
@@ -432,19 +759,40 @@ class TestMoranProcessGetView(TestCase):
         MoranProcess.objects.create(id=2, status=2, definition=definition)
         MoranProcess.objects.create(id=3, status=0, definition=definition)
         MoranProcess.objects.create(id=4, status=3, definition=definition)
+        for start in range(0, 30, 10):
+            MoranPopulations.objects.create(
+                moran_id=1, start=start, strategies='["Cooperator", "Defector"]',
+                counts=encode_counts(np.array([[1, 1]] * 9 + [[0, 2]])))
 
     def setUp(self):
         self.client = APIClient()
 
     @classmethod
     def tearDownClass(cls):
+        MoranPopulations.objects.all().delete()
         MoranProcess.objects.all().delete()
         MoranDefinition.objects.all().delete()
 
+    @mock.patch('api.core.views.PopulationCursorPagination.page_size', 2)
+    def test_pages_through_populations(self):
+        response = self.client.get('/moran/1/populations/')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([0, 10], [chunk['start'] for chunk in response.data['results']])
+        populations = response.data['results'][0]['populations']
+        self.assertEqual({'Cooperator': 1, 'Defector': 1}, populations[0])
+        self.assertEqual({'Defector': 2}, populations[9])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([20], [chunk['start'] for chunk in response.data['results']])
+        self.assertIsNone(response.data['next'])
+
+    def test_populations_of_unknown_process(self):
+        response = self.client.get('/moran/10/populations/')
+        self.assertEqual(404, response.status_code)
+
     def test_retrieves_all(self):
         response = self.client.get('/moran/')
         self.assertEqual(200, response.status_code)
-        self.assertEqual(4, len(response.data))
+        self.assertEqual(4, len(response.data['results']))
 
     def test_retrieves_one(self):
         response = self.client.get('/moran/2/')
@@ -499,3 +847,200 @@ class TestMoranProcessDeleteView(TestCase):
         self.assertEqual(404, response.status_code)
 
 
+class TestBatchView(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.valid_post_data = {
+            'contest_type': 'matches',
+            'definitions': [
+                {'turns': turns, 'noise': 0, 'player_list': ['adaptive', 'allcoralld']}
+                for turns in (5, 10, 20)
+            ],
+        }
+        InternalStrategy.objects.create(id='adaptive')
+
+    @classmethod
+    def tearDownClass(cls):
+        Match.objects.all().delete()
+        MatchDefinition.objects.all().delete()
+        InternalStrategy.objects.all().delete()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def post(self, data):
+        return self.client.post('/batches/', json.dumps(data),
+                                content_type='application/json')
+
+    def test_batch_queued(self):
+        response = self.post(self.valid_post_data)
+        self.assertEqual(202, response.status_code)
+        self.assertEqual('matches', response.data['contest_type'])
+        self.assertEqual(Match.PENDING, response.data['status'])
+        self.assertEqual(3, response.data['counts']['PENDING'])
+        contests = Match.objects.filter(id__in=response.data['contests'])
+        self.assertEqual([5, 10, 20], sorted(c.definition.turns for c in contests))
+        self.assertEqual(['adaptive', 'allcoralld'], contests[0].definition.strategy_ids)
+
+    def test_retrieve_aggregates_status(self):
+        response = self.post(self.valid_post_data)
+        first, *rest = response.data['contests']
+        Match.objects.filter(id=first).update(status=Match.SUCCESS)
+        response = self.client.get('/batches/{}/'.format(response.data['id']))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(Match.RUNNING, response.data['status'])
+        self.assertEqual({'PENDING': 2, 'RUNNING': 0, 'SUCCESS': 1, 'FAILED': 0},
+                         response.data['counts'])
+
+        Match.objects.filter(id__in=rest).update(status=Match.FAILED)
+        response = self.client.get('/batches/{}/'.format(response.data['id']))
+        self.assertEqual(Match.FAILED, response.data['status'])
+
+    def test_unknown_contest_type(self):
+        response = self.post(dict(self.valid_post_data, contest_type='leagues'))
+        self.assertEqual(400, response.status_code)
+        self.assertEqual({'contest_type': ['Unknown contest type: leagues']}, response.data)
+
+    def test_empty_batch(self):
+        response = self.post(dict(self.valid_post_data, definitions=[]))
+        self.assertEqual(400, response.status_code)
+
+    def test_strategy_not_found(self):
+        definitions = [{'turns': 5, 'noise': 0, 'player_list': ['adapt', 'adaptive']}]
+        response = self.post(dict(self.valid_post_data, definitions=definitions))
+        self.assertEqual(400, response.status_code)
+        self.assertEqual({'player_list': ['Strategy not found: adapt']}, response.data)
+
+    def test_invalid_definition(self):
+        definitions = [
+            {'turns': 5, 'noise': 0, 'player_list': ['adaptive', 'allcoralld']},
+            {'turns': 5, 'player_list': ['adaptive', 'allcoralld']},
+        ]
+        response = self.post(dict(self.valid_post_data, definitions=definitions))
+        self.assertEqual(400, response.status_code)
+        self.assertEqual({'definitions': [{}, {'noise': ['This field is required.']}]},
+                         response.data)
+
+    def test_batch_not_found(self):
+        response = self.client.get('/batches/1000/')
+        self.assertEqual(404, response.status_code)
+
+
+class TestMoranFixationView(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.valid_post_data = {
+            'turns': 5,
+            'noise': 0,
+            'mode': 'bd',
+            'replicates': 1000,
+            'precision': 0.05,
+            'player_list': ['adaptive', 'allcoralld'],
+        }
+        InternalStrategy.objects.create(id='adaptive')
+        InternalStrategy.objects.create(id='allcoralld')
+
+    @classmethod
+    def tearDownClass(cls):
+        InternalStrategy.objects.all().delete()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    @mock.patch('api.core.models.MoranFixation.save', mock.MagicMock)
+    def test_fixation_queued(self):
+        response = self.client.post('/moran/fixation/',
+                                    json.dumps(self.valid_post_data),
+                                    content_type='application/json')
+        self.assertEqual(202, response.status_code)
+
+    def test_replicates_required(self):
+        data = dict(self.valid_post_data)
+        del data['replicates']
+        response = self.client.post('/moran/fixation/', json.dumps(data),
+                                    content_type='application/json')
+        self.assertEqual(400, response.status_code)
+        self.assertEqual({'replicates': ['This field is required.']}, response.data)
+
+    def test_lists_fixations(self):
+        response = self.client.get('/moran/fixation/')
+        self.assertEqual(200, response.status_code)
+        self.assertIn('results', response.data)
+
+    def test_id_does_not_exist(self):
+        response = self.client.get('/moran/fixation/10/')
+        self.assertEqual(404, response.status_code)
+
+
+class TestTournamentExtendView(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        InternalStrategy.objects.create(id='adaptive')
+        InternalStrategy.objects.create(id='allcoralld')
+        definition = TournamentDefinition.objects.create(
+            id=1, turns=5, repetitions=2, noise=0, with_morality=False,
+            player_ids='["adaptive", "allcoralld"]')
+        Tournament.objects.create(id=1, status=2, definition=definition)
+        Tournament.objects.create(id=2, status=1, definition=definition)
+        seeded = TournamentDefinition.objects.create(
+            id=2, turns=5, repetitions=2, noise=0.1, seed=1, with_morality=False,
+            player_ids='["adaptive", "allcoralld"]')
+        Tournament.objects.create(id=3, status=2, definition=seeded)
+
+    @classmethod
+    def tearDownClass(cls):
+        Tournament.objects.all().delete()
+        TournamentDefinition.objects.all().delete()
+        InternalStrategy.objects.all().delete()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def extend(self, pk, data):
+        return self.client.post('/tournaments/{}/extend/'.format(pk), json.dumps(data),
+                                content_type='application/json')
+
+    @mock.patch('api.core.views.cache.get', mock.MagicMock(return_value=None))
+    def test_extension_queued(self):
+        response = self.extend(1, {'player_list': ['alternator'], 'repetitions': 4})
+        self.assertEqual(202, response.status_code)
+        self.assertEqual(1, response.data['extends'])
+        extension = Tournament.objects.get(id=response.data['id'])
+        self.assertEqual(['adaptive', 'allcoralld', 'alternator'],
+                         extension.definition.strategy_ids)
+        self.assertEqual(4, extension.definition.repetitions)
+        self.assertEqual(5, extension.definition.turns)
+        extension.delete()
+
+    def test_fewer_repetitions(self):
+        response = self.extend(1, {'repetitions': 1})
+        self.assertEqual(400, response.status_code)
+        self.assertEqual({'repetitions': ['Ensure this value is at least 2.']}, response.data)
+
+    def test_nothing_to_extend(self):
+        response = self.extend(1, {})
+        self.assertEqual(400, response.status_code)
+
+    def test_unfinished_tournament(self):
+        response = self.extend(2, {'repetitions': 3})
+        self.assertEqual(400, response.status_code)
+        self.assertEqual({'status': ['Only finished tournaments can be extended.']}, response.data)
+
+    def test_unknown_strategy(self):
+        response = self.extend(1, {'player_list': ['adapt']})
+        self.assertEqual(400, response.status_code)
+        self.assertEqual({'player_list': ['Strategy not found: adapt']}, response.data)
+
+    def test_seeded_random_tournament(self):
+        response = self.extend(3, {'repetitions': 3})
+        self.assertEqual(400, response.status_code)
+        self.assertEqual({
+            'non_field_errors': ['Seeded tournaments with random play can not be extended.']
+        }, response.data)
+
+    def test_id_does_not_exist(self):
+        response = self.extend(10, {'repetitions': 3})
+        self.assertEqual(404, response.status_code)
@@ -0,0 +1,170 @@
+from datetime import timedelta
+import time
+from unittest import TestCase, mock
+from django.utils import timezone
+
+from api.core.models import Match, MatchDefinition, Tournament, TournamentDefinition
+from api.core.worker import (
+    CoreBudget, claim_contest, heartbeat, requeue_stale, results_serializers, run_contest,
+    run_pending)
+
+
+class TestClaimContest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        definition = TournamentDefinition.objects.create(
+            id=1, turns=5, repetitions=5, noise=0.1, with_morality=True)
+        Tournament.objects.create(id=1, status=2, definition=definition)
+        Tournament.objects.create(id=2, status=0, definition=definition)
+        Tournament.objects.create(id=3, status=0, definition=definition)
+
+    @classmethod
+    def tearDownClass(cls):
+        Tournament.objects.all().delete()
+        TournamentDefinition.objects.all().delete()
+
+    def test_claims_oldest_pending(self):
+        contest = claim_contest(Tournament)
+        self.assertEqual(2, contest.id)
+        self.assertEqual(Tournament.RUNNING, Tournament.objects.get(id=2).status)
+        self.assertEqual(Tournament.PENDING, Tournament.objects.get(id=3).status)
+        self.assertIsNotNone(Tournament.objects.get(id=2).heartbeat)
+        Tournament.objects.filter(id=2).update(status=Tournament.PENDING)
+
+    def test_requeues_stale_contests(self):
+        stale = timezone.now() - timedelta(minutes=10)
+        Tournament.objects.filter(id=2).update(status=Tournament.RUNNING, heartbeat=stale)
+        Tournament.objects.filter(id=3).update(status=Tournament.RUNNING, heartbeat=timezone.now())
+        self.assertEqual(1, requeue_stale(5 * 60))
+        self.assertEqual(Tournament.PENDING, Tournament.objects.get(id=2).status)
+        self.assertIsNone(Tournament.objects.get(id=2).heartbeat)
+        self.assertEqual(Tournament.RUNNING, Tournament.objects.get(id=3).status)
+        Tournament.objects.filter(id__in=[2, 3]).update(status=Tournament.PENDING, heartbeat=None)
+
+    def test_heartbeat(self):
+        Tournament.objects.filter(id=3).update(status=Tournament.RUNNING, heartbeat=None)
+        with heartbeat(Tournament.objects.get(id=3), 0.01):
+            time.sleep(0.1)
+        self.assertIsNotNone(Tournament.objects.get(id=3).heartbeat)
+        Tournament.objects.filter(id=3).update(status=Tournament.PENDING, heartbeat=None)
+
+    def test_empty_queue(self):
+        self.assertIsNone(claim_contest(Match))
+
+
+class TestRunContest(TestCase):
+
+    def setUp(self):
+        definition = MatchDefinition(
+            turns=5, noise=0, player_ids='["cooperator", "defector"]')
+        self.contest = Match(id=1, status=1, definition=definition)
+
+    @mock.patch('api.core.worker.cache.put')
+    @mock.patch('api.core.models.Match.add_to_leaderboard')
+    @mock.patch('api.core.models.Match.save', mock.MagicMock)
+    def test_stores_results(self, add_to_leaderboard, cache_put):
+        run_contest(self.contest)
+        self.assertEqual(Match.SUCCESS, self.contest.status)
+        self.assertEqual([(0, 5)] * 5, self.contest.results['scores'])
+        cache_put.assert_called_once_with(mock.ANY, self.contest.results)
+        add_to_leaderboard.assert_called_once_with(self.contest.results)
+        self.assertEqual(1, self.contest.metadata['processes'])
+        self.assertIn('speedup', self.contest.metadata)
+
+    @mock.patch('api.core.worker.cache.put')
+    @mock.patch('api.core.models.Match.save', mock.MagicMock)
+    def test_reserves_cores(self, cache_put):
+        core_budget = CoreBudget(4)
+        run_contest(self.contest, core_budget)
+        self.assertEqual(1, self.contest.metadata['processes'])
+        self.assertEqual(4, core_budget._free.value)
+
+    @mock.patch('api.core.worker.cache.get')
+    @mock.patch('api.core.models.Match.run')
+    @mock.patch('api.core.models.Match.save', mock.MagicMock)
+    def test_uses_cached_results(self, run, cache_get):
+        cache_get.return_value = {'winner': 'Defector'}
+        run_contest(self.contest)
+        run.assert_not_called()
+        self.assertEqual(Match.SUCCESS, self.contest.status)
+        self.assertEqual({'winner': 'Defector'}, self.contest.results)
+
+    @mock.patch('api.core.worker.cache.put')
+    @mock.patch('api.core.models.Match.save', mock.MagicMock)
+    def test_seed_reproduces_results(self, cache_put):
+        definition = MatchDefinition(
+            turns=20, noise=0.2, seed=7, player_ids='["random", "titfortat"]')
+        results = []
+        for _ in range(2):
+            contest = Match(id=1, status=1, definition=definition)
+            run_contest(contest)
+            results.append(contest.results['result'])
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(2, cache_put.call_count)
+
+    @mock.patch('api.core.worker.cache.put')
+    @mock.patch('api.core.models.Tournament.store_results', mock.MagicMock())
+    @mock.patch('api.core.models.Tournament.save', mock.MagicMock)
+    @mock.patch('api.core.models.TournamentProgress.save', mock.MagicMock)
+    def test_seeded_contest_plays_in_one_process(self, cache_put):
+        definition = TournamentDefinition(
+            turns=5, repetitions=2, noise=0.1, with_morality=False, processes=4,
+            seed=1, player_ids='["random", "titfortat"]')
+        contest = Tournament(id=1, status=1, definition=definition)
+        run_contest(contest)
+        self.assertEqual(Tournament.SUCCESS, contest.status)
+        self.assertEqual(1, contest.metadata['processes'])
+
+    @mock.patch('api.core.worker.cache.get')
+    @mock.patch('api.core.worker.cache.put')
+    @mock.patch('api.core.models.Tournament.run')
+    @mock.patch('api.core.models.Tournament.store_results', mock.MagicMock())
+    @mock.patch('api.core.models.Tournament.save', mock.MagicMock)
+    @mock.patch.dict(results_serializers, {Tournament: mock.MagicMock(__name__='serializer')})
+    def test_extension_skips_cache(self, run, cache_put, cache_get):
+        definition = TournamentDefinition(
+            turns=5, repetitions=3, noise=0, with_morality=False,
+            player_ids='["cooperator", "defector"]')
+        contest = Tournament(id=1, status=1, definition=definition, extends_id=2)
+        run_contest(contest)
+        self.assertEqual(Tournament.SUCCESS, contest.status)
+        run.assert_called_once_with(mock.ANY, processes=1)
+        cache_get.assert_not_called()
+        cache_put.assert_not_called()
+
+    @mock.patch('api.core.models.Match.save', mock.MagicMock)
+    def test_marks_failed(self):
+        self.contest.definition.player_ids = '["notfound", "defector"]'
+        run_contest(self.contest)
+        self.assertEqual(Match.FAILED, self.contest.status)
+        self.assertIsNone(self.contest.results)
+
+    @mock.patch('api.core.worker.run_contest')
+    @mock.patch('api.core.worker.claim_contest')
+    def test_runs_one_contest_per_model(self, claim_contest_mock, run_contest_mock):
+        claim_contest_mock.side_effect = [self.contest, None, None, None]
+        self.assertEqual(1, run_pending())
+        run_contest_mock.assert_called_once_with(self.contest, None)
+
+
+class TestCoreBudget(TestCase):
+
+    def test_grants_requested_cores(self):
+        core_budget = CoreBudget(4)
+        with core_budget.reserve(3) as processes:
+            self.assertEqual(3, processes)
+            self.assertEqual(1, core_budget._free.value)
+        self.assertEqual(4, core_budget._free.value)
+
+    def test_shares_free_cores(self):
+        core_budget = CoreBudget(4)
+        with core_budget.reserve(3):
+            with core_budget.reserve(3) as processes:
+                self.assertEqual(1, processes)
+                self.assertEqual(0, core_budget._free.value)
+        self.assertEqual(4, core_budget._free.value)
+
+    def test_always_grants_one_core(self):
+        with CoreBudget(4).reserve(0) as processes:
+            self.assertEqual(1, processes)
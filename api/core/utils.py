@@ -1,3 +1,12 @@
+import hashlib
+
+from django.utils.http import quote_etag
+
 
 def strategy_id(strategy):
     return strategy.name.lower().replace(' ', '')
+
+
+def etag(*parts):
+    """strong ETag for the representation identified by parts"""
+    return quote_etag(hashlib.sha1(':'.join(str(p) for p in parts).encode()).hexdigest())
@@ -1,34 +1,62 @@
 from distutils.util import strtobool
+import json
+import re
+import time
 
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
-from django.http import Http404
+from django.db import IntegrityError, transaction
+from django.db.models import FloatField, Sum
+from django.db.models.functions import Cast
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
 from rest_framework import viewsets
+from rest_framework.decorators import detail_route
 from rest_framework.response import Response
 import axelrod as axl
-from api.core import models
-from api.core.models import InternalStrategy
+from api.core import analytics, cache, metrics, models
+from api.core.catalogue import StrategyCatalogue
+from api.core.models import Batch, InternalStrategy, StrategyAggregate
+from api.core.pagination import ContestCursorPagination, PopulationCursorPagination
+from api.core.renderers import (
+    ArrowRenderer,
+    EventStreamRenderer,
+    MessagePackRenderer,
+    RawJSON,
+)
 from api.core.serializers import (
+    BatchSerializer,
+    LeaderboardSerializer,
     MatchSerializer,
     MatchDefinitionSerializer,
     MatchResultsSerializer,
     MoranSerializer,
     MoranDefinitionSerializer,
     MoranResultsSerializer,
-    StrategySerializer,
+    MoranFixationSerializer,
+    MoranFixationDefinitionSerializer,
+    MoranFixationResultsSerializer,
+    MoranPopulationsSerializer,
     TournamentSerializer,
     TournamentDefinitionSerializer,
+    TournamentProgressSerializer,
     TournamentResultsSerializer,
 )
 
-from .utils import strategy_id
+from .utils import etag, strategy_id
 
 
-def filter_strategies(request):
+@metrics.strategy_filter_seconds.time()
+def filter_strategies(request, catalogue):
     """
     Take the incoming request object, convert the strings in its
     query_params dictionary into the types required by the axelrod
-    filtering function and pass the resulting dictionary into that
-    filtering function.
+    filtering function and pass the resulting dictionary into the
+    filter of the strategy catalogue.
     """
 
     params = request.query_params
@@ -39,7 +67,7 @@ def filter_strategies(request):
             'long_run_time',
             'manipulates_state',
             'manipulates_source',
-            'inpsects_source'
+            'inspects_source'
         ],
         int: [
             'memory_depth',
@@ -56,25 +84,63 @@ def filter_strategies(request):
 
     if 'makes_use_of' in params:
         filterset['makes_use_of'] = params.getlist('makes_use_of')
-    return axl.filtered_strategies(filterset)
+    return catalogue.filter(filterset)
+
+
+def prometheus_metrics(request):
+    """
+    Metrics of this process and of the workers that dumped theirs to
+    METRICS_DIR, in the Prometheus text format.
+    """
+    return HttpResponse(metrics.registry.render(settings.METRICS_DIR),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def conditional_response(request, tag, max_age, respond):
+    """
+    Return a 304 if the client already holds the representation
+    identified by tag, otherwise build the response by calling
+    respond. Either response carries the ETag and may be cached
+    for max_age seconds.
+    """
+    response = get_conditional_response(request, etag=tag) or respond()
+    response['ETag'] = tag
+    patch_cache_control(response, public=True, max_age=max_age)
+    patch_vary_headers(response, ['Accept'])
+    return response
 
 
 class StrategyViewSet(viewsets.ViewSet):
 
-    strategies_index = {strategy_id(s): s for s in axl.strategies}
+    catalogue = StrategyCatalogue(axl.all_strategies)
+
+    @staticmethod
+    def encoded_response(request, content):
+        """
+        send pre-encoded JSON as it is and fall back to the
+        renderers for other formats such as the browsable API
+        """
+        if request.accepted_renderer.format == 'json':
+            return HttpResponse(content, content_type='application/json')
+        return Response(json.loads(content.decode()))
+
+    @staticmethod
+    def version_etag(request):
+        # strategies only change with the axelrod version
+        return etag(axl.__version__, request.accepted_renderer.format)
 
     def list(self, request):
-        serializer = StrategySerializer(
-            filter_strategies(request), many=True, context={'request': request})
-        return Response(serializer.data)
+        return conditional_response(
+            request, self.version_etag(request), settings.STRATEGY_MAX_AGE,
+            lambda: self.encoded_response(request, self.catalogue.render_list(
+                filter_strategies(request, self.catalogue), request)))
 
     def retrieve(self, request, pk=None):
-        try:
-            strategy = self.strategies_index[pk]
-        except KeyError:
+        if pk not in self.catalogue:
             raise Http404
-        serializer = StrategySerializer(strategy, context={'request': request})
-        return Response(serializer.data)
+        return conditional_response(
+            request, self.version_etag(request), settings.STRATEGY_MAX_AGE,
+            lambda: self.encoded_response(request, self.catalogue.render_detail(pk, request)))
 
 
 class BaseContestViewSet(viewsets.ViewSet):
@@ -85,94 +151,249 @@ class BaseContestViewSet(viewsets.ViewSet):
 
     strategies_index = {strategy_id(s): s for s in axl.strategies}
     _not_found_error = 'Strategy not found: {}'
+    _unknown_field_error = 'Unknown field: {}'
+    _invalid_results_key_error = 'Invalid results key: {}'
+    # results keys are interpolated into JSONB key lookups
+    results_key = re.compile(r'\w+')
+    pagination_class = ContestCursorPagination
+    # fields listed when the request does not ask for specific ones
+    default_list_fields = ('id', 'created', 'last_updated', 'status', 'definition', 'metadata')
+    # binary formats offered for contests and their results when the
+    # libraries they need are installed
+    binary_renderers = [r for r in (MessagePackRenderer, ArrowRenderer) if r.available]
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action in ('retrieve', 'results'):
+            renderers += [renderer() for renderer in self.binary_renderers]
+        return renderers
+
+    def results_subset(self, request, pk, keys):
+        """
+        read keys of the results of a contest, with matrix shaped values
+        as NumPy arrays for the renderers that send them as buffers
+        """
+        if getattr(request.accepted_renderer, 'typed_results', False):
+            return self.model.results_subset(pk, keys, as_arrays=True)
+        return self.model.results_subset(pk, keys)
+
+    def read_results(self, request, pk, keys):
+        """
+        read keys of the results of a contest as results_subset does,
+        together with the keys that are not in the results at all
+        """
+        if getattr(request.accepted_renderer, 'typed_results', False):
+            return self.model.read_results(pk, keys, as_arrays=True)
+        return self.model.read_results(pk, keys)
 
     def get_strategy_from_id(self, player_list):
         """
-        retrieve the axelrod Strategy or each player
-        in the player list and instantiate them.
+        retrieve the axelrod Strategy class of each player in the
+        player list, raising KeyError for an unknown id. Players are
+        only instantiated by the worker that plays the contest.
 
         Parameters
         ----------
             player_list: list of strings
                 a list of strategy ids
         """
-        # note that the strategy is being instantiated - bugs with
-        # misleading error messages will be generated if they are not
-        return [self.strategies_index[s]() for s in player_list]
+        return [self.strategies_index[s] for s in player_list]
 
     @staticmethod
-    def create_players(strategy):
+    def create_players(player_list):
         """
-        check to see if the internal strategy exists in
-        the database and create it if not.
+        make sure every strategy in the player list exists in the
+        internal strategy table, using one query to find the missing
+        strategies and one insert to create them.
 
         Parameters
         ----------
-            strategy: string
-                strategy id
+            player_list: list of strings
+                a list of strategy ids
         """
+        ids = set(player_list)
+        existing = InternalStrategy.objects.filter(id__in=ids).values_list('id', flat=True)
+        missing = sorted(ids.difference(existing))
+        if not missing:
+            return
         try:
-            return InternalStrategy.objects.get(id=strategy)
-        except ObjectDoesNotExist:
-            return InternalStrategy.objects.create(id=strategy)
-
-    def start_contest(self, definition, players):
+            with transaction.atomic():
+                InternalStrategy.objects.bulk_create(
+                    InternalStrategy(id=s) for s in missing)
+        except IntegrityError:
+            # another request created some of them in the meantime
+            for s in missing:
+                InternalStrategy.objects.get_or_create(id=s)
+
+    def start_contest(self, definition, **fields):
         """
-        start a contest based on definition and list of strategies
+        queue a contest based on definition. The contest is created
+        with a PENDING status and played by a worker process unless
+        it is reproducible and its results are already cached.
 
         Parameters
         ----------
             definition: ContestDefinition
                 definition class that contains all contest parameters
-            players: list of axelrod.Strategy
-                **instantiated** axelrod Strategy classes that are
-                playing the contest
+            fields: dict
+                values of any other fields of the contest
         """
-        contest = self.model.objects.create(definition=definition, status=0)
-        result = contest.run(players)
-        contest.results = self.results_serializer(result).data
-        contest.save()
-        return contest
+        with metrics.contest_start_seconds.time(contest=self.model.__name__):
+            return self._start_contest(definition, **fields)
+
+    def _start_contest(self, definition, **fields):
+        strategies = [self.strategies_index[s] for s in definition.strategy_ids]
+        # an extension is played from the interactions of the tournament
+        # it extends, which the cache key does not cover
+        if (self.model.cacheable and 'extends' not in fields and
+                cache.is_reproducible(definition, strategies)):
+            results = cache.get(cache.cache_key(self.model, definition))
+            if results is not None:
+                contest = self.model.objects.create(
+                    definition=definition, status=self.model.SUCCESS,
+                    metadata={'cached': True}, **fields)
+                contest.store_results(results)
+                contest.save()
+                return contest
+        return self.model.objects.create(
+            definition=definition, status=self.model.PENDING, **fields)
 
     def create(self, request):
         """
         Take in a contest definition from JSON post data which
         expects all of the required parameters of the contest,
         a list of and a list of player strings. Once all of
-        these are validated, start the contest.
+        these are validated, queue the contest and return it
+        straight away with a PENDING status.
+        """
+        return self.create_contest(request.data)
+
+    def create_contest(self, data, **fields):
+        """
+        validate a contest definition, store it and queue its contest.
+        Any fields are passed on to start_contest.
         """
         try:
-            players = self.get_strategy_from_id(request.data['player_list'])
+            self.get_strategy_from_id(data['player_list'])
         except KeyError as e:
             # handle case where strategy id is not found in list of strategies
             return Response({
                 'player_list': [self._not_found_error.format(e.args[0])]
             }, 400)
 
-        # update Internal Strategy store
-        [self.create_players(s) for s in request.data['player_list']]
+        with transaction.atomic():
+            # update Internal Strategy store
+            self.create_players(data['player_list'])
 
-        definition_serializer = self.definition_serializer(data=request.data)
-        if definition_serializer.is_valid():
+            definition_serializer = self.definition_serializer(data=data)
+            if not definition_serializer.is_valid():
+                return Response(definition_serializer.errors, 400)
             definition = definition_serializer.save()
-            contest = self.start_contest(definition, players)
-            return Response(self.contest_serializer(contest).data, 201)
-        return Response(definition_serializer.errors, 400)
+            contest = self.start_contest(definition, **fields)
+        status = 201 if contest.status == self.model.SUCCESS else 202
+        return Response(self.contest_serializer(contest).data, status)
 
     def list(self, request):
-        """retrieve a list of all contests of this type"""
-        contests = self.model.objects.all()
-        serializer = self.contest_serializer(contests, many=True)
-        return Response(serializer.data, 200)
+        """
+        retrieve a page of contests of this type. The fields query
+        parameter takes a comma separated list of the fields to
+        include; results are left out unless they are asked for.
+        """
+        if 'fields' in request.query_params:
+            fields = request.query_params['fields'].split(',')
+        else:
+            fields = self.default_list_fields
+        unknown = [f for f in fields if f not in self.contest_serializer.Meta.fields]
+        if unknown:
+            return Response({
+                'fields': [self._unknown_field_error.format(f) for f in unknown]
+            }, 400)
 
-    def retrieve(self, request, pk=None):
-        """retrieve a specific contest"""
+        contests = (self.model.objects
+                    .select_related('definition')
+                    .prefetch_related('definition__player_list'))
+        if 'results' not in fields:
+            contests = contests.defer('results')
+        elif self.model.results_related:
+            contests = contests.select_related(*self.model.results_related)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(contests, request, view=self)
+        serializer = self.contest_serializer(page, many=True, fields=fields)
+        return paginator.get_paginated_response(serializer.data)
+
+    def contest_response(self, request, pk, respond, *tag_parts):
+        """
+        check the contest exists and build its response by calling
+        respond. Finished contests never change so their responses are
+        sent with an ETag, made of the contest id, last_updated and
+        tag_parts, and can be cached by clients.
+        """
         try:
-            contest = self.model.objects.get(id=pk)
+            status, last_updated = self.model.objects.values_list(
+                'status', 'last_updated').get(id=pk)
         except ObjectDoesNotExist:
             raise Http404
-        serializer = self.contest_serializer(contest)
-        return Response(serializer.data, 200)
+
+        if status in (self.model.SUCCESS, self.model.FAILED):
+            tag = etag(self.model._meta.label_lower, pk, last_updated.isoformat(),
+                       request.accepted_renderer.format, *tag_parts)
+            return conditional_response(request, tag, settings.CONTEST_MAX_AGE, respond)
+        return respond()
+
+    def retrieve(self, request, pk=None):
+        """
+        retrieve a specific contest. The results_fields query parameter
+        takes a comma separated list of the results keys to include.
+        """
+        results_fields = None
+        if 'results_fields' in request.query_params:
+            results_fields = request.query_params['results_fields'].split(',')
+            invalid = [k for k in results_fields if not self.results_key.fullmatch(k)]
+            if invalid:
+                return Response({
+                    'results_fields': [self._invalid_results_key_error.format(k) for k in invalid]
+                }, 400)
+
+        def respond():
+            fields = [f for f in self.contest_serializer.Meta.fields if f != 'results']
+            if results_fields is None and request.accepted_renderer.format == 'json':
+                # the results go into the response as the JSON text read
+                # from the database rather than being parsed and encoded
+                contest = self.model.with_results_json().get(id=pk)
+                data = self.contest_serializer(contest, fields=fields).data
+                results = contest.get_results_json()
+                data['results'] = None if results is None else RawJSON(results)
+                return Response(data, 200)
+            typed = getattr(request.accepted_renderer, 'typed_results', False)
+            if results_fields is None and typed:
+                contest = self.model.objects.get(id=pk)
+                data = self.contest_serializer(contest, fields=fields).data
+                data['results'] = contest.get_typed_results()
+                return Response(data, 200)
+            if results_fields is None:
+                serializer = self.contest_serializer(self.model.objects.get(id=pk))
+                return Response(serializer.data, 200)
+            serializer = self.contest_serializer(
+                self.model.objects.defer('results').get(id=pk), fields=fields)
+            data = serializer.data
+            data['results'] = self.results_subset(request, pk, results_fields)
+            return Response(data, 200)
+
+        return self.contest_response(request, pk, respond, results_fields)
+
+    @detail_route(methods=['get'], url_path=r'results/(?P<key>\w+)')
+    def results(self, request, pk=None, key=None):
+        """retrieve a single key of the results of a contest"""
+
+        def respond():
+            subset, missing = self.read_results(request, pk, [key])
+            # a key stored as null is sent as null
+            if missing:
+                raise Http404
+            return Response(subset[key], 200)
+
+        return self.contest_response(request, pk, respond, 'results', key)
 
     def destroy(self, request, pk=None):
         """delete a specific contest"""
@@ -196,6 +417,208 @@ class TournamentViewSet(BaseContestViewSet):
     contest_serializer = TournamentSerializer
     model = models.Tournament
 
+    _not_finished_error = 'Only finished tournaments can be extended.'
+    _repetitions_error = 'Ensure this value is at least {}.'
+    _nothing_to_extend_error = 'Add players or repetitions to extend a tournament.'
+    _random_seeded_error = 'Seeded tournaments with random play can not be extended.'
+    _not_a_player_error = 'Strategy not in tournament: {}'
+    _pairwise_key_error = 'Expected one of {}.'
+    _top_error = 'Ensure this value is a positive integer.'
+
+    @detail_route(methods=['post'])
+    def extend(self, request, pk=None):
+        """
+        Queue a tournament that adds the players in player_list, after
+        the existing ones, or raises the number of repetitions of a
+        finished tournament. Only the matches and repetitions that the
+        finished tournament did not play are played.
+        """
+        try:
+            tournament = self.model.objects.select_related('definition').get(id=pk)
+        except ObjectDoesNotExist:
+            raise Http404
+        if tournament.status != self.model.SUCCESS:
+            return Response({'status': [self._not_finished_error]}, 400)
+
+        definition = tournament.definition
+        strategies = [self.strategies_index[s] for s in definition.strategy_ids]
+        if not tournament.extendable(strategies):
+            return Response({'non_field_errors': [self._random_seeded_error]}, 400)
+        new_players = request.data.get('player_list', [])
+        repetitions = request.data.get('repetitions', definition.repetitions)
+        if not isinstance(repetitions, int) or repetitions < definition.repetitions:
+            return Response({
+                'repetitions': [self._repetitions_error.format(definition.repetitions)]
+            }, 400)
+        if not isinstance(new_players, list):
+            return Response({'player_list': ['Expected a list of items.']}, 400)
+        if not new_players and repetitions == definition.repetitions:
+            return Response({'non_field_errors': [self._nothing_to_extend_error]}, 400)
+
+        data = TournamentDefinitionSerializer(definition).data
+        data.update({
+            'player_list': definition.strategy_ids + new_players,
+            'repetitions': repetitions,
+        })
+        return self.create_contest(data, extends=tournament)
+
+    def player_indices(self, request, pk, params):
+        """
+        Return the ids of the tournament's players and, for each query
+        parameter in params, the indices of the ids it lists, every
+        player if it is not given. Raises Http404 for an unknown
+        tournament and returns errors for ids that are not players.
+        """
+        try:
+            player_ids = json.loads(self.model.objects.values_list(
+                'definition__player_ids', flat=True).get(id=pk))
+        except ObjectDoesNotExist:
+            raise Http404
+        indices, errors = {}, {}
+        for param in params:
+            if param not in request.query_params:
+                indices[param] = list(range(len(player_ids)))
+                continue
+            ids = request.query_params.getlist(param)
+            indices[param], missing = analytics.player_indices(player_ids, ids)
+            if missing:
+                errors[param] = [self._not_a_player_error.format(s) for s in missing]
+        return player_ids, indices, errors
+
+    @detail_route(methods=['get'])
+    def payoff(self, request, pk=None):
+        """
+        retrieve the values of a pairwise result, the payoff_matrix
+        unless the key query parameter names another one, between the
+        row and col players. Both parameters take strategy ids and may
+        be repeated; every player is included if one is left out.
+        """
+        key = request.query_params.get('key', 'payoff_matrix')
+        if key not in analytics.PAIRWISE_KEYS:
+            return Response({
+                'key': [self._pairwise_key_error.format(', '.join(analytics.PAIRWISE_KEYS))]
+            }, 400)
+        player_ids, indices, errors = self.player_indices(request, pk, ('row', 'col'))
+        if errors:
+            return Response(errors, 400)
+        rows, cols = indices['row'], indices['col']
+
+        def respond():
+            matrix = self.model.results_subset(pk, [key], as_arrays=True)[key]
+            if matrix is None:
+                raise Http404
+            return Response({
+                'key': key,
+                'rows': [player_ids[i] for i in rows],
+                'cols': [player_ids[i] for i in cols],
+                'values': analytics.submatrix(matrix, rows, cols).tolist(),
+            }, 200)
+
+        return self.contest_response(request, pk, respond, 'payoff', key, rows, cols)
+
+    @detail_route(methods=['get'])
+    def ranking(self, request, pk=None):
+        """
+        retrieve the ranking of a tournament with the median normalised
+        score of every player. The top query parameter limits it to the
+        best ranked players and player, which may be repeated, to the
+        given strategy ids.
+        """
+        top = request.query_params.get('top')
+        if top is not None:
+            try:
+                top = int(top)
+            except ValueError:
+                top = 0
+            if top < 1:
+                return Response({'top': [self._top_error]}, 400)
+        player_ids, indices, errors = self.player_indices(request, pk, ('player',))
+        if errors:
+            return Response(errors, 400)
+        players = indices['player'] if 'player' in request.query_params else None
+
+        def respond():
+            subset = self.model.results_subset(
+                pk, ['ranking', 'normalised_scores'], as_arrays=True)
+            if subset['ranking'] is None or subset['normalised_scores'] is None:
+                raise Http404
+            ranks, order, medians = analytics.ranking(
+                subset['ranking'], subset['normalised_scores'], top, players)
+            return Response({'ranking': [
+                {'rank': rank, 'player': player_ids[i], 'median_score': median}
+                for rank, i, median in zip(ranks, order, medians)
+            ]}, 200)
+
+        return self.contest_response(request, pk, respond, 'ranking', top, players)
+
+    def get_progress(self, pk):
+        """status of a tournament and the matches it has played so far"""
+        try:
+            status = self.model.objects.values_list('status', flat=True).get(id=pk)
+        except ObjectDoesNotExist:
+            raise Http404
+        try:
+            progress = models.TournamentProgress.objects.get(tournament_id=pk)
+        except ObjectDoesNotExist:
+            progress = models.TournamentProgress()
+        data = TournamentProgressSerializer(progress).data
+        data['status'] = status
+        return data
+
+    @detail_route(methods=['get'])
+    def progress(self, request, pk=None):
+        """retrieve the progress of a tournament"""
+        return Response(self.get_progress(pk), 200)
+
+    @detail_route(methods=['get'], url_path='progress/stream',
+                  renderer_classes=[EventStreamRenderer])
+    def progress_stream(self, request, pk=None):
+        """
+        stream the progress of a tournament as Server-Sent Events,
+        sending an event whenever it changes. Streams are closed after
+        PROGRESS_STREAM_DURATION seconds so they do not hold a web
+        worker for the whole tournament, and clients reconnect with the
+        id of the last event they received. A client that already has
+        the final progress is told to stop with a 204.
+        """
+        progress = self.get_progress(pk)
+        finished = (self.model.SUCCESS, self.model.FAILED)
+        last_event_id = request.META.get('HTTP_LAST_EVENT_ID')
+        if (progress['status'] in finished and
+                last_event_id == self.progress_event_id(progress)):
+            return HttpResponse(status=204)
+
+        def events(progress):
+            renderer = EventStreamRenderer()
+            deadline = time.monotonic() + settings.PROGRESS_STREAM_DURATION
+            sent = last_event_id
+            while True:
+                event_id = self.progress_event_id(progress)
+                if event_id != sent:
+                    yield renderer.render(progress, renderer_context={
+                        'event_id': event_id,
+                        'retry': int(settings.PROGRESS_STREAM_RETRY * 1000),
+                    })
+                    sent = event_id
+                if progress['status'] in finished:
+                    return
+                if time.monotonic() + settings.PROGRESS_STREAM_INTERVAL > deadline:
+                    return
+                time.sleep(settings.PROGRESS_STREAM_INTERVAL)
+                try:
+                    progress = self.get_progress(pk)
+                except Http404:
+                    return
+
+        response = StreamingHttpResponse(events(progress), content_type=EventStreamRenderer.media_type)
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    @staticmethod
+    def progress_event_id(progress):
+        """id of a progress event, which changes whenever the progress does"""
+        return '{}-{}'.format(progress['status'], progress['completed'])
+
 
 class MatchViewSet(BaseContestViewSet):
     """
@@ -222,4 +645,146 @@ class MoranViewSet(BaseContestViewSet):
     contest_serializer = MoranSerializer
     model = models.MoranProcess
 
+    @detail_route(methods=['get'])
+    def populations(self, request, pk=None):
+        """
+        page through the population of every generation of a Moran
+        process, which is written while the process is being played
+        """
+        if not self.model.objects.filter(id=pk).exists():
+            raise Http404
+        paginator = PopulationCursorPagination()
+        chunks = models.MoranPopulations.objects.filter(moran_id=pk)
+        page = paginator.paginate_queryset(chunks, request, view=self)
+        return paginator.get_paginated_response(
+            MoranPopulationsSerializer(page, many=True).data)
+
+
+class MoranFixationViewSet(BaseContestViewSet):
+    """
+    View that handles the creation and retrieval of fixation probability
+    estimates. An estimate plays up to a given number of independent
+    Moran processes and stores how often each strategy fixated.
+    """
+
+    definition_serializer = MoranFixationDefinitionSerializer
+    definition_model = models.MoranFixationDefinition
+    results_serializer = MoranFixationResultsSerializer
+    contest_serializer = MoranFixationSerializer
+    model = models.MoranFixation
+
+
+class BatchViewSet(viewsets.ViewSet):
+    """
+    View that handles the submission and retrieval of batches. A batch
+    is a list of contest definitions of one contest type that are
+    validated, stored and queued together.
+    """
+
+    contest_viewsets = {
+        'tournaments': TournamentViewSet,
+        'matches': MatchViewSet,
+        'moran': MoranViewSet,
+        'moran/fixation': MoranFixationViewSet,
+    }
+    _unknown_type_error = 'Unknown contest type: {}'
+    _size_error = 'Ensure this field is a list of between 1 and {} definitions.'
 
+    def create(self, request):
+        """
+        Take in a contest type and a list of definitions, each of which
+        has the same fields as when posting a single contest. Strategies
+        are looked up once for the whole batch and the definitions and
+        contests are inserted in bulk.
+        """
+        contest_type = request.data.get('contest_type')
+        if contest_type not in self.contest_viewsets:
+            return Response({
+                'contest_type': [self._unknown_type_error.format(contest_type)]
+            }, 400)
+        viewset = self.contest_viewsets[contest_type]
+
+        definitions = request.data.get('definitions')
+        if (not isinstance(definitions, list) or
+                not 0 < len(definitions) <= settings.BATCH_MAX_SIZE):
+            return Response({
+                'definitions': [self._size_error.format(settings.BATCH_MAX_SIZE)]
+            }, 400)
+
+        ids = {
+            s for definition in definitions if isinstance(definition, dict)
+            for s in definition.get('player_list') or [] if isinstance(s, str)
+        }
+        missing = sorted(ids.difference(viewset.strategies_index))
+        if missing:
+            return Response({
+                'player_list': [viewset._not_found_error.format(s) for s in missing]
+            }, 400)
+
+        with transaction.atomic():
+            viewset.create_players(ids)
+            definition_serializer = viewset.definition_serializer(
+                data=definitions, many=True,
+                context={'strategies': InternalStrategy.objects.in_bulk(ids)})
+            if not definition_serializer.is_valid():
+                return Response({'definitions': definition_serializer.errors}, 400)
+            saved = definition_serializer.save()
+            batch = Batch.objects.create(contest_type=contest_type)
+            viewset.model.objects.bulk_create(
+                viewset.model(definition=definition, batch=batch, status=viewset.model.PENDING)
+                for definition in saved)
+
+        return Response(self.serialize(batch), 202)
+
+    def retrieve(self, request, pk=None):
+        """retrieve a batch with the aggregate status of its contests"""
+        try:
+            batch = Batch.objects.get(id=pk)
+        except ObjectDoesNotExist:
+            raise Http404
+        return Response(self.serialize(batch), 200)
+
+    def serialize(self, batch):
+        model = self.contest_viewsets[batch.contest_type].model
+        return BatchSerializer(batch, context={'model': model}).data
+
+
+def as_float(expression):
+    # avoids integer division of integer totals
+    return Cast(expression, FloatField())
+
+
+class LeaderboardViewSet(viewsets.ViewSet):
+    """
+    View of the mean normalised score and win rate of every strategy
+    across every finished tournament, read from the totals that are
+    kept up to date as tournaments finish.
+    """
+
+    filter_types = {'turns': int, 'noise': float, 'repetitions': int}
+    _invalid_filter_error = 'A valid {} is required.'
+
+    def list(self, request):
+        """
+        list the strategies best mean score first. The turns, noise and
+        repetitions query parameters restrict it to the tournaments
+        played with those settings.
+        """
+        filters, errors = {}, {}
+        for name, convert_type in self.filter_types.items():
+            if name in request.query_params:
+                try:
+                    filters[name] = convert_type(request.query_params[name])
+                except ValueError:
+                    errors[name] = [self._invalid_filter_error.format(convert_type.__name__)]
+        if errors:
+            return Response(errors, 400)
+
+        entries = (StrategyAggregate.objects
+                   .filter(**filters)
+                   .values('strategy_id')
+                   .annotate(total_tournaments=Sum('tournaments'),
+                             mean_score=Sum('score_total') / as_float(Sum('tournaments')),
+                             win_rate=as_float(Sum('wins')) / as_float(Sum('matches')))
+                   .order_by('-mean_score', 'strategy_id'))
+        return Response(LeaderboardSerializer(entries, many=True).data, 200)
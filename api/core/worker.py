@@ -0,0 +1,304 @@
+"""
+Database backed contest queue. Contests are created with a PENDING
+status by the API and picked up here by a pool of worker processes
+that move them through RUNNING to SUCCESS or FAILED.
+"""
+from contextlib import contextmanager
+from datetime import timedelta
+import logging
+from multiprocessing import Condition, Process, Value
+import os
+import resource
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+import axelrod as axl
+
+from api.core import cache, metrics, models, pool
+from api.core.serializers import (
+    MatchResultsSerializer,
+    MoranResultsSerializer,
+    MoranFixationResultsSerializer,
+    TournamentResultsSerializer,
+)
+from api.core.utils import strategy_id
+
+logger = logging.getLogger(__name__)
+
+strategies_index = {strategy_id(s): s for s in axl.strategies}
+
+# contest models polled by the workers and the serializers used to
+# store the results of each one
+results_serializers = {
+    models.Tournament: TournamentResultsSerializer,
+    models.Match: MatchResultsSerializer,
+    models.MoranProcess: MoranResultsSerializer,
+    models.MoranFixation: MoranFixationResultsSerializer,
+}
+
+
+class CoreBudget:
+    """
+    Cores shared by the worker processes of one machine. Every running
+    contest holds at least one core and a contest asking for more
+    processes is granted as many as are free, so concurrent contests
+    never use more cores than the budget between them.
+
+    Parameters
+    ----------
+        cores: int
+            the number of cores the workers may use
+    """
+
+    def __init__(self, cores):
+        self.cores = cores
+        self._free = Value('i', cores, lock=False)
+        self._condition = Condition()
+
+    @contextmanager
+    def reserve(self, requested):
+        """wait for a free core and hold up to requested cores"""
+        with self._condition:
+            while self._free.value < 1:
+                self._condition.wait()
+            granted = max(1, min(requested, self._free.value))
+            self._free.value -= granted
+        try:
+            yield granted
+        finally:
+            with self._condition:
+                self._free.value += granted
+                self._condition.notify_all()
+
+
+def claim_contest(model):
+    """
+    Take the oldest PENDING contest of the given model and mark it as
+    RUNNING with a first heartbeat. Rows locked by another worker are
+    skipped so each contest is only ever claimed once.
+
+    Parameters
+    ----------
+        model: Contest
+            contest model class to take the contest from
+    """
+    with transaction.atomic():
+        contest = (model.objects
+                   .select_for_update(skip_locked=True)
+                   .select_related('definition')
+                   .filter(status=model.PENDING)
+                   .order_by('id')
+                   .first())
+        if contest is None:
+            return None
+        contest.status = model.RUNNING
+        contest.heartbeat = timezone.now()
+        contest.save(update_fields=['status', 'heartbeat', 'last_updated'])
+    return contest
+
+
+def requeue_stale(stale_after):
+    """
+    Put RUNNING contests whose worker has not sent a heartbeat for
+    stale_after seconds, because it was killed or lost its machine,
+    back in the queue. Returns the number of contests requeued.
+    """
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    count = 0
+    for model in results_serializers:
+        stale = (model.objects
+                 .filter(status=model.RUNNING)
+                 .filter(Q(heartbeat__lt=cutoff) |
+                         Q(heartbeat__isnull=True, last_updated__lt=cutoff)))
+        requeued = stale.update(status=model.PENDING, heartbeat=None)
+        if requeued:
+            logger.warning('Requeued %d stale %s contests', requeued, model.__name__)
+        count += requeued
+    return count
+
+
+@contextmanager
+def heartbeat(contest, interval):
+    """
+    Update the heartbeat of a RUNNING contest every interval seconds
+    from a background thread while the body of the with statement runs.
+    """
+    stop = threading.Event()
+    model = type(contest)
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                model.objects.filter(id=contest.id, status=model.RUNNING).update(
+                    heartbeat=timezone.now())
+        finally:
+            # the thread has its own database connection
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def play(contest, players, processes):
+    """
+    Run the contest and record its wall clock and cpu time. The cpu time
+    includes any child processes the contest used so its ratio to the
+    wall clock time is the speedup over playing on a single core.
+    """
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    start_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    with metrics.contest_run_seconds.time(contest=type(contest).__name__):
+        result = contest.run(players, processes=processes)
+    wall_time = time.perf_counter() - start_wall
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu_time = (time.process_time() - start_cpu +
+                children.ru_utime - start_children.ru_utime +
+                children.ru_stime - start_children.ru_stime)
+    return result, {
+        'processes': processes,
+        'wall_time': wall_time,
+        'cpu_time': cpu_time,
+        'speedup': cpu_time / wall_time if wall_time else 1.0,
+    }
+
+
+def run_contest(contest, core_budget=None):
+    """
+    Play a claimed contest and store its results. Deterministic and
+    seeded contests other than extensions are served from the result
+    cache when possible.
+    Seeded contests are played in a single process unless their results
+    do not depend on how the work is scheduled across processes. Any
+    exception raised while playing marks the contest as FAILED instead
+    of killing the worker.
+
+    Parameters
+    ----------
+        contest: Contest
+            a contest that has been claimed by this worker
+        core_budget: CoreBudget
+            cores shared with the other workers, if any
+    """
+    seed = contest.definition.seed
+    requested = getattr(contest.definition, 'processes', 1)
+    if seed is not None and not contest.parallel_reproducible:
+        requested = 1
+    try:
+        strategies = [strategies_index[s] for s in contest.definition.strategy_ids]
+        key, results, metadata = None, None, {'cached': True}
+        # extensions reuse the interactions of the tournament they extend
+        extension = getattr(contest, 'extends_id', None) is not None
+        if (contest.cacheable and not extension and
+                cache.is_reproducible(contest.definition, strategies)):
+            key = cache.cache_key(type(contest), contest.definition)
+            results = cache.get(key)
+        if results is None:
+            if seed is not None:
+                axl.seed(seed)
+            players = pool.players(contest.definition.strategy_ids)
+            with heartbeat(contest, settings.WORKER_HEARTBEAT_INTERVAL):
+                if core_budget is None:
+                    result, metadata = play(contest, players, requested)
+                else:
+                    with core_budget.reserve(requested) as processes:
+                        result, metadata = play(contest, players, processes)
+            serializer = results_serializers[type(contest)]
+            with metrics.results_serialize_seconds.time(serializer=serializer.__name__):
+                results = serializer(result).data
+            if key is not None:
+                cache.put(key, results)
+        write_start = time.perf_counter()
+        contest.store_results(results)
+        contest.metadata = metadata
+        contest.status = contest.SUCCESS
+        # the leaderboard only counts contests that are saved as finished
+        with transaction.atomic():
+            contest.save()
+            contest.add_to_leaderboard(results)
+    except Exception:
+        logger.exception('Contest %s %s failed', type(contest).__name__, contest.id)
+        contest.results = None
+        contest.metadata = None
+        contest.status = contest.FAILED
+        contest.save()
+
+    name = type(contest).__name__
+    if contest.status == contest.SUCCESS:
+        metrics.results_write_seconds.observe(time.perf_counter() - write_start, contest=name)
+    metrics.contests_total.inc(contest=name, status=contest.get_status_display())
+    metrics.registry.dump()
+    return contest
+
+
+def run_pending(core_budget=None):
+    """
+    Claim and run at most one PENDING contest of each model.
+    Returns the number of contests that were run.
+    """
+    count = 0
+    for model in results_serializers:
+        contest = claim_contest(model)
+        if contest is not None:
+            run_contest(contest, core_budget)
+            count += 1
+    return count
+
+
+def work(poll_interval=1.0, core_budget=None, slot=None):
+    """
+    Worker loop: run pending contests and sleep whenever the queue
+    is empty, requeueing stale contests once per heartbeat interval.
+    A worker given a slot dumps its metrics to METRICS_DIR under it.
+    """
+    if slot is not None and settings.METRICS_DIR:
+        metrics.registry.claim(os.path.join(
+            settings.METRICS_DIR, 'worker-{}.json'.format(slot)))
+    requeued_at = None
+    while True:
+        now = time.monotonic()
+        if requeued_at is None or now - requeued_at >= settings.WORKER_HEARTBEAT_INTERVAL:
+            requeue_stale(settings.WORKER_STALE_AFTER)
+            requeued_at = now
+        if not run_pending(core_budget):
+            time.sleep(poll_interval)
+
+
+def start_workers(processes, poll_interval=1.0):
+    """
+    Start a pool of worker processes and wait for them to exit.
+
+    Parameters
+    ----------
+        processes: int
+            the number of worker processes
+        poll_interval: float
+            seconds a worker sleeps when there is nothing to run
+    """
+    core_budget = CoreBudget(settings.WORKER_CORES)
+    if settings.METRICS_DIR:
+        # the dumps of the workers of an earlier run are stale
+        metrics.clear_dumps(settings.METRICS_DIR, 'worker')
+    # forked workers share the warmed strategies and prototypes
+    pool.warm()
+    # connections must not be shared between forked processes
+    connections.close_all()
+    workers = [Process(target=work, args=(poll_interval, core_budget, slot))
+               for slot in range(processes)]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()